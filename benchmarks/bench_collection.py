@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Benchmark collecting tests parametrized by faux marks."""
+import pytest
+
+ITEMS = [10, 100, 1000, 10000, 100000]
+
+MARKS = {
+    'faux_string': "faux_string({items}, 'alpha')",
+    'faux_callable': 'faux_callable({items}, fauxfactory.gen_integer)',
+    'faux_generator': (
+        'faux_generator(fauxfactory.gen_integer() for _ in range({items}))'),
+}
+
+TEST = """
+    import fauxfactory
+    import pytest
+    @pytest.mark.{mark}
+    def test_something(value):
+        assert value
+"""
+
+
+@pytest.mark.parametrize('items', ITEMS)
+@pytest.mark.parametrize('mark', sorted(MARKS))
+def bench_collection(bench, collect, testdir, mark, items):
+    """Collect a test parametrized with ``items`` values."""
+    testdir.makepyfile(test_faux=TEST.format(
+        mark=MARKS[mark].format(items=items)))
+    result = bench(collect, mark=mark, items=items)
+    assert result['collected'] == items
+
+
+@pytest.mark.parametrize('items', [1000, 100000])
+def bench_lazy_collection(bench, collect, testdir, items):
+    """Collect a test parametrized with ``items`` lazy values."""
+    testdir.makepyfile(test_faux=TEST.format(
+        mark=MARKS['faux_string'].format(items=items)))
+    result = bench(
+        lambda: collect('-o', 'faux_lazy=true'),
+        mark='faux_string', items=items, lazy=True)
+    assert result['collected'] == items
+
+
+@pytest.mark.parametrize('shared', [False, True])
+def bench_shared_collection(bench, collect, testdir, shared):
+    """Collect 100 tests carrying the same mark of 200 values."""
+    mark = "faux_string(200, 'utf8', length=64, shared={})".format(shared)
+    testdir.makepyfile(test_faux=''.join(
+        TEST.format(mark=mark).replace('test_something', 'test_{}'.format(
+            number))
+        for number in range(100)))
+    result = bench(collect, mark='faux_string', items=200 * 100,
+                   shared=shared)
+    assert result['collected'] == 200 * 100
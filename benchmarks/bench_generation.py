@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the generation of faux mark values."""
+import re
+
+import fauxfactory
+import pytest
+
+from pytest_fauxfactory.constants import STRING_TYPES
+from pytest_fauxfactory.corpus import main
+from pytest_fauxfactory.marks import (
+    faux_callable,
+    faux_generator,
+    faux_record,
+    faux_string,
+)
+
+ITEMS = [10, 100, 1000, 10000, 100000]
+
+LENGTHS = [1, 10, 100, 1000]
+
+# Number of items generated per string type and length.
+STRING_ITEMS = 1000
+
+
+@pytest.mark.parametrize('items', ITEMS)
+def bench_faux_string(bench, items):
+    """Generate alpha strings."""
+    bench(lambda: list(faux_string(items, 'alpha')),
+          mark='faux_string', items=items)
+
+
+@pytest.mark.parametrize('items', ITEMS)
+def bench_faux_callable(bench, items):
+    """Generate values by calling a function."""
+    bench(lambda: list(faux_callable(items, fauxfactory.gen_integer)),
+          mark='faux_callable', items=items)
+
+
+@pytest.mark.parametrize('items', ITEMS)
+def bench_faux_generator(bench, items):
+    """Generate values by consuming a generator."""
+    def generate():
+        values = (fauxfactory.gen_integer() for _ in range(items))
+        return list(faux_generator(values))
+    bench(generate, mark='faux_generator', items=items)
+
+
+# Schema of the records, and the callable building the same records one at
+# a time.
+RECORD_SCHEMA = {
+    'name': ('alpha', 12),
+    'email': ('alphanumeric', 20),
+    'age': ('int', 18, 99),
+    'score': ('float', 0, 100),
+    'active': 'bool',
+    'role': ('choice', ['admin', 'user', 'guest']),
+}
+
+
+def make_record():
+    """Return a record of the benchmark schema."""
+    return (
+        fauxfactory.gen_alpha(length=12),
+        fauxfactory.gen_alphanumeric(length=20),
+        fauxfactory.gen_integer(18, 99),
+        fauxfactory.gen_integer(0, 100) + fauxfactory.gen_choice([0.0, 0.5]),
+        fauxfactory.gen_boolean(),
+        fauxfactory.gen_choice(['admin', 'user', 'guest']),
+    )
+
+
+@pytest.mark.parametrize('source', ['faux_record', 'faux_callable'])
+@pytest.mark.parametrize('items', [1000, 100000])
+def bench_records(bench, source, items):
+    """Generate records column by column, or row by row with a callable."""
+    if source == 'faux_record':
+        def generate():
+            return list(faux_record(items, RECORD_SCHEMA))
+    else:
+        def generate():
+            return list(faux_callable(items, make_record))
+    bench(generate, mark=source, items=items)
+
+
+# Pattern of the generated strings, and the callable retrying random strings
+# until one matches.
+PATTERN = r'[A-Z]{3}-\d{4}'
+
+
+def make_matching():
+    """Return an alphanumeric string matching the benchmark pattern."""
+    while True:
+        value = '{}-{}'.format(
+            fauxfactory.gen_alphanumeric(length=3).upper(),
+            fauxfactory.gen_numeric_string(length=4))
+        if re.fullmatch(PATTERN, value):
+            return value
+
+
+@pytest.mark.parametrize('source', ['pattern', 'faux_callable'])
+@pytest.mark.parametrize('items', [1000, 100000])
+def bench_pattern(bench, source, items):
+    """Generate strings matching a pattern, or filter random strings."""
+    if source == 'pattern':
+        def generate():
+            return list(faux_string(items, pattern=PATTERN))
+    else:
+        def generate():
+            return list(faux_callable(items, make_matching))
+    bench(generate, mark=source, items=items)
+
+
+@pytest.mark.parametrize('length', LENGTHS)
+@pytest.mark.parametrize('str_type', STRING_TYPES)
+def bench_string_types(bench, str_type, length):
+    """Generate strings of every type and several lengths."""
+    bench(lambda: list(faux_string(STRING_ITEMS, str_type, length=length)),
+          mark='faux_string', items=STRING_ITEMS, str_type=str_type,
+          length=length)
+
+
+@pytest.fixture(scope='module')
+def corpus_dir(tmp_path_factory):
+    """Return a directory holding a corpus of 100k utf8 strings."""
+    directory = str(tmp_path_factory.mktemp('corpus'))
+    main([directory, '--types', 'utf8', '--lengths', '64', '--count',
+          '100000', '--seed', '1'])
+    return directory
+
+
+@pytest.mark.parametrize('source', [None, 'corpus'])
+@pytest.mark.parametrize('items', [1000, 100000])
+def bench_corpus_string(bench, corpus_dir, source, items):
+    """Generate utf8 strings, or sample them from a corpus."""
+    kwargs = {'length': 64}
+    if source:
+        kwargs.update(source=source, corpus_dir=corpus_dir)
+    bench(lambda: list(faux_string(items, 'utf8', **kwargs)),
+          mark='faux_string', items=items, source=source)
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the startup of sessions whose tests do not use faux marks."""
+import subprocess
+import sys
+
+import pytest
+
+MODULES = 200
+
+TESTS = 10
+
+TEST = """
+def test_{number}():
+    assert True
+"""
+
+
+def run_session(testdir, *args):
+    """Collect the tests of ``testdir`` in a new interpreter."""
+    subprocess.run(
+        [sys.executable, '-m', 'pytest', '--collect-only', '-q',
+         '-p', 'no:cacheprovider'] + list(args),
+        cwd=str(testdir.tmpdir), stdout=subprocess.DEVNULL, check=True)
+
+
+@pytest.mark.parametrize('plugin', [False, True])
+def bench_startup(bench, testdir, plugin):
+    """Collect modules of plain tests with and without the plugin."""
+    testdir.makepyfile(**{
+        'test_plain_{}'.format(module): ''.join(
+            TEST.format(number=number) for number in range(TESTS))
+        for module in range(MODULES)
+    })
+    args = () if plugin else ('-p', 'no:fauxfactory')
+    bench(lambda: run_session(testdir, *args), plugin=plugin,
+          items=MODULES * TESTS)
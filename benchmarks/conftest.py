@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""Fixtures and reporting of the pytest-fauxfactory benchmarks."""
+import gc
+import json
+import platform
+import time
+import tracemalloc
+
+import pytest
+
+pytest_plugins = 'pytester'
+
+RESULTS = pytest.StashKey()
+
+
+def pytest_addoption(parser):
+    """Register the benchmark options."""
+    parser.addoption(
+        '--bench-json',
+        action='store',
+        default=None,
+        metavar='path',
+        help='Write the benchmark results to a JSON file.')
+    parser.addoption(
+        '--bench-rounds',
+        action='store',
+        type=int,
+        default=3,
+        help='Number of timed rounds per benchmark, the fastest is kept.')
+
+
+def pytest_configure(config):
+    """Prepare the list of benchmark results."""
+    config.stash[RESULTS] = []
+
+
+def get_version(name):
+    """Return the installed version of package ``name``."""
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:  # Python 3.7
+        return None
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
+
+
+def measure(func, rounds):
+    """Call ``func`` ``rounds`` times and return the fastest time, its result
+    and the peak memory use of ``func``.
+
+    Memory is traced in an extra call so tracing does not slow down the
+    timed ones.
+    """
+    fastest = None
+    for _ in range(rounds):
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        if fastest is None or elapsed < fastest[0]:
+            fastest = (elapsed, result)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return fastest[0], fastest[1], peak
+
+
+class Benchmark(object):
+    """Measure callables and record the results of a benchmark."""
+
+    def __init__(self, request):
+        self.name = request.node.nodeid
+        self.rounds = request.config.getoption('bench_rounds')
+        self.results = request.config.stash[RESULTS]
+
+    def __call__(self, func, **info):
+        """Measure ``func``, recording ``info`` with the results.
+
+        When ``func`` returns a dictionary, it is recorded too.
+        """
+        elapsed, result, peak = measure(func, self.rounds)
+        if isinstance(result, dict):
+            info.update(result)
+        info.update(
+            benchmark=self.name,
+            time=elapsed,
+            peak_memory=peak,
+        )
+        items = info.get('items')
+        if items:
+            info['per_item'] = elapsed / items
+        self.results.append(info)
+        return info
+
+
+@pytest.fixture
+def bench(request):
+    """Return a callable measuring the time and memory of a function."""
+    return Benchmark(request)
+
+
+class GenerationTimer(object):
+    """Plugin timing the calls to ``pytest_generate_tests``."""
+
+    def __init__(self):
+        self.elapsed = 0.0
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_generate_tests(self, metafunc):
+        start = time.perf_counter()
+        yield
+        self.elapsed += time.perf_counter() - start
+
+
+@pytest.fixture
+def collect(testdir):
+    """Return a function collecting ``testdir`` in process.
+
+    It returns the number of collected items and the time spent in
+    ``pytest_generate_tests``.
+    """
+    def collect_items(*args):
+        timer = GenerationTimer()
+        result = testdir.inline_run(
+            '--collect-only', '-p', 'no:cacheprovider', *args,
+            plugins=[timer])
+        items = result.getcalls('pytest_collection_finish')[0].session.items
+        return {
+            'collected': len(items),
+            'generate_tests_time': timer.elapsed,
+        }
+    return collect_items
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Show the benchmark results and write them to ``--bench-json``."""
+    results = config.stash[RESULTS]
+    if not results:
+        return
+    terminalreporter.write_sep('-', 'fauxfactory benchmarks')
+    terminalreporter.write_line('{:>10} {:>12} {:>12}  {}'.format(
+        'time', 'per item', 'peak memory', 'benchmark'))
+    for result in results:
+        terminalreporter.write_line(
+            '{:>9.4f}s {:>10.3f}us {:>10.1f}KB  {}'.format(
+                result['time'],
+                result.get('per_item', 0.0) * 1e6,
+                result['peak_memory'] / 1024.0,
+                result['benchmark']))
+    path = config.getoption('bench_json')
+    if path:
+        with open(path, 'w') as handle:
+            json.dump({
+                'python': platform.python_version(),
+                'pytest': pytest.__version__,
+                'fauxfactory': get_version('fauxfactory'),
+                'pytest-fauxfactory': get_version('pytest-fauxfactory'),
+                'platform': platform.platform(),
+                'results': results,
+            }, handle, indent=2)
+        terminalreporter.write_line(
+            'benchmark results written to {}'.format(path))
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""Generation of values from coroutine and async generator functions.
+
+This module is only imported by marks using such functions, so sessions
+without them do not import `asyncio`.
+"""
+import asyncio
+import random
+
+from pytest_fauxfactory.dataset import Dataset
+from pytest_fauxfactory.rng import derive_seed, seed_context
+
+
+async def _take(async_iterator, items, deadline=None):
+    """Await the first ``items`` values of ``async_iterator``, until the
+    ``deadline`` of the event loop clock."""
+    values = []
+    iterator = async_iterator.__aiter__()
+    loop = asyncio.get_running_loop()
+    while len(values) < items:
+        try:
+            if deadline is None:
+                value = await iterator.__anext__()
+            else:
+                value = await asyncio.wait_for(
+                    iterator.__anext__(), deadline - loop.time())
+        except (StopAsyncIteration, asyncio.TimeoutError):
+            break
+        values.append(value)
+    return values
+
+
+async def _take_within(async_iterator, items, time_budget):
+    """Await the first ``items`` values of ``async_iterator`` for at most
+    ``time_budget`` seconds."""
+    deadline = asyncio.get_running_loop().time() + time_budget
+    return await _take(async_iterator, items, deadline)
+
+
+def collect_async(async_iterator, items, time_budget=None):
+    """Return the first ``items`` values of an async iterator, the ones
+    yielded within ``time_budget`` seconds if set."""
+    if time_budget is None:
+        return asyncio.run(_take(async_iterator, items))
+    return asyncio.run(_take_within(async_iterator, items, time_budget))
+
+
+class AsyncDataset(Dataset):
+    """Dataset whose ``factory`` returns coroutines.
+
+    All the values are generated concurrently on a single event loop, at
+    most ``concurrency`` at a time when set. Each item runs in its own task
+    with its own random generator, see `seed_context`, so values drawn from
+    fauxfactory do not depend on the other items running concurrently. The
+    global random state is seeded when an item starts too, so values drawn
+    from `random` directly after an item awaits something may.
+    """
+
+    def __init__(self, items, factory, seed=None, spec=None,
+                 concurrency=None):
+        super(AsyncDataset, self).__init__(items, factory, seed, spec)
+        self.concurrency = concurrency
+
+    def generate(self, index):
+        """Generate the value of item ``index`` on its own event loop."""
+        return self._run(self._generate(index))
+
+    def regenerate(self, index, attempt):
+        """Generate another value of item ``index``, the ``attempt`` one."""
+        return self._run(self._generate(index, attempt))
+
+    @staticmethod
+    def _run(coroutine):
+        """Run ``coroutine`` on its own event loop, restoring the global
+        random state it seeds."""
+        state = random.getstate()
+        try:
+            return asyncio.run(coroutine)
+        finally:
+            random.setstate(state)
+
+    async def _generate(self, index, attempt=0):
+        """Seed the random state and await the value of item ``index``."""
+        if self.seed is not None:
+            if attempt:
+                seed = derive_seed(self.seed, index, attempt)
+            else:
+                seed = derive_seed(self.seed, index)
+            random.seed(seed)
+            seed_context(seed)
+        return await self.factory(index)
+
+    def _tasks(self):
+        """Return the coroutines awaiting the value of each item."""
+        semaphore = None
+        if self.concurrency:
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(index):
+            if semaphore is None:
+                return await self._generate(index)
+            async with semaphore:
+                return await self._generate(index)
+
+        return [run(index) for index in range(self.items)]
+
+    async def _gather(self):
+        """Await the values of all the items."""
+        return await asyncio.gather(*self._tasks())
+
+    async def _gather_within(self, time_budget):
+        """Await the values of the items completed within ``time_budget``
+        seconds, in item order, and cancel the others."""
+        tasks = [asyncio.ensure_future(task) for task in self._tasks()]
+        done, pending = await asyncio.wait(tasks, timeout=time_budget)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        return [task.result() for task in tasks if task in done]
+
+    def __iter__(self):
+        return iter(self.materialize())
+
+    def within_budget(self):
+        """Return a materialized dataset of the items completed before
+        ``time_budget`` ran out."""
+        values = self._run(self._gather_within(self.time_budget))
+        return self._budgeted(values, True)
+
+    def materialize(self, workers=1):
+        """Return the list of all the values, generated concurrently."""
+        return self._run(self._gather())
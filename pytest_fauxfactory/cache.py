@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""Persistence of generated datasets in the pytest cache directory."""
+import os
+import pickle
+import tempfile
+import time
+from contextlib import contextmanager
+
+CACHE_DIR = 'fauxfactory'
+SEED_KEY = 'fauxfactory/seed'
+
+# Files of the cache directory counted towards its size: generated values
+# and the indexes of the faux_dataset files.
+CACHED_SUFFIXES = ('.pickle', '.index')
+
+
+def touch(path):
+    """Mark ``path`` as used now.
+
+    The time is set explicitly as the clock used by the filesystem may be
+    too coarse to order files written in a row.
+    """
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+
+
+@contextmanager
+def atomic_write(path):
+    """Return a binary file replacing ``path`` once it is written.
+
+    Every writer gets its own temporary file, so that processes writing the
+    same file at once, such as pytest-xdist workers, do not clash. A writer
+    which cannot replace ``path`` because another one just did leaves it the
+    file of the other.
+    """
+    handle, temporary = tempfile.mkstemp(
+        prefix=os.path.basename(path) + '.', suffix='.tmp',
+        dir=os.path.dirname(path))
+    try:
+        with os.fdopen(handle, 'wb') as stream:
+            yield stream
+        try:
+            os.replace(temporary, path)
+        except OSError:
+            if not os.path.exists(path):
+                raise
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+class DatasetCache(object):
+    """Generated values stored as one pickle file per dataset.
+
+    Files live in a directory of the pytest ``cache``, created on first use.
+    They are touched when read, and the least recently used ones are removed
+    once the directory, including the indexes of the `faux_dataset` files,
+    grows beyond ``max_size`` bytes. With ``refresh``
+    set, stored values are ignored and overwritten.
+    """
+
+    def __init__(self, cache, max_size, refresh=False):
+        self.cache = cache
+        self.max_size = max_size
+        self.refresh = refresh
+        self._directory = None
+
+    @property
+    def directory(self):
+        """Return the directory storing the values."""
+        if self._directory is None:
+            self._directory = str(self.cache.mkdir(CACHE_DIR))
+        return self._directory
+
+    def path(self, key):
+        """Return the path of the file storing ``key``."""
+        return os.path.join(self.directory, '{}.pickle'.format(key))
+
+    def get(self, key):
+        """Return the values stored for ``key``, ``None`` if there are none.
+        """
+        if self.refresh:
+            return None
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as handle:
+                values = pickle.load(handle)
+        except Exception:
+            # Missing or truncated file, or values referencing code that
+            # changed since they were stored: generate them again.
+            return None
+        touch(path)
+        return values
+
+    def set(self, key, values):
+        """Store ``values`` for ``key``.
+
+        Values that cannot be pickled are not stored.
+        """
+        try:
+            data = pickle.dumps(values, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+        path = self.path(key)
+        with atomic_write(path) as handle:
+            handle.write(data)
+        touch(path)
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used files beyond ``max_size`` bytes."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(CACHED_SUFFIXES):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                # Removed by another process meanwhile.
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                # Removed by another process, or an index still mapped.
+                pass
+            total -= size
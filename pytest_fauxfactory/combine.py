@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Combinations of the items of several faux marks stacked on a test."""
+from itertools import product
+
+COMBINE_STRATEGIES = ('product', 'zip', 'pairwise')
+
+
+def pairwise(sizes):
+    """Return rows of item indices covering every pair of items.
+
+    ``sizes`` is the number of items of each mark. Every item of a mark
+    appears next to every item of every other mark in at least one row,
+    which takes far fewer rows than the cartesian product once more than two
+    marks are combined. Rows are built in parameter order, the IPO strategy:
+    rows covering the first two marks are extended one mark at a time with
+    the item covering the most missing pairs, then rows are added for the
+    pairs still missing. The result only depends on ``sizes``.
+    """
+    if len(sizes) < 3:
+        return [tuple(row) for row in product(*map(range, sizes))]
+    rows = [list(row) + [None] * (len(sizes) - 2)
+            for row in product(range(sizes[0]), range(sizes[1]))]
+    for column in range(2, len(sizes)):
+        # Pairs of an item of an earlier mark and an item of this one that no
+        # row covers yet, by earlier mark.
+        missing = [
+            {(left, right)
+             for left in range(sizes[other])
+             for right in range(sizes[column])}
+            for other in range(column)
+        ]
+        for row in rows:
+            best, best_count = 0, -1
+            for item in range(sizes[column]):
+                count = sum(
+                    (row[other], item) in missing[other]
+                    for other in range(column)
+                    if row[other] is not None)
+                if count > best_count:
+                    best, best_count = item, count
+            row[column] = best
+            for other in range(column):
+                missing[other].discard((row[other], best))
+
+        added = {}
+        for other in range(column):
+            for left, right in sorted(missing[other]):
+                for row in added.get(right, ()):
+                    if row[other] is None:
+                        row[other] = left
+                        break
+                else:
+                    row = [None] * len(sizes)
+                    row[other] = left
+                    row[column] = right
+                    added.setdefault(right, []).append(row)
+                    rows.append(row)
+    # Marks left free in a row are given any item, spread over the rows.
+    return [
+        tuple(number % size if item is None else item
+              for item, size in zip(row, sizes))
+        for number, row in enumerate(rows)
+    ]
+
+
+def combine_indices(strategy, sizes):
+    """Return the rows of item indices to run for ``strategy``.
+
+    ``product`` runs every combination, ``zip`` the first items of every
+    mark together, then the second ones and so on up to the shortest mark,
+    and ``pairwise`` every pair of items, see `pairwise`.
+    """
+    if not all(sizes):
+        return []
+    if strategy == 'product':
+        return list(product(*map(range, sizes)))
+    if strategy == 'zip':
+        return [(index,) * len(sizes) for index in range(min(sizes))]
+    if strategy == 'pairwise':
+        return pairwise(sizes)
+    raise ValueError(
+        'Unknown combine strategy {}, expected one of {}'.format(
+            strategy, ', '.join(COMBINE_STRATEGIES)))
@@ -10,3 +10,6 @@ STRING_TYPES = (
     'utf8',
     'punctuation',
 )
+
+# Directory of the corpus files, relative to the rootdir.
+CORPUS_DIRECTORY = 'faux-corpus'
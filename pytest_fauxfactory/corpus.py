@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""Pre-generated strings stored on disk and memory mapped.
+
+A corpus file holds strings of a single type and length: a header with the
+number of strings, the offsets of each string and the UTF-8 encoded strings
+one after the other. Strings are decoded one at a time from a read-only
+memory map, so opening a corpus is instant whatever its size and processes
+reading the same file share its pages.
+"""
+import argparse
+import mmap
+import os
+import random
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from functools import lru_cache
+
+from pytest_fauxfactory.constants import CORPUS_DIRECTORY, STRING_TYPES
+from pytest_fauxfactory.rng import derive_seed
+from pytest_fauxfactory.strings import DEFAULT_LENGTH, gen_strings
+
+MAGIC = b'FAUXCRP1'
+HEADER = struct.Struct('<8sQ')
+OFFSET = struct.Struct('<Q')
+BOUNDS = struct.Struct('<QQ')
+
+DEFAULT_COUNT = 100000
+DEFAULT_DIRECTORY = CORPUS_DIRECTORY
+
+# Number of strings generated and written at once when building a corpus.
+CHUNK_SIZE = 4096
+
+
+def corpus_path(directory, str_type, length=None):
+    """Return the path of the corpus of ``str_type`` strings of ``length``.
+    """
+    return os.path.join(directory, '{}-{}.corpus'.format(
+        str_type, length or DEFAULT_LENGTH))
+
+
+def build_corpus(path, str_type, length=None, count=DEFAULT_COUNT,
+                 seed=None):
+    """Generate ``count`` strings and write them to the corpus at ``path``.
+    """
+    if count < 1:
+        raise ValueError(
+            'A corpus needs at least 1 string, got {}'.format(count))
+    rng = random.Random(seed)
+    offsets = array('Q', [0])
+    with tempfile.TemporaryFile(dir=os.path.dirname(path) or None) as blob:
+        for start in range(0, count, CHUNK_SIZE):
+            size = min(CHUNK_SIZE, count - start)
+            encoded = [
+                value.encode('utf-8', 'surrogatepass')
+                for value in gen_strings(
+                    rng, [str_type] * size, [length] * size)
+            ]
+            for value in encoded:
+                offsets.append(offsets[-1] + len(value))
+            blob.write(b''.join(encoded))
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+        blob.seek(0)
+        with open(path + '.tmp', 'wb') as handle:
+            handle.write(HEADER.pack(MAGIC, count))
+            handle.write(offsets.tobytes())
+            shutil.copyfileobj(blob, handle)
+    os.replace(path + '.tmp', path)
+
+
+class Corpus(object):
+    """Read-only sequence of the strings of a corpus file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as handle:
+            self.map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise ValueError('{} is not a corpus file'.format(path))
+        self.start = HEADER.size + OFFSET.size * (self.count + 1)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        start, stop = BOUNDS.unpack_from(
+            self.map, HEADER.size + OFFSET.size * index)
+        return self.map[self.start + start:self.start + stop].decode(
+            'utf-8', 'surrogatepass')
+
+
+@lru_cache(maxsize=None)
+def open_corpus(path):
+    """Return the corpus at ``path``, mapped once per process."""
+    return Corpus(path)
+
+
+def main(argv=None):
+    """Build the corpus files used by ``faux_string(source='corpus')``."""
+    parser = argparse.ArgumentParser(
+        prog='faux-corpus',
+        description='Pre-generate the strings sampled by faux_string marks '
+                    'using source=\'corpus\'.')
+    parser.add_argument(
+        'directory',
+        nargs='?',
+        default=DEFAULT_DIRECTORY,
+        help='Directory to write the corpus files to '
+             '(default: {}).'.format(DEFAULT_DIRECTORY))
+    parser.add_argument(
+        '--types',
+        nargs='+',
+        choices=STRING_TYPES,
+        default=list(STRING_TYPES),
+        help='String types to build a corpus for (default: all of them).')
+    parser.add_argument(
+        '--lengths',
+        nargs='+',
+        type=int,
+        default=[DEFAULT_LENGTH],
+        help='String lengths to build a corpus for '
+             '(default: {}).'.format(DEFAULT_LENGTH))
+    parser.add_argument(
+        '--count',
+        type=int,
+        default=DEFAULT_COUNT,
+        help='Number of strings per corpus (default: {}).'.format(
+            DEFAULT_COUNT))
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=None,
+        help='Seed used to generate the strings (default: random).')
+    options = parser.parse_args(argv)
+
+    os.makedirs(options.directory, exist_ok=True)
+    for str_type in options.types:
+        for length in options.lengths:
+            path = corpus_path(options.directory, str_type, length)
+            seed = None
+            if options.seed is not None:
+                seed = derive_seed(options.seed, str_type, length)
+            build_corpus(path, str_type, length, options.count, seed)
+            print('{}: {} strings, {} bytes'.format(
+                path, options.count, os.path.getsize(path)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Sampling of the rows of large JSON lines and CSV files.
+
+Rows are located by the offset of their line in the file, so only the
+offsets of the sampled rows are kept in memory and rows are read from a
+memory map when a value is needed. The offsets of every line can be stored
+in an index file, a packed array of 64 bit integers, so later runs pick rows
+without reading the whole file again.
+"""
+import csv
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from functools import lru_cache
+
+from pytest_fauxfactory.cache import atomic_write, touch
+
+FORMATS = {
+    '.csv': 'csv',
+    '.json': 'jsonl',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+OFFSET = struct.Struct('<Q')
+
+# Number of offsets buffered before being written to an index file.
+CHUNK_SIZE = 65536
+
+
+def get_format(path, file_format=None):
+    """Return the format of the file at ``path``, from its extension unless
+    ``file_format`` is given."""
+    if file_format is None:
+        file_format = FORMATS.get(os.path.splitext(path)[1].lower())
+    if file_format not in ('csv', 'jsonl'):
+        raise ValueError(
+            'Cannot tell the format of {}, use format=\'csv\' or '
+            'format=\'jsonl\''.format(path))
+    return file_format
+
+
+def iter_offsets(path, skip=0):
+    """Yield the offset of every non blank line of the file at ``path``
+    after the first ``skip`` lines."""
+    offset = 0
+    with open(path, 'rb') as handle:
+        for number, line in enumerate(handle):
+            if number >= skip and line.strip():
+                yield offset
+            offset += len(line)
+
+
+def index_path(directory, path, skip=0):
+    """Return the path of the index of the file at ``path``.
+
+    The name depends on the size and modification time of the file, so a
+    modified file gets a new index.
+    """
+    stat = os.stat(path)
+    key = hashlib.sha256(repr((
+        os.path.abspath(path), stat.st_size, stat.st_mtime_ns, skip,
+    )).encode('utf-8')).hexdigest()
+    return os.path.join(directory, 'rows-{}.index'.format(key))
+
+
+def build_index(path, index, skip=0):
+    """Write the offsets of the lines of the file at ``path`` to ``index``.
+    """
+    offsets = array('Q')
+    with atomic_write(index) as handle:
+        for offset in iter_offsets(path, skip):
+            offsets.append(offset)
+            if len(offsets) == CHUNK_SIZE:
+                write_offsets(handle, offsets)
+                del offsets[:]
+        write_offsets(handle, offsets)
+
+
+def write_offsets(handle, offsets):
+    """Write ``offsets`` as little endian integers."""
+    if sys.byteorder != 'little':
+        offsets = array('Q', offsets)
+        offsets.byteswap()
+    handle.write(offsets.tobytes())
+
+
+def sample_index(index, items, rng):
+    """Return the offsets of ``items`` lines picked by ``rng`` from the
+    ``index`` file, in file order."""
+    size = os.path.getsize(index)
+    lines = size // OFFSET.size
+    if not lines:
+        return []
+    with open(index, 'rb') as handle:
+        offsets = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            numbers = rng.sample(range(lines), min(items, lines))
+            return sorted(
+                OFFSET.unpack_from(offsets, number * OFFSET.size)[0]
+                for number in numbers)
+        finally:
+            offsets.close()
+
+
+def sample_stream(path, items, rng, skip=0):
+    """Return the offsets of ``items`` lines picked by ``rng`` while reading
+    the file at ``path`` once, in file order.
+
+    Reservoir sampling only keeps ``items`` offsets in memory whatever the
+    size of the file.
+    """
+    reservoir = []
+    for number, offset in enumerate(iter_offsets(path, skip)):
+        if number < items:
+            reservoir.append(offset)
+        else:
+            position = rng.randrange(number + 1)
+            if position < items:
+                reservoir[position] = offset
+    return sorted(reservoir)
+
+
+def sample_offsets(path, items, rng, skip=0, index_dir=None):
+    """Return the offsets of ``items`` lines of the file at ``path``.
+
+    With an ``index_dir``, lines are picked from an index built on first
+    use, otherwise the file is sampled as it is read.
+    """
+    if index_dir is None:
+        return sample_stream(path, items, rng, skip)
+    index = index_path(index_dir, path, skip)
+    try:
+        # Indexes are evicted with the cached values, least recently used
+        # first.
+        touch(index)
+    except FileNotFoundError:
+        build_index(path, index, skip)
+    return sample_index(index, items, rng)
+
+
+@lru_cache(maxsize=None)
+def open_map(path):
+    """Return a read only memory map of the file at ``path``, mapped once
+    per process."""
+    with open(path, 'rb') as handle:
+        return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def read_line(path, offset):
+    """Return the line starting at ``offset`` in the file at ``path``."""
+    data = open_map(path)
+    end = data.find(b'\n', offset)
+    if end == -1:
+        end = len(data)
+    return data[offset:end].decode('utf-8').rstrip('\r')
+
+
+@lru_cache(maxsize=None)
+def read_header(path):
+    """Return the column names of the CSV file at ``path``."""
+    with open(path, newline='', encoding='utf-8') as handle:
+        return next(csv.reader(handle), [])
+
+
+def parse_row(path, file_format, line):
+    """Return the row of a ``line`` of the file at ``path`` as a dict."""
+    if file_format == 'jsonl':
+        return json.loads(line)
+    return dict(zip(read_header(path), next(csv.reader([line]))))
@@ -0,0 +1,414 @@
+# -*- coding: utf-8 -*-
+"""Index addressable containers for the values generated by faux marks."""
+import pickle
+import random
+import time
+from itertools import islice, repeat
+
+from pytest_fauxfactory.helpers import value_digest
+from pytest_fauxfactory.profile import timed
+from pytest_fauxfactory.rng import (
+    derive_seed,
+    install_context_random,
+    seeded,
+)
+
+# Number of times an item is generated again before giving up on finding a
+# value distinct from the previous items.
+UNIQUE_ATTEMPTS = 100
+
+
+def take(iterable, max_items=None, time_budget=None):
+    """Return the values of ``iterable`` and whether the time ran out.
+
+    Values are consumed one at a time, stopping after ``max_items`` values
+    or once ``time_budget`` seconds have passed, so infinite iterables can be
+    used. A value taking longer than the budget cannot be interrupted.
+    """
+    if max_items is not None:
+        iterable = islice(iterable, max_items)
+    if time_budget is None:
+        return list(iterable), False
+    deadline = time.perf_counter() + time_budget
+    values = []
+    for value in iterable:
+        values.append(value)
+        if time.perf_counter() >= deadline:
+            return values, True
+    return values, False
+
+
+class Dataset(object):
+    """Values generated by a faux mark, addressable by item index.
+
+    ``factory`` receives the index of an item and returns its value, so any
+    item can be generated without generating the ones before it.
+
+    When ``seed`` is set, each item is generated with the random state seeded
+    from ``seed`` and its index. Datasets built with `from_iterable` are
+    ``materialized``: their values already exist and are not seeded.
+
+    ``spec`` holds the arguments the values were generated from, as
+    normalized by the mark handler. ``record`` is the profiling record values
+    generated at setup are accounted to, if any.
+
+    With a ``time_budget`` in seconds, values have to be generated with
+    `within_budget`. ``expired`` tells whether the budget ran out before all
+    the items were generated.
+
+    ``scope`` is the pytest scope the values are parametrized with, and
+    ``finalizer`` is called with each value once it is no longer used.
+    """
+
+    materialized = False
+    record = None
+    time_budget = None
+    expired = False
+    scope = None
+    finalizer = None
+
+    def __init__(self, items, factory, seed=None, spec=None):
+        self.items = items
+        self.factory = factory
+        self.seed = seed
+        self.spec = spec
+
+    def __len__(self):
+        return self.items
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.items:
+            raise IndexError(index)
+        return self.generate(index)
+
+    def __iter__(self):
+        for index in range(self.items):
+            yield self.generate(index)
+
+    def generate(self, index):
+        """Generate the value of item ``index``."""
+        if self.seed is None or self.materialized:
+            return self.factory(index)
+        with seeded(derive_seed(self.seed, index)):
+            return self.factory(index)
+
+    def regenerate(self, index, attempt):
+        """Generate another value of item ``index``, the ``attempt`` one.
+
+        Each attempt gets its own random state so generating an item again
+        gives the same values in the same order.
+        """
+        if self.seed is None:
+            return self.factory(index)
+        with seeded(derive_seed(self.seed, index, attempt)):
+            return self.factory(index)
+
+    def unique(self, workers=1, attempts=UNIQUE_ATTEMPTS):
+        """Return a materialized dataset of distinct values.
+
+        Values are compared by a 64 bit digest of their ``repr``, so only the
+        digests of the previous values are kept. An item equal to a previous
+        one is generated again up to ``attempts`` times, then `ValueError`
+        is raised. Values of materialized datasets cannot be generated again
+        and duplicates are dropped instead.
+        """
+        seen = set()
+        values = []
+        for index, value in enumerate(self.materialize(workers)):
+            digest = value_digest(value)
+            attempt = 0
+            while digest in seen:
+                if self.materialized:
+                    break
+                attempt += 1
+                if attempt > attempts:
+                    raise ValueError(
+                        'Could not generate {} unique values, item {} was '
+                        'still a duplicate after {} attempts'.format(
+                            self.items, index, attempts))
+                value = self.regenerate(index, attempt)
+                digest = value_digest(value)
+            else:
+                seen.add(digest)
+                values.append(value)
+        dataset = Dataset.from_iterable(values)
+        dataset.seed = self.seed
+        dataset.spec = self.spec
+        dataset.record = self.record
+        return dataset
+
+    def within_budget(self):
+        """Return a materialized dataset of the items generated, in order,
+        before ``time_budget`` ran out."""
+        values, expired = take(iter(self), self.items, self.time_budget)
+        return self._budgeted(values, expired)
+
+    def _budgeted(self, values, expired):
+        """Return a materialized dataset of ``values`` from this one."""
+        dataset = Dataset.from_iterable(values)
+        dataset.seed = self.seed
+        dataset.spec = self.spec
+        dataset.record = self.record
+        dataset.expired = expired and len(values) < self.items
+        return dataset
+
+    def materialize(self, workers=1):
+        """Return the list of all the values.
+
+        With more than one worker, items are generated in a process pool, or
+        a thread pool when the dataset cannot be pickled. Values are returned
+        in item order either way.
+        """
+        if workers <= 1 or self.materialized or self.items < 2:
+            return list(self)
+        return parallel_values(self, workers)
+
+    @classmethod
+    def from_iterable(cls, iterable):
+        """Build a dataset by draining ``iterable``.
+
+        Used for sources that can only be consumed in order, such as the
+        generators passed to `faux_generator`.
+        """
+        values = list(iterable)
+        dataset = cls(len(values), values.__getitem__)
+        dataset.materialized = True
+        return dataset
+
+
+class BlockDataset(Dataset):
+    """Dataset generating its items a block at a time.
+
+    ``block_factory(rng, start, stop)`` returns the values of items ``start``
+    to ``stop``, drawing from ``rng``: a `random.Random` seeded from the
+    dataset seed and the block number. Any item can still be generated by
+    only generating its block.
+    """
+
+    block_size = 256
+
+    def __init__(self, items, block_factory, seed=None, spec=None):
+        super(BlockDataset, self).__init__(items, None, seed, spec)
+        self.block_factory = block_factory
+        self._block = (None, None)
+
+    def block(self, number):
+        """Return the values of block ``number``, keeping the last one."""
+        # Read and replaced as a whole, so threads generating items of other
+        # blocks at the same time never get the values of the wrong block.
+        last, values = self._block
+        if last != number:
+            start = number * self.block_size
+            stop = min(start + self.block_size, self.items)
+            if self.seed is None:
+                rng = random.Random()
+            else:
+                rng = random.Random(derive_seed(self.seed, 'block', number))
+            values = self.block_factory(rng, start, stop)
+            self._block = (number, values)
+        return values
+
+    def generate(self, index):
+        """Generate the value of item ``index``."""
+        return self.block(index // self.block_size)[index % self.block_size]
+
+    def regenerate(self, index, attempt):
+        """Generate another value of item ``index``, the ``attempt`` one."""
+        if self.seed is None:
+            rng = random.Random()
+        else:
+            rng = random.Random(derive_seed(self.seed, index, attempt))
+        return self.block_factory(rng, index, index + 1)[0]
+
+    def __iter__(self):
+        blocks = -(-self.items // self.block_size)
+        for number in range(blocks):
+            for value in self.block(number):
+                yield value
+
+
+def _generate_range(dataset, start, stop):
+    """Generate the values of items ``start`` to ``stop``."""
+    # Worker processes load fauxfactory when unpickling the dataset.
+    install_context_random()
+    return [dataset.generate(index) for index in range(start, stop)]
+
+
+def parallel_values(dataset, workers):
+    """Generate all the values of ``dataset`` using ``workers`` workers."""
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    # A few chunks per worker to even out slow items, aligned on blocks so
+    # no block is generated twice.
+    block_size = getattr(dataset, 'block_size', 1)
+    size = -(-dataset.items // (workers * 4))
+    size = max(block_size, -(-size // block_size) * block_size)
+    starts = range(0, dataset.items, size)
+    stops = [min(start + size, dataset.items) for start in starts]
+    try:
+        pickle.dumps(dataset)
+    except Exception:
+        executor_class = ThreadPoolExecutor
+    else:
+        executor_class = ProcessPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        chunks = executor.map(_generate_range, repeat(dataset), starts, stops)
+        return [value for chunk in chunks for value in chunk]
+
+
+class LazySlot(object):
+    """Holds the value of a single dataset item once it is materialized."""
+
+    __slots__ = ('dataset', 'index', 'value', 'resolved')
+
+    def __init__(self, dataset, index):
+        self.dataset = dataset
+        self.index = index
+        self.value = None
+        self.resolved = False
+
+    def get(self):
+        """Generate the value on first access and return it."""
+        if not self.resolved:
+            record = self.dataset.record
+            with timed(record, 'generation_time'):
+                self.value = self.dataset[self.index]
+            self.resolved = True
+            if record is not None:
+                record.add_value(self.value)
+        return self.value
+
+    def clear(self):
+        """Drop the materialized value so it can be garbage collected.
+
+        The finalizer of the dataset, if any, is called with the value.
+        """
+        value, resolved = self.value, self.resolved
+        self.value = None
+        self.resolved = False
+        if resolved and self.dataset.finalizer is not None:
+            self.dataset.finalizer(value)
+
+
+class LazyValue(object):
+    """Placeholder parametrized in place of a generated value.
+
+    When several argnames are used, each argname gets its own placeholder
+    sharing the same slot and ``position`` selects its part of the value.
+    """
+
+    __slots__ = ('slot', 'position')
+
+    def __init__(self, slot, position=None):
+        self.slot = slot
+        self.position = position
+
+    def resolve(self):
+        """Return the generated value this placeholder stands for."""
+        value = self.slot.get()
+        if self.position is None:
+            return value
+        return value[self.position]
+
+    def release(self):
+        """Forget the generated value once the test item is done."""
+        self.slot.clear()
+
+    def __eq__(self, other):
+        """Placeholders are equal when they stand for the same value: the
+        same item, or the same object for values generated beforehand."""
+        if not isinstance(other, LazyValue):
+            return NotImplemented
+        if self.position != other.position:
+            return False
+        if self.slot is other.slot:
+            return True
+        return (self.slot.dataset.materialized and
+                other.slot.dataset.materialized and
+                self.slot.get() is other.slot.get())
+
+    def __hash__(self):
+        if self.slot.dataset.materialized:
+            return hash((id(self.slot.get()), self.position))
+        return hash((id(self.slot), self.position))
+
+    def __repr__(self):
+        return '<LazyValue index={}>'.format(self.slot.index)
+
+
+def lazy_values(dataset, arity=1, indices=None):
+    """Return placeholders for the items of ``dataset``.
+
+    ``arity`` is the number of argnames being parametrized and ``indices``
+    the items to use, all of them by default.
+    """
+    if indices is None:
+        indices = range(len(dataset))
+    slots = (LazySlot(dataset, index) for index in indices)
+    if arity == 1:
+        return [LazyValue(slot) for slot in slots]
+    return [
+        tuple(LazyValue(slot, position) for position in range(arity))
+        for slot in slots
+    ]
+
+
+class Batch(object):
+    """Items ``start`` to ``stop`` of ``values``, run by a single test item.
+    """
+
+    __slots__ = ('values', 'start', 'stop')
+
+    def __init__(self, values, start, stop):
+        self.values = values
+        self.start = start
+        self.stop = stop
+
+    def __iter__(self):
+        """Yield the index and value of every item in the batch."""
+        for index in range(self.start, self.stop):
+            yield index, self.values[index]
+
+
+class BatchValue(object):
+    """Placeholder parametrized in place of a batch of values.
+
+    When several argnames are used, ``position`` selects the part of each
+    value an argname receives.
+    """
+
+    __slots__ = ('batch', 'position')
+
+    def __init__(self, batch, position=None):
+        self.batch = batch
+        self.position = position
+
+    def pick(self, value):
+        """Return the part of ``value`` this placeholder stands for."""
+        if self.position is None:
+            return value
+        return value[self.position]
+
+    def __repr__(self):
+        return '<BatchValue {}-{}>'.format(
+            self.batch.start, self.batch.stop - 1)
+
+
+def batch_values(values, size, arity=1, starts=None):
+    """Return placeholders splitting ``values`` in batches of ``size`` items.
+
+    ``values`` can be a dataset, in which case values are generated when the
+    batches run. ``starts`` holds the first index of the batches to use, all
+    of them by default.
+    """
+    if starts is None:
+        starts = range(0, len(values), size)
+    batches = (
+        Batch(values, start, min(start + size, len(values)))
+        for start in starts
+    )
+    if arity == 1:
+        return [BatchValue(batch) for batch in batches]
+    return [
+        tuple(BatchValue(batch, position) for position in range(arity))
+        for batch in batches
+    ]
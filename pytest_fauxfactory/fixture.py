@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Values generated on demand by the `faux` fixture."""
+import random
+
+from pytest_fauxfactory.handlers import MARK_HANDLERS, apply_time_budget
+from pytest_fauxfactory.rng import derive_seed, seeded
+
+
+class Faux(object):
+    """Generate values while a test runs, seeded for that test.
+
+    Each draw is seeded from ``seed`` and the number of draws made before
+    it, so a test gets the same values for the same seed whatever the other
+    tests do. Values are generated by the mark handlers and only live as long
+    as the test keeps them. ``random`` is a `random.Random` seeded for the
+    test, and ``corpus_dir`` the directory of the corpora sampled with
+    ``source='corpus'``.
+    """
+
+    def __init__(self, seed, corpus_dir=None):
+        self.seed = seed
+        self.corpus_dir = corpus_dir
+        self.draws = 0
+        self.random = random.Random(derive_seed(seed, 'random'))
+
+    def _values(self, name, args, kwargs):
+        """Return the values of mark ``name`` with ``args`` and ``kwargs``."""
+        settings = {}
+        if kwargs.get('source') == 'corpus' and self.corpus_dir:
+            settings['corpus_dir'] = self.corpus_dir
+        seed = derive_seed(self.seed, self.draws)
+        self.draws += 1
+        with seeded(seed):
+            data = MARK_HANDLERS[name](args, kwargs, settings)
+        data.seed = seed
+        return apply_time_budget(name, data).materialize()
+
+    def string(self, str_type=None, length=None, **kwargs):
+        """Return a string of ``str_type``, a random type by default."""
+        if length is not None:
+            kwargs['length'] = length
+        return self._values('faux_string', (1, str_type), kwargs)[0]
+
+    def call(self, factory, *args, **kwargs):
+        """Return the value returned by ``factory(*args, **kwargs)``."""
+        return self._values('faux_callable', (1, factory) + args, kwargs)[0]
+
+    def batch(self, items, source=None, *args, **kwargs):
+        """Return a list of ``items`` values.
+
+        Values are returned by ``source`` when it is callable, like `call`
+        does, or are strings of type ``source`` otherwise, like `string`.
+        """
+        if callable(source):
+            return self._values(
+                'faux_callable', (items, source) + args, kwargs)
+        return self._values('faux_string', (items, source) + args, kwargs)
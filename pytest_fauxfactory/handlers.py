@@ -1,14 +1,105 @@
 # -*- coding: utf-8 -*-
 """Methods to handle specific pytest marks."""
-from inspect import isgenerator
+import os
+import time
+import warnings
+from inspect import (
+    isasyncgenfunction,
+    iscoroutinefunction,
+    isgenerator,
+    signature,
+)
 
 import pytest
 
 from pytest_fauxfactory.constants import STRING_TYPES
-from pytest_fauxfactory.marks import faux_callable, faux_generator, faux_string
+from pytest_fauxfactory.dataset import (
+    BlockDataset,
+    Dataset,
+    take,
+)
+from pytest_fauxfactory.helpers import get_argnames
+from pytest_fauxfactory.marks import (
+    RECORD_COLUMNS,
+    faux_callable_factory,
+    faux_corpus_factory,
+    faux_corpus_paths,
+    faux_dataset_sample,
+    faux_generator,
+    faux_pattern_factory,
+    faux_record_factory,
+    faux_string_factory,
+)
 
+# Items a faux_generator mark with a time budget but no max_items stops at:
+# a fast infinite generator yields far more values within any budget than
+# tests can be collected for.
+BUDGET_MAX_ITEMS = 10000
 
-def callable_mark_handler(args, kwargs):
+
+def check_positive_int(name, value):
+    """Make sure the ``name`` mark option is an integer greater than 0."""
+    if not isinstance(value, int) or value < 1:
+        raise pytest.UsageError(
+            'Mark expected {} to be an integer greater than 0, got {}'.format(
+                name, value))
+
+
+def check_positive_number(name, value):
+    """Make sure the ``name`` mark option is a number greater than 0."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or (
+            value <= 0):
+        raise pytest.UsageError(
+            'Mark expected {} to be a number greater than 0, got {}'.format(
+                name, value))
+
+
+def warn_time_budget(name, values, time_budget, items=None):
+    """Report that the time budget of mark ``name`` ran out."""
+    produced = len(values)
+    if items is not None:
+        produced = '{} of {}'.format(produced, items)
+    warnings.warn(pytest.PytestWarning(
+        '{} generated {} items before its time budget of {}s ran out'.format(
+            name, produced, time_budget)))
+
+
+def apply_time_budget(name, data):
+    """Return ``data`` generated within its time budget, if it has one."""
+    if data.time_budget is None:
+        return data
+    values = data.within_budget()
+    if values.expired:
+        warn_time_budget(name, values, data.time_budget, data.items)
+    return values
+
+
+def scale_items(items, settings=None):
+    """Return the number of items to generate instead of ``items``.
+
+    ``items`` is multiplied by the ``scale`` setting, rounded and kept
+    between the ``min_items`` and ``max_items`` settings. At least one item
+    is always generated.
+    """
+    settings = settings or {}
+    scale = settings.get('scale', 1)
+    min_items = settings.get('min_items', 1)
+    max_items = settings.get('max_items')
+    check_positive_number('scale', scale)
+    check_positive_int('min_items', min_items)
+    if max_items is not None:
+        check_positive_int('max_items', max_items)
+        if max_items < min_items:
+            raise pytest.UsageError(
+                'Mark expected max_items to be at least min_items, '
+                'got {} and {}'.format(max_items, min_items))
+    items = max(int(round(items * scale)), min_items)
+    if max_items is not None:
+        items = min(items, max_items)
+    return items
+
+
+def callable_mark_handler(args, kwargs, settings=None):
     """"pytest faux_callable mark handler"""
     usage_message = (
         'usage: faux_callable(items, callable_function, *args, **kwargs)'
@@ -32,11 +123,91 @@ def callable_mark_handler(args, kwargs):
         raise pytest.UsageError(
             'Mark expected a callable function, got a {}: {}'.format(
                 type(callable_function), callable_function))
+    items = scale_items(items, settings)
+
+    concurrency = kwargs.pop('concurrency', None)
+    if concurrency is not None:
+        check_positive_int('concurrency', concurrency)
+        if not iscoroutinefunction(callable_function):
+            raise pytest.UsageError(
+                'Mark only accepts concurrency with a coroutine function, '
+                'got {}'.format(callable_function))
+    time_budget = kwargs.pop('time_budget', None)
+    if time_budget is not None:
+        check_positive_number('time_budget', time_budget)
+
+    if isasyncgenfunction(callable_function):
+        from pytest_fauxfactory.asynchronous import collect_async
+        start = time.perf_counter()
+        values = collect_async(
+            callable_function(*args[2:], **kwargs), items, time_budget)
+        if (time_budget is not None and len(values) < items and
+                time.perf_counter() - start >= time_budget):
+            warn_time_budget('faux_callable', values, time_budget, items)
+        return Dataset.from_iterable(values)
+
+    spec = (items, callable_function, args[2:], kwargs)
+    factory = faux_callable_factory(callable_function, *args[2:], **kwargs)
+    if iscoroutinefunction(callable_function):
+        from pytest_fauxfactory.asynchronous import AsyncDataset
+        dataset = AsyncDataset(
+            items, factory, spec=spec, concurrency=concurrency)
+    else:
+        dataset = Dataset(items, factory, spec=spec)
+    dataset.time_budget = time_budget
+    return dataset
+
+
+def dataset_mark_handler(args, kwargs, settings=None):
+    """"pytest faux_dataset mark handler"""
+    usage_message = (
+        'usage: faux_dataset(path, items, fields=None, format=None)'
+    )
+
+    if len(args) < 2:
+        raise pytest.UsageError(
+            'Missing arguments: {0}'.format(usage_message)
+        )
+
+    path, items = args[0:2]
+    if not isinstance(items, int):
+        raise pytest.UsageError(
+            'Mark expected an integer, got a {}: {}'.format(
+                type(items), items))
+    if items < 1:
+        raise pytest.UsageError(
+            'Mark expected an integer greater than 0, got {}'.format(
+                items))
+    items = scale_items(items, settings)
+
+    settings = settings or {}
+    path = os.path.join(settings.get('base_dir', ''), str(path))
+    index_dir = settings.get('index_dir')
+    fields = kwargs.pop('fields', None)
+    if fields is not None:
+        fields = get_argnames(fields)
+    file_format = kwargs.pop('format', None)
+    if kwargs:
+        raise pytest.UsageError(
+            'Unknown options {}: {}'.format(
+                ', '.join(sorted(kwargs)), usage_message))
+    if not os.path.isfile(path):
+        raise pytest.UsageError('Dataset file {} not found'.format(path))
 
-    return faux_callable(items, callable_function, *args[2:], **kwargs)
+    stat = os.stat(path)
+    spec = (
+        os.path.abspath(path), stat.st_size, stat.st_mtime_ns, items, fields,
+        file_format)
+    # The random generator is seeded for the test, so rows are sampled the
+    # same way for the same seed.
+    try:
+        return faux_dataset_sample(
+            path, items, fields, file_format, index_dir, spec)
+    except ValueError as error:
+        raise pytest.UsageError(str(error))
 
 
-def generator_mark_handler(args, kwargs=None):
+def generator_mark_handler(args, kwargs=None, settings=None):
     """"pytest faux_generator mark handler."""
     usage_message = 'usage: faux_generator(generator)'
 
@@ -51,10 +222,91 @@ def generator_mark_handler(args, kwargs=None):
                 .format(index, usage_message)
             )
 
-    return faux_generator(*args)
+    kwargs = kwargs or {}
+    time_budget = kwargs.pop('time_budget', None)
+    if time_budget is not None:
+        check_positive_number('time_budget', time_budget)
+    settings = settings or {}
+    max_items = settings.get('max_items')
+    if max_items is not None:
+        check_positive_int('max_items', max_items)
+    capped = time_budget is not None and max_items is None
+    if capped:
+        max_items = BUDGET_MAX_ITEMS
+
+    # Values are drawn one at a time so infinite generators can be bounded.
+    values, expired = take(faux_generator(*args), max_items, time_budget)
+    if expired:
+        warn_time_budget('faux_generator', values, time_budget)
+    elif capped and len(values) == max_items:
+        warnings.warn(pytest.PytestWarning(
+            'faux_generator stopped at {} items, the limit of marks with a '
+            'time_budget but no max_items. Set max_items to generate more.'
+            .format(max_items)))
+    if settings:
+        # Generators cannot yield more values than they have.
+        values = values[:scale_items(len(values), settings)]
+    return Dataset.from_iterable(values)
+
+
+def record_mark_handler(args, kwargs, settings=None):
+    """"pytest faux_record mark handler"""
+    usage_message = 'usage: faux_record(items, schema)'
+
+    if 'schema' in kwargs:
+        args = tuple(args) + (kwargs.pop('schema'),)
+    if len(args) != 2:
+        raise pytest.UsageError(
+            'Missing arguments: {}'.format(usage_message))
+    items, schema = args
+    check_positive_int('items', items)
+    items = scale_items(items, settings)
+    if kwargs:
+        raise pytest.UsageError(
+            'Unknown options {}: {}'.format(
+                ', '.join(sorted(kwargs)), usage_message))
+    if not isinstance(schema, dict) or not schema:
+        raise pytest.UsageError(
+            'Mark expected schema to be a dict of columns, got {}'.format(
+                schema))
+    for name, spec in schema.items():
+        check_record_column(name, spec)
+
+    return BlockDataset(
+        items, faux_record_factory(schema), spec=(items, schema))
 
 
-def string_mark_handler(args, kwargs):
+def check_record_column(name, spec):
+    """Check the ``spec`` of column ``name`` of a faux_record schema."""
+    if isinstance(spec, str):
+        spec = (spec,)
+    if not isinstance(spec, (list, tuple)) or not spec:
+        raise pytest.UsageError(
+            'Column {} expected a kind and its parameters, got {}'.format(
+                name, spec))
+    kind, params = spec[0], tuple(spec[1:])
+    if kind in RECORD_COLUMNS:
+        try:
+            signature(RECORD_COLUMNS[kind]).bind(None, 0, *params)
+        except TypeError:
+            raise pytest.UsageError(
+                'Column {} got invalid parameters for {}: {}'.format(
+                    name, kind, params))
+    elif kind in STRING_TYPES:
+        if len(params) > 1:
+            raise pytest.UsageError(
+                'Column {} only accepts a length for {} strings, got '
+                '{}'.format(name, kind, params))
+        if params:
+            check_positive_int('length', params[0])
+    else:
+        raise pytest.UsageError(
+            'Column {} has an unknown kind {}, expected one of {}'.format(
+                name, kind,
+                ', '.join(sorted(RECORD_COLUMNS) + list(STRING_TYPES))))
+
+
+def string_mark_handler(args, kwargs, settings=None):
     """"pytest faux_string mark handler"""
     # We should have at least the first 2 arguments to faux_string
     if len(args) == 0:
@@ -75,12 +327,72 @@ def string_mark_handler(args, kwargs):
         raise pytest.UsageError(
             'Mark expected an integer greater than 0, got {}'.format(
                 items))
+    items = scale_items(items, settings)
+
+    spec = (items, str_type, args[2:], dict(kwargs))
+    source = kwargs.pop('source', None)
+    corpus_dir = (settings or {}).get('corpus_dir')
+    pattern = kwargs.pop('pattern', None)
+    if pattern is not None:
+        return BlockDataset(
+            items,
+            pattern_factory(pattern, str_type, source, args[2:], kwargs),
+            spec=spec)
+    if source == 'corpus':
+        return BlockDataset(
+            items,
+            corpus_factory(str_type, args[2:], kwargs, corpus_dir),
+            spec=spec)
+    if source is not None:
+        raise pytest.UsageError(
+            "Mark expected source to be 'corpus', got {}".format(source))
+    return BlockDataset(
+        items,
+        faux_string_factory(str_type, *args[2:], **kwargs),
+        spec=spec)
 
-    return faux_string(items, str_type, *args[2:], **kwargs)
+
+def pattern_factory(pattern, str_type, source, args, kwargs):
+    """Return the factory of strings matching ``pattern``, making sure it
+    is supported."""
+    if not isinstance(pattern, str):
+        raise pytest.UsageError(
+            'Mark expected pattern to be a string, got {}'.format(pattern))
+    if str_type is not None or source is not None or args or kwargs:
+        raise pytest.UsageError(
+            'Mark does not accept a string type, source or other options '
+            'with a pattern, got {} {} {} {}'.format(
+                str_type, source, args, kwargs))
+    try:
+        return faux_pattern_factory(pattern)
+    except ValueError as error:
+        raise pytest.UsageError('Unsupported pattern: {}'.format(error))
+
+
+def corpus_factory(str_type, args, kwargs, corpus_dir):
+    """Return the factory of strings sampled from the corpora of
+    ``corpus_dir``, making sure they were built."""
+    length = kwargs.pop('length', None)
+    if args or kwargs:
+        raise pytest.UsageError(
+            'Mark only accepts a string type and length with '
+            "source='corpus', got {} {}".format(args, kwargs))
+    paths = faux_corpus_paths(corpus_dir, str_type, length)
+    for path in paths:
+        if not os.path.exists(path):
+            raise pytest.UsageError(
+                'Missing corpus file {}, build it with the faux-corpus '
+                'command'.format(path))
+    return faux_corpus_factory(paths)
 
 
+# Handlers take the mark arguments and keywords, and the settings the plugin
+# adds: the scale, min_items and max_items bounding the number of items, and
+# the base_dir, index_dir and corpus_dir files are looked up in.
 MARK_HANDLERS = {
     'faux_callable': callable_mark_handler,
+    'faux_dataset': dataset_mark_handler,
     'faux_generator': generator_mark_handler,
+    'faux_record': record_mark_handler,
     'faux_string': string_mark_handler,
 }
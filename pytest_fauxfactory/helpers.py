@@ -1,18 +1,223 @@
 # -*- coding: utf-8 -*-
 """Provides helper methods to pytest-fauxfactory."""
+import argparse
+import hashlib
+import os
+import re
+from functools import partial
 
 
-def generate_ids(data, func_name):
-    """Generate IDs for parametrize method."""
+def generate_ids(data, func_name, indices=None):
+    """Generate IDs for parametrize method.
+
+    IDs always use the index of an item in the whole dataset, even when only
+    some ``indices`` are parametrized.
+    """
+    if indices is None:
+        indices = range(len(data))
     return [
         '{}_{}'.format(func_name, idx)
         for idx
-        in range(len(data))
+        in indices
+    ]
+
+
+def generate_batch_ids(items, size, func_name, starts=None):
+    """Generate IDs for parametrize method when values run in batches."""
+    if starts is None:
+        starts = range(0, items, size)
+    return [
+        '{}_{}-{}'.format(func_name, start, min(start + size, items) - 1)
+        for start
+        in starts
     ]
 
 
-def get_mark_function(metafunc):
-    """Extract the name of the function being called."""
-    for key in metafunc.function.__dict__:
-        if key.lower().startswith('faux'):
-            return getattr(metafunc.function, key)
+def parse_shard(value):
+    """Parse a ``--faux-shard`` value such as ``2/4`` into ``(2, 4)``."""
+    match = re.match(r'^(\d+)/(\d+)$', value)
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise argparse.ArgumentTypeError(
+            'expected i/n with 1 <= i <= n, got {}'.format(value))
+    return int(match.group(1)), int(match.group(2))
+
+
+def parse_selected_ids(args, invocation_dir):
+    """Return the parametrize IDs selected by command line arguments.
+
+    Keys are the test file path and the test name within the file, values
+    the set of IDs given between brackets, or ``None`` when the whole test
+    is selected.
+    """
+    selected = {}
+    for arg in args:
+        path, sep, names = arg.partition('::')
+        if not sep:
+            continue
+        name, bracket, param_id = names.partition('[')
+        key = (os.path.normpath(os.path.join(str(invocation_dir), path)), name)
+        if not bracket or not param_id.endswith(']'):
+            selected[key] = None
+        elif selected.get(key, set()) is not None:
+            selected.setdefault(key, set()).add(param_id[:-1])
+    return selected
+
+
+def parse_index(param_id, func_name):
+    """Return the item index in a parametrize ID, ``None`` if it has none.
+
+    For batch IDs the index of the first item of the batch is returned.
+    """
+    match = re.match(
+        r'^{}_(\d+)(?:-\d+)?$'.format(re.escape(func_name)), param_id)
+    if match:
+        return int(match.group(1))
+    return None
+
+
+def get_mark_functions(metafunc):
+    """Extract the faux marks applied to the function being called.
+
+    Marks are returned closest first, bottom to top when stacked on the same
+    node. A mark parametrizing an argname of a mark of a closer node, such as
+    a module mark overridden by a function mark, is left out.
+    """
+    marks = []
+    owners = {}
+    for node, mark in metafunc.definition.iter_markers_with_node():
+        if not mark.name.lower().startswith('faux'):
+            continue
+        argnames = get_argnames(
+            mark.kwargs.get('argnames', default_argnames(mark)))
+        if any(owners.get(name, node) is not node for name in argnames):
+            continue
+        for name in argnames:
+            owners.setdefault(name, node)
+        marks.append(mark)
+    return marks
+
+
+def default_argnames(mark):
+    """Return the argnames parametrized by ``mark`` when it does not set
+    them: the columns of a `faux_record` schema, ``value`` otherwise."""
+    if mark.name == 'faux_record':
+        schema = mark.kwargs.get(
+            'schema', mark.args[1] if len(mark.args) > 1 else None)
+        if isinstance(schema, dict) and schema:
+            return ', '.join(schema)
+    return 'value'
+
+
+def get_argnames(argnames):
+    """Return the argument names as a list, as parametrize understands them.
+    """
+    if isinstance(argnames, str):
+        return [name.strip() for name in argnames.split(',') if name.strip()]
+    return list(argnames)
+
+
+def normalize(value, identity=False, strict=False):
+    """Return a representation of ``value`` that is stable across runs.
+
+    Functions and classes are represented by their import path, functions
+    also by the line they start at, a digest of their code and the values
+    they close over, so the lambdas of a module, the closures of a factory
+    or the versions of an edited function differ. Partials are
+    represented by their function and arguments, containers are normalized
+    recursively and anything else by its ``repr``. With ``identity`` set,
+    callables are represented by their id instead, which only holds for the
+    session. With ``strict`` set, objects with the default ``repr``, which
+    holds their address, raise `ValueError`.
+    """
+    if isinstance(value, (list, tuple)):
+        return type(value)(
+            normalize(item, identity, strict) for item in value)
+    if isinstance(value, dict):
+        return sorted(
+            (normalize(key, identity, strict),
+             normalize(item, identity, strict))
+            for key, item in value.items())
+    if callable(value) and identity:
+        return 'id:{}'.format(id(value))
+    if isinstance(value, partial):
+        return (
+            'partial',
+            normalize(value.func, identity, strict),
+            normalize(value.args, identity, strict),
+            normalize(value.keywords, identity, strict),
+        )
+    if callable(value) and hasattr(value, '__qualname__'):
+        name = '{}.{}'.format(value.__module__, value.__qualname__)
+        code = getattr(value, '__code__', None)
+        if code is None:
+            return name
+        return (name, code.co_firstlineno, code_digest(code), tuple(
+            # Functions closed over are only named, a recursive closure
+            # holds itself.
+            cell_name(cell) or normalize(cell.cell_contents, identity, strict)
+            for cell in value.__closure__ or ()))
+    if strict and type(value).__repr__ is object.__repr__:
+        raise ValueError(
+            '{!r} has no representation stable across runs'.format(value))
+    return repr(value)
+
+
+def code_digest(code):
+    """Return a digest of the bytecode, constants and names of ``code``."""
+    digest = hashlib.sha256(code.co_code)
+    for const in code.co_consts:
+        if isinstance(const, type(code)):
+            # Nested functions, whose repr holds their address.
+            const = code_digest(const)
+        elif isinstance(const, frozenset):
+            # Ordered by hash, which changes between runs for strings.
+            const = sorted(repr(item) for item in const)
+        digest.update(repr(const).encode('utf-8', 'surrogatepass'))
+    digest.update(repr(code.co_names).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def cell_name(cell):
+    """Return the name of the function held by closure ``cell``, ``None``
+    for other values."""
+    try:
+        contents = cell.cell_contents
+    except ValueError:
+        # Not assigned yet.
+        return '<empty>'
+    if callable(contents) and hasattr(contents, '__qualname__'):
+        return '{}.{}'.format(contents.__module__, contents.__qualname__)
+    return None
+
+
+def value_digest(value):
+    """Return a 64 bit integer identifying ``value`` by its ``repr``."""
+    return int.from_bytes(
+        hashlib.blake2b(
+            repr(value).encode('utf-8', 'surrogatepass'),
+            digest_size=8).digest(),
+        'big')
+
+
+def spec_key(*parts):
+    """Return a digest identifying the data generated from ``parts``."""
+    return hashlib.sha256(
+        repr(normalize(parts)).encode('utf-8')).hexdigest()
+
+
+def cache_key(*parts):
+    """Return a digest identifying the data generated from ``parts`` across
+    runs, ``None`` when some part cannot be identified across runs, such as
+    an object with the default ``repr``."""
+    try:
+        normalized = normalize(parts, strict=True)
+    except ValueError:
+        return None
+    return hashlib.sha256(repr(normalized).encode('utf-8')).hexdigest()
+
+
+def session_key(*parts):
+    """Return a digest identifying the data generated from ``parts`` during
+    the session, telling apart distinct callables with the same name."""
+    return hashlib.sha256(
+        repr(normalize(parts, identity=True)).encode('utf-8')).hexdigest()
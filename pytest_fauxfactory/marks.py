@@ -1,18 +1,109 @@
 # -*- coding: utf-8 -*-
 """FauxFactory specific marks methods."""
-from itertools import chain, cycle
+from functools import partial
+from inspect import isasyncgenfunction, iscoroutinefunction
+from itertools import chain
 
 import fauxfactory
 
 from pytest_fauxfactory.constants import STRING_TYPES
+from pytest_fauxfactory.corpus import (
+    DEFAULT_DIRECTORY,
+    corpus_path,
+    open_corpus,
+)
+from pytest_fauxfactory.datafile import (
+    get_format,
+    parse_row,
+    read_line,
+    sample_offsets,
+)
+from pytest_fauxfactory.dataset import BlockDataset, Dataset
+from pytest_fauxfactory.patterns import compile_pattern, gen_matching
+from pytest_fauxfactory.rng import current_random
+from pytest_fauxfactory.strings import gen_strings
+
+
+def _call(callable_func, args, kwargs, index):
+    """Return the value of an item generated by ``callable_func``."""
+    return callable_func(*args, **kwargs)
+
+
+def faux_callable_factory(callable_func, *args, **kwargs):
+    """Return a function generating the value of a given item index.
+
+    The function can be pickled whenever ``callable_func`` and its arguments
+    can, so items can be generated in other processes.
+    """
+    return partial(_call, callable_func, args, kwargs)
 
 
 def faux_callable(items, callable_func, *args, **kwargs):
-    """Generate new values from callable object."""
+    """Generate new values from callable object.
+
+    Coroutine functions are called ``items`` times concurrently, while async
+    generator functions are called once and their first ``items`` values
+    are used.
+    """
     if items is None:
         items = 1
-    for _ in range(items):
-        yield callable_func(*args, **kwargs)
+    if isasyncgenfunction(callable_func):
+        from pytest_fauxfactory.asynchronous import collect_async
+        return iter(collect_async(callable_func(*args, **kwargs), items))
+    factory = faux_callable_factory(callable_func, *args, **kwargs)
+    if iscoroutinefunction(callable_func):
+        from pytest_fauxfactory.asynchronous import AsyncDataset
+        return iter(AsyncDataset(items, factory))
+    return iter(Dataset(items, factory))
+
+
+def _read_row(path, file_format, offsets, fields, index):
+    """Return the row of item ``index``, keeping only ``fields`` if set.
+
+    A row without one of the ``fields`` raises `ValueError`.
+    """
+    row = parse_row(path, file_format, read_line(path, offsets[index]))
+    if fields is not None:
+        for field in fields:
+            if field not in row:
+                raise ValueError(
+                    'Row at offset {} of {} has no field {}'.format(
+                        offsets[index], path, field))
+        row = {field: row[field] for field in fields}
+    return row
+
+
+def faux_dataset_factory(path, file_format, offsets, fields=None):
+    """Return a function reading the row of a given item index.
+
+    ``offsets`` holds the offset of the line of each item. The function can
+    be pickled, and files are memory mapped once per process.
+    """
+    return partial(_read_row, path, file_format, offsets, fields)
+
+
+def faux_dataset_sample(path, items, fields=None, file_format=None,
+                        index_dir=None, spec=None):
+    """Return a `Dataset` of ``items`` rows sampled from a JSON lines or CSV
+    file.
+
+    An unknown format, or ``fields`` missing from the first row, raise
+    `ValueError` right away.
+    """
+    file_format = get_format(path, file_format)
+    offsets = sample_offsets(
+        path, items, current_random(), int(file_format == 'csv'),
+        index_dir)
+    factory = faux_dataset_factory(path, file_format, offsets, fields)
+    if offsets and fields is not None:
+        factory(0)
+    return Dataset(len(offsets), factory, spec=spec)
+
+
+def faux_dataset(path, items, fields=None, file_format=None, index_dir=None):
+    """Generate rows sampled from a JSON lines or CSV file."""
+    return iter(faux_dataset_sample(
+        path, items, fields, file_format, index_dir))
 
 
 def faux_generator(*args):
@@ -20,26 +111,186 @@ def faux_generator(*args):
     return chain.from_iterable(args)
 
 
-def faux_string(items, str_type=None, *args, **kwargs):
-    """Generate a new string type."""
-    item = 0
+def _int_column(rng, size, min_value, max_value):
+    """Return ``size`` integers between ``min_value`` and ``max_value``."""
+    return rng.choices(range(min_value, max_value + 1), k=size)
+
+
+def _float_column(rng, size, min_value=0.0, max_value=1.0):
+    """Return ``size`` floats between ``min_value`` and ``max_value``."""
+    scale = max_value - min_value
+    return [min_value + scale * rng.random() for _ in range(size)]
+
+
+def _bool_column(rng, size):
+    """Return ``size`` booleans."""
+    return rng.choices((False, True), k=size)
+
+
+def _choice_column(rng, size, choices):
+    """Return ``size`` values picked from ``choices``."""
+    return rng.choices(list(choices), k=size)
+
+
+# Column kinds of faux_record schemas besides the string types, with the
+# function generating a whole column at once.
+RECORD_COLUMNS = {
+    'bool': _bool_column,
+    'choice': _choice_column,
+    'float': _float_column,
+    'int': _int_column,
+}
+
+
+def _record_column(rng, size, kind, params):
+    """Return the ``size`` values of a column of ``kind``."""
+    if kind in RECORD_COLUMNS:
+        return RECORD_COLUMNS[kind](rng, size, *params)
+    length = params[0] if params else None
+    return gen_strings(rng, [kind] * size, [length] * size)
+
+
+def _record_block(columns, rng, start, stop):
+    """Return the records of items ``start`` to ``stop``.
+
+    Each column is generated at once and the columns are only zipped into
+    records at the end. Records of a single column are plain values.
+    """
+    values = [
+        _record_column(rng, stop - start, kind, params)
+        for kind, params in columns
+    ]
+    if len(values) == 1:
+        return values[0]
+    return list(zip(*values))
+
 
+def faux_record_factory(schema):
+    """Return a block factory generating the records of a range of items.
+
+    ``schema`` maps column names to a column kind, a string type or one of
+    `RECORD_COLUMNS`, optionally followed by its parameters in a tuple such
+    as ``('alpha', 12)`` or ``('int', 18, 99)``. The factory can be pickled.
+    """
+    columns = []
+    for spec in schema.values():
+        if isinstance(spec, str):
+            spec = (spec,)
+        columns.append((spec[0], tuple(spec[1:])))
+    return partial(_record_block, tuple(columns))
+
+
+def faux_record(items, schema):
+    """Generate records with the columns of ``schema``."""
+    return iter(BlockDataset(items, faux_record_factory(schema)))
+
+
+def _match_block(pattern, rng, start, stop):
+    """Return strings matching ``pattern`` for items ``start`` to ``stop``.
+    """
+    return gen_matching(rng, pattern, stop - start)
+
+
+def faux_pattern_factory(pattern):
+    """Return a block factory generating strings matching ``pattern``.
+
+    The pattern is compiled right away, so an unsupported pattern raises
+    `ValueError` here. The factory can be pickled.
+    """
+    compile_pattern(pattern)
+    return partial(_match_block, pattern)
+
+
+def _string_block(str_types, lengths, args, kwargs, rng, start, stop):
+    """Return the strings of items ``start`` to ``stop``, cycling through
+    ``str_types`` and ``lengths``."""
+    return gen_strings(
+        rng,
+        [str_types[index % len(str_types)] for index in range(start, stop)],
+        [lengths[index % len(lengths)] for index in range(start, stop)],
+        *args,
+        **kwargs
+    )
+
+
+def faux_string_factory(str_type=None, *args, **kwargs):
+    """Return a block factory generating the strings of a range of items.
+
+    String types and lengths given as lists are cycled through, so item
+    ``index`` uses ``str_type[index % len(str_type)]``. The factory can be
+    pickled when its arguments can.
+    """
     if not str_type:
         str_type = fauxfactory.gen_choice(STRING_TYPES)
-
     if not isinstance(str_type, list):
         str_type = [str_type]
-    str_cycle = cycle(str_type)
 
-    length = kwargs.get('length', None)
+    length = kwargs.pop('length', None)
     if not length:
         length = [None]
     if not isinstance(length, list):
         length = [length]
-    length_cycle = cycle(length)
 
-    while item < items:
-        str_type = next(str_cycle)
-        kwargs['length'] = next(length_cycle)
-        yield fauxfactory.gen_string(str_type, *args, **kwargs)
-        item += 1
+    return partial(
+        _string_block, tuple(str_type), tuple(length), args, kwargs)
+
+
+def _sample_corpus(paths, rng, start, stop):
+    """Return strings drawn from the corpora at ``paths`` for a range of
+    items, cycling through the corpora."""
+    values = []
+    for index in range(start, stop):
+        corpus = open_corpus(paths[index % len(paths)])
+        values.append(corpus[rng.randrange(len(corpus))])
+    return values
+
+
+def faux_corpus_paths(directory, str_type=None, length=None):
+    """Return the corpus file each item samples from, cycled by index.
+
+    String types and lengths given as lists are cycled through the same way
+    `faux_string_factory` does.
+    """
+    if not str_type:
+        str_type = fauxfactory.gen_choice(STRING_TYPES)
+    if not isinstance(str_type, list):
+        str_type = [str_type]
+    if not isinstance(length, list):
+        length = [length]
+    cycle = len(str_type) * len(length)
+    return [
+        corpus_path(
+            directory,
+            str_type[index % len(str_type)],
+            length[index % len(length)])
+        for index in range(cycle)
+    ]
+
+
+def faux_corpus_factory(paths):
+    """Return a block factory sampling strings from corpus files.
+
+    The factory can be pickled, and corpora are memory mapped once per
+    process.
+    """
+    return partial(_sample_corpus, paths)
+
+
+def faux_string(items, str_type=None, *args, **kwargs):
+    """Generate a new string type.
+
+    With ``source='corpus'``, strings are sampled from the corpus files in
+    ``corpus_dir`` instead, and with a ``pattern`` they match that regular
+    expression.
+    """
+    if kwargs.get('pattern') is not None:
+        return iter(BlockDataset(
+            items, faux_pattern_factory(kwargs.pop('pattern'))))
+    if kwargs.pop('source', None) == 'corpus':
+        paths = faux_corpus_paths(
+            kwargs.pop('corpus_dir', DEFAULT_DIRECTORY),
+            str_type,
+            kwargs.get('length'))
+        return iter(BlockDataset(items, faux_corpus_factory(paths)))
+    return iter(BlockDataset(
+        items, faux_string_factory(str_type, *args, **kwargs)))
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+"""Generation of strings matching a regular expression.
+
+A pattern is parsed once into a tree of nodes, kept for the session, and
+each node generates the strings of a whole block of items at once: a
+repeated character class draws all the characters of the block with a
+single call, an alternation generates every branch for the items picking it.
+Strings are built to match, so no string is ever generated and thrown away.
+
+Only a subset of the regular expression syntax is supported: literals,
+escapes, ``.``, character classes, groups, alternation and quantifiers, with
+``^`` and ``$`` allowed at the ends of the pattern. Anything else, such as
+backreferences or lookarounds, raises `ValueError`.
+"""
+import string
+from functools import lru_cache
+
+from pytest_fauxfactory.strings import draw
+
+# Characters matched by ``.`` and negated classes.
+PRINTABLE = string.ascii_letters + string.digits + string.punctuation + ' '
+
+# Number of repetitions added to the minimum of ``*``, ``+`` and ``{n,}``.
+UNBOUNDED_REPEAT = 8
+
+ESCAPES = {
+    'd': string.digits,
+    'w': string.ascii_letters + string.digits + '_',
+    's': ' \t',
+}
+
+LITERAL_ESCAPES = {
+    'n': '\n',
+    'r': '\r',
+    't': '\t',
+}
+
+
+def complement(alphabet):
+    """Return the printable characters missing from ``alphabet``."""
+    return ''.join(char for char in PRINTABLE if char not in alphabet)
+
+
+class Literal(object):
+    """Fixed text."""
+
+    def __init__(self, text):
+        self.text = text
+
+    def generate(self, rng, count):
+        """Return the strings of ``count`` items, drawn from ``rng``."""
+        return [self.text] * count
+
+
+class CharSet(object):
+    """A character drawn uniformly from ``alphabet``."""
+
+    def __init__(self, alphabet):
+        self.alphabet = alphabet
+
+    def generate(self, rng, count):
+        """Return the strings of ``count`` items, drawn from ``rng``."""
+        return list(draw(rng, self.alphabet, count))
+
+
+class Sequence(object):
+    """The text of each node of ``nodes`` one after the other."""
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+    def generate(self, rng, count):
+        """Return the strings of ``count`` items, drawn from ``rng``."""
+        columns = [node.generate(rng, count) for node in self.nodes]
+        if not columns:
+            return [''] * count
+        return [''.join(parts) for parts in zip(*columns)]
+
+
+class Alternation(object):
+    """The text of one of ``branches``, picked uniformly."""
+
+    def __init__(self, branches):
+        self.branches = branches
+
+    def generate(self, rng, count):
+        """Return the strings of ``count`` items, drawn from ``rng``."""
+        picks = rng.choices(range(len(self.branches)), k=count)
+        values = [None] * count
+        for number, branch in enumerate(self.branches):
+            positions = [
+                position for position, pick in enumerate(picks)
+                if pick == number
+            ]
+            for position, value in zip(
+                    positions, branch.generate(rng, len(positions))):
+                values[position] = value
+        return values
+
+
+class Repeat(object):
+    """The text of ``node`` repeated ``minimum`` to ``maximum`` times."""
+
+    def __init__(self, node, minimum, maximum):
+        self.node = node
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def generate(self, rng, count):
+        """Return the strings of ``count`` items, drawn from ``rng``."""
+        if self.minimum == self.maximum:
+            counts = [self.minimum] * count
+        else:
+            counts = rng.choices(
+                range(self.minimum, self.maximum + 1), k=count)
+        total = sum(counts)
+        if isinstance(self.node, CharSet):
+            parts = draw(rng, self.node.alphabet, total)
+        else:
+            parts = self.node.generate(rng, total)
+        values = []
+        offset = 0
+        for repeat in counts:
+            values.append(''.join(parts[offset:offset + repeat]))
+            offset += repeat
+        return values
+
+
+class Parser(object):
+    """Recursive descent parser of the supported regular expressions."""
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.position = 1 if pattern.startswith('^') else 0
+        self.end = len(pattern)
+        if pattern.endswith('$'):
+            # An odd number of backslashes escapes the dollar sign.
+            backslashes = len(pattern[:-1]) - len(pattern[:-1].rstrip('\\'))
+            if backslashes % 2 == 0:
+                self.end -= 1
+
+    def error(self, message):
+        """Raise `ValueError` for the current position."""
+        raise ValueError('{} at position {} of pattern {!r}'.format(
+            message, self.position, self.pattern))
+
+    def peek(self):
+        """Return the next character, ``None`` at the end."""
+        if self.position < self.end:
+            return self.pattern[self.position]
+        return None
+
+    def read(self):
+        """Return the next character and move past it."""
+        char = self.peek()
+        if char is None:
+            self.error('Unexpected end')
+        self.position += 1
+        return char
+
+    def parse(self):
+        """Return the root node of the pattern."""
+        node = self.alternation()
+        if self.peek() is not None:
+            self.error('Unbalanced parenthesis')
+        return node
+
+    def alternation(self):
+        """Parse branches separated by ``|``."""
+        branches = [self.sequence()]
+        while self.peek() == '|':
+            self.position += 1
+            branches.append(self.sequence())
+        if len(branches) == 1:
+            return branches[0]
+        return Alternation(branches)
+
+    def sequence(self):
+        """Parse the quantified atoms of a branch."""
+        nodes = []
+        while self.peek() not in (None, '|', ')'):
+            node = self.quantifier(self.atom())
+            if (isinstance(node, Literal) and nodes and
+                    isinstance(nodes[-1], Literal)):
+                nodes[-1] = Literal(nodes[-1].text + node.text)
+            else:
+                nodes.append(node)
+        if len(nodes) == 1:
+            return nodes[0]
+        return Sequence(nodes)
+
+    def atom(self):
+        """Parse a group, class, escape or literal character."""
+        char = self.read()
+        if char == '(':
+            if self.pattern.startswith('?:', self.position):
+                self.position += 2
+            elif self.pattern.startswith('?P<', self.position):
+                self.position = self.pattern.find(
+                    '>', self.position, self.end) + 1
+                if not self.position:
+                    self.error('Unterminated group name')
+            elif self.peek() == '?':
+                self.error('Unsupported group')
+            node = self.alternation()
+            if self.peek() != ')':
+                self.error('Missing )')
+            self.position += 1
+            return node
+        if char == '[':
+            return CharSet(self.char_class())
+        if char == '.':
+            return CharSet(PRINTABLE)
+        if char == '\\':
+            return self.escape()
+        if char in '*+?':
+            self.error('Nothing to repeat')
+        if char in '^$':
+            self.error('Unsupported anchor')
+        return Literal(char)
+
+    def escape(self):
+        """Parse the character following a backslash."""
+        char = self.read()
+        if char in ESCAPES:
+            return CharSet(ESCAPES[char])
+        if char.lower() in ESCAPES:
+            return CharSet(complement(ESCAPES[char.lower()]))
+        if char in LITERAL_ESCAPES:
+            return Literal(LITERAL_ESCAPES[char])
+        if char.isalnum():
+            self.error('Unsupported escape \\{}'.format(char))
+        return Literal(char)
+
+    def class_char(self):
+        """Return the characters of a single class member."""
+        char = self.read()
+        if char != '\\':
+            return char
+        node = self.escape()
+        if isinstance(node, CharSet):
+            return node.alphabet
+        return node.text
+
+    def char_class(self):
+        """Parse a character class and return its characters."""
+        negate = self.peek() == '^'
+        if negate:
+            self.position += 1
+        chars = []
+        first = True
+        while first or self.peek() != ']':
+            first = False
+            start = self.class_char()
+            if (len(start) == 1 and self.peek() == '-' and
+                    self.position + 1 < self.end and
+                    self.pattern[self.position + 1] != ']'):
+                self.position += 1
+                stop = self.class_char()
+                if len(stop) != 1 or ord(stop) < ord(start):
+                    self.error('Bad character range')
+                chars.extend(
+                    chr(code) for code in range(ord(start), ord(stop) + 1))
+            else:
+                chars.extend(start)
+        self.position += 1
+        alphabet = ''.join(sorted(set(chars)))
+        if negate:
+            alphabet = complement(alphabet)
+        if not alphabet:
+            self.error('Empty character class')
+        return alphabet
+
+    def quantifier(self, node):
+        """Parse the quantifier following ``node``, if any."""
+        char = self.peek()
+        if char == '?':
+            minimum, maximum = 0, 1
+        elif char == '*':
+            minimum, maximum = 0, UNBOUNDED_REPEAT
+        elif char == '+':
+            minimum, maximum = 1, 1 + UNBOUNDED_REPEAT
+        elif char == '{':
+            bounds = self.bounds()
+            if bounds is None:
+                return node
+            minimum, maximum = bounds
+        else:
+            return node
+        self.position += 1
+        if self.peek() == '?':
+            # Lazy quantifiers match the same strings.
+            self.position += 1
+        if self.peek() in ('?', '*', '+'):
+            self.error('Multiple repeat')
+        return Repeat(node, minimum, maximum)
+
+    def bounds(self):
+        """Return the bounds of a ``{n}``, ``{n,}``, ``{,m}`` or ``{n,m}``
+        quantifier and move to its closing brace, ``None`` for a literal
+        brace."""
+        end = self.pattern.find('}', self.position, self.end)
+        if end == -1:
+            return None
+        text = self.pattern[self.position + 1:end]
+        low, comma, high = text.partition(',')
+        if (low and not low.isdigit()) or (high and not high.isdigit()):
+            return None
+        if not low and not comma:
+            return None
+        minimum = int(low or 0)
+        if not comma:
+            maximum = minimum
+        elif not high:
+            maximum = minimum + UNBOUNDED_REPEAT
+        else:
+            maximum = int(high)
+        if maximum < minimum:
+            self.error('Min repeat greater than max repeat')
+        self.position = end
+        return minimum, maximum
+
+
+@lru_cache(maxsize=None)
+def compile_pattern(pattern):
+    """Return the tree of nodes generating strings matching ``pattern``,
+    parsed once per process."""
+    return Parser(pattern).parse()
+
+
+def gen_matching(rng, pattern, count):
+    """Generate ``count`` strings matching ``pattern`` from ``rng``."""
+    return compile_pattern(pattern).generate(rng, count)
@@ -1,25 +1,941 @@
 # -*- coding: utf-8 -*-
 """Analyse pytest-fauxfactory marks and passes arguments and keywords to
 pytest's parametrize method."""
-from pytest_fauxfactory.handlers import MARK_HANDLERS
+import importlib
+import reprlib
+import traceback
 
-from pytest_fauxfactory.helpers import generate_ids, get_mark_function
+import pytest
+
+from pytest_fauxfactory.cache import SEED_KEY, DatasetCache
+from pytest_fauxfactory.combine import COMBINE_STRATEGIES, combine_indices
+from pytest_fauxfactory.constants import CORPUS_DIRECTORY
+from pytest_fauxfactory.dataset import (
+    BatchValue,
+    Dataset,
+    LazyValue,
+    batch_values,
+    lazy_values,
+)
+from pytest_fauxfactory.helpers import (
+    cache_key,
+    default_argnames,
+    generate_batch_ids,
+    generate_ids,
+    get_argnames,
+    get_mark_functions,
+    parse_index,
+    parse_selected_ids,
+    parse_shard,
+    session_key,
+    spec_key,
+)
+from pytest_fauxfactory.pool import DatasetPool
+from pytest_fauxfactory.profile import Profiler, format_records, timed
+from pytest_fauxfactory.replay import (
+    FailureRecorder,
+    FailureStore,
+    dump_value,
+)
+from pytest_fauxfactory.rng import (
+    derive_seed,
+    install_context_random,
+    new_seed,
+    seeded,
+)
+
+LAZY_VALUES = pytest.StashKey()
+SEED = pytest.StashKey()
+CACHE_SEED = pytest.StashKey()
+CACHE = pytest.StashKey()
+SELECTED_IDS = pytest.StashKey()
+PROFILER = pytest.StashKey()
+POOL = pytest.StashKey()
+FAILURES = pytest.StashKey()
+FAUX_TESTS = pytest.StashKey()
+
+# Marks drawing values from sources of unknown length or latency, bounded by
+# the faux_time_budget and faux_max_items ini options.
+GENERATOR_MARKS = ('faux_callable', 'faux_generator')
+
+# Scopes faux mark values can be parametrized with.
+SCOPES = ('function', 'class', 'module', 'package', 'session')
+
+# Number of faux marks shown by --faux-profile.
+PROFILE_SLOWEST = 10
+
+
+def pytest_addoption(parser):
+    """Register pytest-fauxfactory options."""
+    group = parser.getgroup('fauxfactory')
+    group.addoption(
+        '--faux-seed',
+        action='store',
+        type=int,
+        default=None,
+        help='Seed used to generate faux mark values. A random seed is used '
+             'by default and shown in the report header.')
+    group.addoption(
+        '--faux-refresh',
+        action='store_true',
+        default=False,
+        help='Regenerate the faux mark values stored in the pytest cache.')
+    group.addoption(
+        '--faux-workers',
+        action='store',
+        type=int,
+        default=1,
+        help='Number of processes generating the values of each faux mark.')
+    group.addoption(
+        '--faux-shard',
+        action='store',
+        type=parse_shard,
+        default=None,
+        metavar='i/n',
+        help='Only generate and run the faux mark items owned by shard i '
+             'out of n, such as 1/4.')
+    group.addoption(
+        '--faux-scale',
+        action='store',
+        type=float,
+        default=None,
+        metavar='factor',
+        help='Multiply the number of items of every faux mark by factor, '
+             'such as 0.1 for a quick run. Overrides the faux_scale ini '
+             'option.')
+    group.addoption(
+        '--faux-replay-failures',
+        action='store_true',
+        default=False,
+        help='Only run the faux mark items that failed on the previous runs, '
+             'with the values they failed with instead of generating new '
+             'ones.')
+    group.addoption(
+        '--faux-profile',
+        action='store_true',
+        default=False,
+        help='Show the faux marks taking the most time to generate.')
+    group.addoption(
+        '--faux-profile-json',
+        action='store',
+        default=None,
+        metavar='path',
+        help='Write the time and memory spent generating each faux mark to '
+             'a JSON file.')
+    parser.addini(
+        'faux_lazy',
+        type='bool',
+        default=False,
+        help='Generate faux mark values when a test item is set up instead '
+             'of during collection.')
+    parser.addini(
+        'faux_scale',
+        default='1',
+        help='Factor the number of items of every faux mark is multiplied '
+             'by.')
+    parser.addini(
+        'faux_time_budget',
+        default='',
+        help='Seconds after which faux_callable and faux_generator marks '
+             'stop generating values, unless they set their own time_budget.')
+    parser.addini(
+        'faux_max_items',
+        default='',
+        help='Maximum number of items of faux_callable and faux_generator '
+             'marks, unless they set their own max_items.')
+    parser.addini(
+        'faux_cache',
+        type='bool',
+        default=False,
+        help='Store the values generated by faux marks in the pytest cache '
+             'and reuse them on the next runs.')
+    parser.addini(
+        'faux_cache_size',
+        default=str(64 * 1024 * 1024),
+        help='Size in bytes above which the least recently used values are '
+             'removed from the pytest cache.')
+    parser.addini(
+        'faux_corpus_dir',
+        default=CORPUS_DIRECTORY,
+        help='Directory holding the corpus files sampled by faux_string '
+             "marks using source='corpus', relative to the rootdir.")
+    parser.addini(
+        'faux_shared_size',
+        default=str(64 * 1024 * 1024),
+        help='Approximate size in bytes above which the least recently used '
+             'shared values are dropped from memory.')
+
+
+def pytest_configure(config):
+    """Register pytest-fauxfactory marks and pick the session seed."""
+    workerinput = getattr(config, 'workerinput', None)
+    if workerinput is not None and 'faux_seed' in workerinput:
+        seed = workerinput['faux_seed']
+        cache_seed = workerinput['faux_cache_seed']
+    elif config.getoption('faux_seed') is not None:
+        seed = cache_seed = config.getoption('faux_seed')
+    else:
+        seed = new_seed()
+        cache_seed = load_cache_seed(config)
+        if config.getini('faux_cache') and cache_seed is not None:
+            # Every mark caches its values, keep the seed between runs.
+            seed = cache_seed
+    config.stash[SEED] = seed
+    config.stash[CACHE_SEED] = cache_seed
+    install_context_random()
+
+    if (config.getoption('faux_profile') or
+            config.getoption('faux_profile_json')):
+        config.stash[PROFILER] = Profiler()
+
+    config.stash[POOL] = DatasetPool(int(config.getini('faux_shared_size')))
+
+    config.stash[SELECTED_IDS] = parse_selected_ids(
+        config.args, config.invocation_params.dir)
+
+    config.stash[FAUX_TESTS] = {}
+    if getattr(config, 'cache', None) is not None:
+        config.stash[CACHE] = DatasetCache(
+            config.cache,
+            int(config.getini('faux_cache_size')),
+            config.getoption('faux_refresh'))
+        config.stash[FAILURES] = FailureStore(config.cache)
+        if workerinput is None:
+            config.pluginmanager.register(
+                FailureRecorder(config.stash[FAILURES]), 'faux-failures')
+    elif config.getoption('faux_replay_failures'):
+        raise pytest.UsageError(
+            '--faux-replay-failures needs the cacheprovider plugin')
+
+    config.addinivalue_line(
+        'markers',
+        'faux_callable(items, callable_function, *args, **kwargs): '
+        'parametrize the test with values returned by a callable.')
+    config.addinivalue_line(
+        'markers',
+        'faux_dataset(path, items, fields=None, format=None): '
+        'parametrize the test with rows sampled from a JSON lines or CSV '
+        'file.')
+    config.addinivalue_line(
+        'markers',
+        'faux_generator(*generators): '
+        'parametrize the test with values yielded by generators.')
+    config.addinivalue_line(
+        'markers',
+        'faux_record(items, schema): '
+        'parametrize the test with records whose columns are generated from '
+        'a schema, one argument per column.')
+    config.addinivalue_line(
+        'markers',
+        'faux_string(items, str_type, **kwargs): '
+        'parametrize the test with random strings.')
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Share the session seed with pytest-xdist workers."""
+    node.workerinput['faux_seed'] = node.config.stash[SEED]
+    node.workerinput['faux_cache_seed'] = node.config.stash[CACHE_SEED]
+
+
+def pytest_report_header(config):
+    """Report the seed used to generate faux mark values."""
+    seed = config.stash[SEED]
+    cache_seed = config.stash[CACHE_SEED]
+    if cache_seed is None or cache_seed == seed:
+        return 'fauxfactory seed: {}'.format(seed)
+    return 'fauxfactory seed: {} (cached values: {})'.format(seed, cache_seed)
+
+
+def load_cache_seed(config):
+    """Return the seed of the marks caching their values, ``None`` without a
+    cache.
+
+    Cached values are keyed on the seed, so it is kept between runs and only
+    picked again by ``--faux-refresh``.
+    """
+    if getattr(config, 'cache', None) is None:
+        return None
+    seed = None
+    if not config.getoption('faux_refresh'):
+        seed = config.cache.get(SEED_KEY, None)
+    if seed is None:
+        seed = new_seed()
+        config.cache.set(SEED_KEY, seed)
+    return seed
+
+
+def base_seed(config, use_cache=False):
+    """Return the seed the seeds of faux marks are derived from, the one
+    kept between runs for marks caching their values."""
+    if use_cache and config.stash[CACHE_SEED] is not None:
+        return config.stash[CACHE_SEED]
+    return config.stash[SEED]
+
+
+@pytest.fixture
+def faux(request):
+    """Return a `Faux` generating values on demand, seeded for the test."""
+    return load_module('fixture').Faux(
+        derive_seed(request.config.stash[SEED], request.node.nodeid),
+        get_corpus_dir(request.config))
+
+
+def load_module(name):
+    """Import module ``name`` of the plugin the first time it is needed.
+
+    The mark handlers and the `faux` fixture import fauxfactory and all the
+    generation code, so they are only imported once a faux mark or the
+    fixture is used, and sessions without any start as fast as without the
+    plugin.
+    """
+    return importlib.import_module('pytest_fauxfactory.' + name)
+
+
+def get_scale(config):
+    """Return the factor the number of items of faux marks is scaled by."""
+    scale = config.getoption('faux_scale')
+    if scale is None:
+        try:
+            scale = float(config.getini('faux_scale'))
+        except ValueError:
+            raise pytest.UsageError(
+                'faux_scale expected a number, got {}'.format(
+                    config.getini('faux_scale')))
+    return scale
+
+
+def set_generator_limits(config, kwargs, settings):
+    """Apply the ini limits to the options and settings of a generator style
+    mark."""
+    time_budget = config.getini('faux_time_budget')
+    max_items = config.getini('faux_max_items')
+    try:
+        if time_budget:
+            kwargs.setdefault('time_budget', float(time_budget))
+        if max_items:
+            settings.setdefault('max_items', int(max_items))
+    except ValueError as error:
+        raise pytest.UsageError(
+            'Invalid faux_time_budget or faux_max_items: {}'.format(error))
+
+
+def get_corpus_dir(config):
+    """Return the directory holding the corpus files."""
+    return str(config.rootpath / config.getini('faux_corpus_dir'))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Report the faux marks taking the most time to generate."""
+    profiler = config.stash.get(PROFILER, None)
+    if profiler is None or not profiler.records:
+        return
+    if config.getoption('faux_profile'):
+        terminalreporter.write_sep(
+            '-', 'fauxfactory slowest {} generations'.format(PROFILE_SLOWEST))
+        for line in format_records(profiler.slowest(PROFILE_SLOWEST)):
+            terminalreporter.write_line(line)
+    path = config.getoption('faux_profile_json')
+    if path:
+        profiler.write_json(path)
+        terminalreporter.write_line(
+            'fauxfactory profile written to {}'.format(path))
 
 
 def pytest_generate_tests(metafunc):
     """Parametrize tests using `faux_string` `faux_callable` 'faux_generator'
     marks."""
-    func = get_mark_function(metafunc)
-    if func:
-        args = func.args
-        kwargs = func.kwargs
-        argnames = kwargs.pop('argnames', 'value')
-
-        data = MARK_HANDLERS[func.name](args, kwargs)
-
-        if data:
-            data = [_ for _ in data]
-            metafunc.parametrize(
-                argnames,
-                data,
-                ids=generate_ids(data, func.name))
+    marks = get_mark_functions(metafunc)
+    if len(marks) > 1:
+        parametrize_combined(metafunc, marks)
+    elif marks:
+        parametrize_mark(metafunc, marks[0])
+
+
+def mark_options(metafunc, func):
+    """Return the arguments, keywords and plugin options of mark ``func``.
+
+    Options handled by the plugin are removed from the keywords. The ones
+    bounding the number of items and the ones coming from the configuration
+    go to the ``settings`` option, passed to the mark handler apart from the
+    keywords.
+    """
+    args = func.args
+    kwargs = dict(func.kwargs)
+    options = {
+        'argnames': kwargs.pop('argnames', default_argnames(func)),
+        'lazy': kwargs.pop('lazy', metafunc.config.getini('faux_lazy')),
+        'cache': kwargs.pop('cache', metafunc.config.getini('faux_cache')),
+        'workers': kwargs.pop(
+            'workers', metafunc.config.getoption('faux_workers')),
+        'batch': kwargs.pop('batch', None),
+        'shared': kwargs.pop('shared', False),
+        'combine': kwargs.pop('combine', None),
+        'scope': kwargs.pop('scope', None),
+        'finalizer': kwargs.pop('finalizer', None),
+    }
+    handlers = load_module('handlers')
+    handlers.check_positive_int('workers', options['workers'])
+    if options['batch'] is not None:
+        handlers.check_positive_int('batch', options['batch'])
+    if options['combine'] not in (None,) + COMBINE_STRATEGIES:
+        raise pytest.UsageError(
+            'Mark expected combine to be one of {}, got {}'.format(
+                ', '.join(COMBINE_STRATEGIES), options['combine']))
+    if options['scope'] not in (None,) + SCOPES:
+        raise pytest.UsageError(
+            'Mark expected scope to be one of {}, got {}'.format(
+                ', '.join(SCOPES), options['scope']))
+    if options['finalizer'] is not None and not callable(
+            options['finalizer']):
+        raise pytest.UsageError(
+            'Mark expected finalizer to be callable, got {}'.format(
+                options['finalizer']))
+    if options['batch'] is not None and (
+            options['scope'] or options['finalizer']):
+        raise pytest.UsageError(
+            'Mark cannot run values in batches with a scope or finalizer')
+    if options['shared'] and options['finalizer'] is not None:
+        # Shared values outlive the scope of any single mark.
+        raise pytest.UsageError(
+            'Mark cannot share values with a finalizer')
+    settings = {
+        name: kwargs.pop(name) for name in ('min_items', 'max_items')
+        if name in kwargs}
+    scale = get_scale(metafunc.config)
+    if scale != 1:
+        settings['scale'] = scale
+    if func.name in GENERATOR_MARKS:
+        set_generator_limits(metafunc.config, kwargs, settings)
+    if func.name == 'faux_dataset':
+        # Paths are relative to the test module, and files are indexed in the
+        # pytest cache when there is one.
+        settings['base_dir'] = str(metafunc.definition.path.parent)
+        if CACHE in metafunc.config.stash:
+            settings['index_dir'] = metafunc.config.stash[CACHE].directory
+    if kwargs.get('source') == 'corpus':
+        settings['corpus_dir'] = get_corpus_dir(metafunc.config)
+    options['settings'] = settings
+    options['unique'] = kwargs.pop('unique', False)
+    return args, kwargs, options
+
+
+def load_dataset(metafunc, name, args, kwargs, options, seed):
+    """Return the dataset of mark ``name`` and its profiling record."""
+    record = None
+    if PROFILER in metafunc.config.stash:
+        record = metafunc.config.stash[PROFILER].record(
+            metafunc.definition.nodeid, name)
+
+    if options['shared']:
+        data = load_shared(
+            metafunc.config, name, args, kwargs, options['shared'], record,
+            options['cache'], options['workers'], options['unique'],
+            options['settings'])
+    else:
+        data = make_dataset(
+            name, args, kwargs, seed, record, options['workers'],
+            options['unique'], options['settings'])
+    if name == 'faux_dataset' and CACHE in metafunc.config.stash:
+        # The file may just have been indexed in the cache directory.
+        metafunc.config.stash[CACHE].evict()
+    return data, record
+
+
+def parametrize_mark(metafunc, func):
+    """Parametrize the test with the items of a single faux mark."""
+    args, kwargs, options = mark_options(metafunc, func)
+    argnames = options['argnames']
+    batch = options['batch']
+    workers = options['workers']
+    cache = options['cache']
+
+    if batch is None:
+        metafunc.config.stash[FAUX_TESTS][metafunc.definition.nodeid] = (
+            func.name, get_argnames(argnames))
+    if metafunc.config.getoption('faux_replay_failures'):
+        replay_failures(metafunc, func.name, argnames)
+        return
+
+    seed = derive_seed(
+        base_seed(metafunc.config, cache), metafunc.definition.nodeid)
+    data, record = load_dataset(
+        metafunc, func.name, args, kwargs, options, seed)
+
+    if not data:
+        # Nothing to run, such as when a time budget runs out before the
+        # first value: pytest skips tests with an empty parameter set.
+        metafunc.parametrize(argnames, [])
+        return
+
+    arity = len(get_argnames(argnames))
+    # Generators are drained by their handler anyway, so laziness would only
+    # add the cost of the placeholders. Scoped values are always lazy, so
+    # they are only built once their first test runs.
+    lazy = options['lazy'] and not data.materialized
+    if set_scope(data, options):
+        lazy = True
+    units = selected_units(metafunc, func.name, len(data), batch or 1)
+
+    values = None
+    with timed(record, 'generation_time'):
+        if not lazy and (units is None or not batch):
+            if units is None:
+                values = load_values(
+                    metafunc.config, func.name, data, cache, workers)
+            else:
+                values = [data[index] for index in units]
+
+        if batch:
+            ids = generate_batch_ids(len(data), batch, func.name, units)
+            params = batch_values(
+                data if values is None else values,
+                batch,
+                arity,
+                units)
+        else:
+            ids = generate_ids(data, func.name, units)
+            if lazy:
+                params = lazy_values(data, arity, units)
+            else:
+                params = values
+    if record is not None and values is not None:
+        record.add(values)
+    metafunc.parametrize(argnames, params, ids=ids, scope=options['scope'])
+
+
+def set_scope(data, options):
+    """Give ``data`` the scope and finalizer of the mark, returning whether
+    the mark sets any."""
+    if options['scope'] is None and options['finalizer'] is None:
+        return False
+    data.scope = options['scope'] or 'function'
+    data.finalizer = options['finalizer']
+    return True
+
+
+def parametrize_combined(metafunc, marks):
+    """Parametrize the test with the items of several stacked faux marks.
+
+    Items are combined as asked by the ``combine`` option of the marks,
+    ``product`` by default, and every mark parametrizes its own argnames.
+    Each mark gets its own seed and its values are all generated, even when
+    ``lazy`` is set, since items are used by several combinations.
+    """
+    prepared = [mark_options(metafunc, mark) for mark in marks]
+    strategies = {
+        options['combine'] for _, _, options in prepared
+        if options['combine'] is not None
+    }
+    if len(strategies) > 1:
+        raise pytest.UsageError(
+            'Stacked faux marks use different combine strategies: {}'.format(
+                ', '.join(sorted(strategies))))
+    strategy = strategies.pop() if strategies else 'product'
+
+    argnames = []
+    for mark, (_, _, options) in zip(marks, prepared):
+        if options['batch'] is not None:
+            raise pytest.UsageError(
+                '{} cannot run values in batches when stacked with other '
+                'faux marks'.format(mark.name))
+        names = get_argnames(options['argnames'])
+        for name in names:
+            if name in argnames:
+                raise pytest.UsageError(
+                    'Stacked faux marks all parametrize {}, give them '
+                    'different argnames'.format(name))
+        argnames.extend(names)
+    scoped = any(
+        options['scope'] is not None or options['finalizer'] is not None
+        for _, _, options in prepared)
+    if scoped and strategy != 'product':
+        raise pytest.UsageError(
+            'Stacked faux marks with a scope or finalizer can only be '
+            "combined with combine='product'")
+    if metafunc.config.getoption('faux_replay_failures'):
+        # Failures of combined items are not recorded.
+        metafunc.parametrize(argnames, [])
+        return
+
+    datasets = []
+    for position, (mark, (args, kwargs, options)) in enumerate(
+            zip(marks, prepared)):
+        seed = derive_seed(
+            base_seed(metafunc.config, options['cache']),
+            metafunc.definition.nodeid, position)
+        data, record = load_dataset(
+            metafunc, mark.name, args, kwargs, options, seed)
+        arity = len(get_argnames(options['argnames']))
+        if scoped and set_scope(data, options):
+            datasets.append((mark.name, arity, data))
+            continue
+        with timed(record, 'generation_time'):
+            values = load_values(
+                metafunc.config, mark.name, data, options['cache'],
+                options['workers'])
+        if record is not None:
+            record.add(values)
+        datasets.append((mark.name, arity, values))
+    if scoped:
+        parametrize_stacked(metafunc, argnames, datasets, prepared)
+        return
+
+    rows = combine_indices(
+        strategy, [len(values) for _, _, values in datasets])
+    shard = metafunc.config.getoption('faux_shard')
+    if shard is not None:
+        number, total = shard
+        rows = rows[number - 1::total]
+
+    params = []
+    ids = []
+    for row in rows:
+        param = []
+        for (name, arity, values), index in zip(datasets, row):
+            if arity == 1:
+                param.append(values[index])
+            else:
+                param.extend(values[index])
+        params.append(tuple(param))
+        ids.append('-'.join(
+            '{}_{}'.format(name, index)
+            for (name, _, _), index in zip(datasets, row)))
+    metafunc.parametrize(argnames, params, ids=ids)
+
+
+def parametrize_stacked(metafunc, argnames, datasets, prepared):
+    """Parametrize the test with every combination of the items of stacked
+    faux marks, one mark at a time.
+
+    Each mark is parametrized with its own scope, so pytest groups the tests
+    by the values of the marks with a broader scope: each of those values is
+    only built once and finalized as soon as its tests are done. With
+    ``--faux-shard``, the items of the first mark are dealt between shards.
+    """
+    if not all(len(values) for _, _, values in datasets):
+        metafunc.parametrize(argnames, [])
+        return
+    shard = metafunc.config.getoption('faux_shard')
+    for position, ((name, arity, values), (_, _, options)) in enumerate(
+            zip(datasets, prepared)):
+        indices = range(len(values))
+        if position == 0 and shard is not None:
+            number, total = shard
+            indices = indices[number - 1::total]
+        if isinstance(values, Dataset):
+            params = lazy_values(values, arity, indices)
+        else:
+            params = [values[index] for index in indices]
+        metafunc.parametrize(
+            options['argnames'],
+            params,
+            ids=generate_ids(values, name, indices),
+            scope=options['scope'])
+
+
+def selected_units(metafunc, name, items, size):
+    """Return the parametrized units to generate.
+
+    Units are items, or batches of ``size`` items identified by their first
+    index. ``None`` means all the units.
+
+    When a test is only selected with some of its parametrize IDs, only the
+    matching units are generated so rerunning a single failure does not
+    generate the whole dataset. With ``--faux-shard``, units are dealt
+    round-robin between the shards and only the ones owned by this shard are
+    generated.
+    """
+    units = None
+    definition = metafunc.definition
+    param_ids = metafunc.config.stash[SELECTED_IDS].get(
+        (str(definition.path), definition.nodeid.split('::', 1)[1]))
+    if param_ids:
+        units = set()
+        for param_id in param_ids:
+            index = parse_index(param_id, name)
+            if index is None:
+                # Not an ID of ours, it may combine other parametrizations.
+                units = None
+                break
+            if index < items and index % size == 0:
+                units.add(index)
+
+    shard = metafunc.config.getoption('faux_shard')
+    if shard is not None:
+        number, total = shard
+        if units is None:
+            units = range(0, items, size)
+        units = [
+            unit for unit in units if unit // size % total == number - 1]
+    return None if units is None else sorted(units)
+
+
+def replay_failures(metafunc, name, argnames):
+    """Parametrize the test with the values of its failed items only.
+
+    Items keep their ID, and tests without failed items are skipped. Items
+    run in batches are not recorded, so they are always skipped.
+    """
+    nodeid = metafunc.definition.nodeid
+    values = metafunc.config.stash[FAILURES].get(nodeid)
+    metafunc.parametrize(
+        argnames,
+        list(values.values()),
+        ids=generate_ids(values, name, list(values)))
+
+
+def load_values(config, name, dataset, use_cache=False, workers=1):
+    """Return the values of ``dataset``, reusing the ones in the cache when
+    ``use_cache`` is set."""
+    cache = config.stash.get(CACHE, None)
+    if not use_cache or cache is None or dataset.materialized:
+        return dataset.materialize(workers)
+    key = cache_key(name, dataset.spec, dataset.seed)
+    if key is None:
+        return dataset.materialize(workers)
+    values = cache.get(key)
+    if values is None:
+        values = dataset.materialize(workers)
+        cache.set(key, values)
+    return values
+
+
+def make_dataset(name, args, kwargs, seed, record=None, workers=1,
+                 unique=False, settings=None):
+    """Return the dataset of mark ``name``, seeded with ``seed``.
+
+    With ``unique`` set, the values are generated right away so duplicates
+    can be replaced.
+    """
+    handlers = load_module('handlers')
+    with seeded(seed), timed(record, 'handler_time'):
+        data = handlers.MARK_HANDLERS[name](args, kwargs, settings)
+    data.seed = seed
+    data.record = record
+    if data.time_budget is not None:
+        with timed(record, 'generation_time'):
+            data = handlers.apply_time_budget(name, data)
+    if unique:
+        with timed(record, 'generation_time'):
+            try:
+                data = data.unique(workers)
+            except ValueError as error:
+                raise pytest.UsageError(
+                    '{}, the mark cannot generate enough distinct values. '
+                    'Ask for fewer items or widen the range of values.'.format(
+                        error))
+    return data
+
+
+def shared_key(config, name, args, kwargs, shared, unique=False,
+               settings=None):
+    """Return the key of the values shared by marks with these arguments.
+
+    ``shared`` is either ``True`` or the name of a pool. Named pools are
+    kept apart from the unnamed ones, and may only be used by marks with the
+    same arguments. The pool only lives for the session, so callables are
+    told apart by identity rather than by name.
+    """
+    key = session_key(name, args, kwargs, unique, settings)
+    if shared is True:
+        return key
+    if not isinstance(shared, str):
+        raise pytest.UsageError(
+            'Mark expected shared to be True or a pool name, got {}'.format(
+                shared))
+    names = config.stash[POOL].names
+    if names.setdefault(shared, key) != key:
+        raise pytest.UsageError(
+            'Shared pool {} is used by marks with different arguments'.format(
+                shared))
+    return spec_key('pool', shared, key)
+
+
+def load_shared(config, name, args, kwargs, shared, record=None,
+                use_cache=False, workers=1, unique=False, settings=None):
+    """Return a dataset of the values shared by the marks with the same
+    arguments.
+
+    Values are generated the first time they are needed, with a seed derived
+    from the session seed and the mark arguments so they do not depend on
+    the test generating them, then kept in the session pool.
+    """
+    key = shared_key(config, name, args, kwargs, shared, unique, settings)
+    pool = config.stash[POOL]
+    values = pool.get(key)
+    if values is None:
+        # Seeded from the pool name and arguments, which are stable across
+        # runs unlike the key.
+        seed = derive_seed(
+            base_seed(config, use_cache), 'shared', shared,
+            spec_key(name, args, kwargs, unique, settings))
+        data = make_dataset(
+            name, args, kwargs, seed, record, workers, unique, settings)
+        with timed(record, 'generation_time'):
+            values = load_values(config, name, data, use_cache, workers)
+        pool.set(key, values)
+    return Dataset.from_iterable(values)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """Run the test function once per value of a batch.
+
+    Every value is run even when some fail, and the failures are reported
+    together with the index and value that caused them, ``pytest.fail``
+    included. Values skipped or xfailed with ``pytest.skip`` or
+    ``pytest.xfail`` are left out, and the item is only skipped or xfailed
+    when none of its values ran to the end. Arguments are passed the same
+    way pytest does for regular test functions.
+    """
+    funcargs = pyfuncitem.funcargs
+    placeholders = {
+        name: value
+        for name, value in funcargs.items()
+        if isinstance(value, BatchValue)
+    }
+    if not placeholders:
+        return None
+
+    testargs = {
+        arg: funcargs[arg] for arg in pyfuncitem._fixtureinfo.argnames}
+    batch = next(iter(placeholders.values())).batch
+    failures = []
+    skipped = []
+    xfailed = []
+    for index, value in batch:
+        for name, placeholder in placeholders.items():
+            testargs[name] = placeholder.pick(value)
+        try:
+            pyfuncitem.obj(**testargs)
+        except pytest.xfail.Exception as error:
+            # Raised by pytest.xfail, and a subclass of pytest.fail's.
+            xfailed.append(describe_batch_item(index, value, error))
+        except pytest.skip.Exception as error:
+            skipped.append(describe_batch_item(index, value, error))
+        except (Exception, pytest.fail.Exception) as error:
+            failures.append(describe_batch_item(index, value, error))
+    items = batch.stop - batch.start
+    if failures:
+        pytest.fail(
+            '{} of {} values failed:\n{}'.format(
+                len(failures), items, '\n'.join(failures)),
+            pytrace=False)
+    if len(skipped) + len(xfailed) == items:
+        outcome = pytest.xfail if xfailed else pytest.skip
+        outcome('{} values skipped and {} xfailed:\n{}'.format(
+            len(skipped), len(xfailed), '\n'.join(skipped + xfailed)))
+    return True
+
+
+def describe_batch_item(index, value, error):
+    """Return the line reporting the ``error`` raised by item ``index`` of a
+    batch."""
+    return 'item {} (value={}): {}'.format(
+        index,
+        reprlib.repr(value),
+        ''.join(traceback.format_exception_only(type(error), error)).strip())
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    """Materialize lazy faux values before fixtures are requested."""
+    callspec = getattr(item, 'callspec', None)
+    if callspec is None:
+        return
+    # Scoped values are resolved by their fixture, see pytest_fixture_setup.
+    placeholders = {
+        name: value
+        for name, value in callspec.params.items()
+        if isinstance(value, LazyValue) and value.slot.dataset.scope is None
+    }
+    if placeholders:
+        item.stash[LAZY_VALUES] = placeholders
+        for name, value in placeholders.items():
+            callspec.params[name] = value.resolve()
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_runtest_teardown(item):
+    """Put lazy placeholders back so generated values can be collected."""
+    placeholders = item.stash.get(LAZY_VALUES, None)
+    if placeholders:
+        del item.stash[LAZY_VALUES]
+        for name, value in placeholders.items():
+            item.callspec.params[name] = value
+            value.release()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Attach the outcome of faux mark items to their report.
+
+    The value of failed items travels with the report so pytest-xdist
+    workers send it to the process storing the failures.
+    """
+    outcome = yield
+    report = outcome.get_result()
+    callspec = getattr(item, 'callspec', None)
+    faux_tests = item.config.stash[FAUX_TESTS]
+    if callspec is None or not faux_tests or report.when == 'teardown':
+        return
+    nodeid = '{}::{}'.format(item.parent.nodeid, item.originalname)
+    faux_test = faux_tests.get(nodeid)
+    if faux_test is None:
+        return
+    if not (report.failed or (report.when == 'call' and report.passed)):
+        return
+    name, argnames = faux_test
+    for param_id in callspec.id.split('-'):
+        index = parse_index(param_id, name)
+        if index is not None:
+            break
+    else:
+        return
+    data = None
+    if report.failed:
+        # Scoped values only live in the fixtures of the item.
+        values = tuple(
+            item.funcargs.get(argname, callspec.params[argname])
+            for argname in argnames)
+        data = dump_value(values[0] if len(values) == 1 else values)
+        if data is None:
+            return
+    report.faux_item = (nodeid, index, callspec.id, data)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_fixture_setup(fixturedef, request):
+    """Generate scoped faux values when pytest sets up their fixture.
+
+    Parametrized values go through a fixture pytest creates for each argname
+    with the scope of the mark. The placeholder is kept as the cache key, so
+    pytest only sets the fixture up again for another value, after
+    finalizing the previous one.
+    """
+    placeholder = getattr(request, 'param', None)
+    if not isinstance(placeholder, LazyValue) or (
+            placeholder.slot.dataset.scope is None):
+        return None
+    # Like pytest's own implementation, minus the caching of errors whose
+    # layout changed between pytest versions: a value failing to generate is
+    # finished right away, so it is generated again for the next test. The
+    # layout of a cached value, (value, cache key, None), is the same from
+    # pytest 7.0 to 9.
+    try:
+        value = placeholder.resolve()
+    except BaseException:
+        fixturedef.cached_result = (None, placeholder, None)
+        fixturedef.finish(request)
+        raise
+    fixturedef.cached_result = (value, placeholder, None)
+    return value
+
+
+def pytest_fixture_post_finalizer(fixturedef, request):
+    """Release scoped faux values once their fixture is finalized, calling
+    the finalizer of their mark."""
+    cached_result = getattr(fixturedef, 'cached_result', None)
+    if cached_result is not None and isinstance(cached_result[1], LazyValue):
+        cached_result[1].release()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""In memory pools of values shared by the tests of a session."""
+from collections import OrderedDict
+
+from pytest_fauxfactory.profile import approximate_size
+
+
+class DatasetPool(object):
+    """Generated values kept in memory and reused by identical marks.
+
+    The least recently used values are dropped once they use more than
+    ``max_size`` bytes, as measured by `approximate_size`. Values larger than
+    ``max_size`` on their own are not kept.
+
+    ``names`` maps the names given to pools to the key of the values they
+    hold.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self.entries = OrderedDict()
+        self.names = {}
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        """Return the values stored for ``key``, ``None`` if there are none.
+        """
+        if key not in self.entries:
+            return None
+        self.entries.move_to_end(key)
+        return self.entries[key][0]
+
+    def set(self, key, values):
+        """Store ``values`` for ``key``, evicting older values if needed."""
+        size = approximate_size(values)
+        self.discard(key)
+        if size > self.max_size:
+            return
+        self.entries[key] = (values, size)
+        self.size += size
+        while self.size > self.max_size:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.size -= evicted
+
+    def discard(self, key):
+        """Remove the values stored for ``key``, if any."""
+        if key in self.entries:
+            _, size = self.entries.pop(key)
+            self.size -= size
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""Profiling of the time and memory spent generating faux mark values."""
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+
+def approximate_size(values):
+    """Return the approximate memory used by a list of values, in bytes.
+
+    Only the values themselves are measured, not the objects they refer to.
+    """
+    return sys.getsizeof(values) + sum(
+        sys.getsizeof(value) for value in values)
+
+
+class GenerationRecord(object):
+    """Time and memory spent on the values of a single faux mark."""
+
+    def __init__(self, nodeid, mark):
+        self.nodeid = nodeid
+        self.mark = mark
+        self.items = 0
+        self.handler_time = 0.0
+        self.generation_time = 0.0
+        self.memory = 0
+
+    @property
+    def total_time(self):
+        """Time spent in the mark handler and generating values."""
+        return self.handler_time + self.generation_time
+
+    @property
+    def per_item(self):
+        """Average time spent per generated item."""
+        if not self.items:
+            return 0.0
+        return self.total_time / self.items
+
+    def add(self, values):
+        """Account for a list of materialized ``values``."""
+        self.items += len(values)
+        self.memory += approximate_size(values)
+
+    def add_value(self, value):
+        """Account for a single value materialized on its own."""
+        self.items += 1
+        self.memory += sys.getsizeof(value)
+
+    def as_dict(self):
+        """Return the record as a JSON serializable dictionary."""
+        return {
+            'nodeid': self.nodeid,
+            'mark': self.mark,
+            'items': self.items,
+            'handler_time': self.handler_time,
+            'generation_time': self.generation_time,
+            'total_time': self.total_time,
+            'per_item': self.per_item,
+            'memory': self.memory,
+        }
+
+
+class Profiler(object):
+    """Collects a record per faux marked test."""
+
+    def __init__(self):
+        self.records = {}
+
+    def record(self, nodeid, mark):
+        """Return the record of the ``mark`` applied to test ``nodeid``."""
+        key = (nodeid, mark)
+        if key not in self.records:
+            self.records[key] = GenerationRecord(nodeid, mark)
+        return self.records[key]
+
+    def slowest(self, count=None):
+        """Return the records taking the most time first."""
+        records = sorted(
+            self.records.values(),
+            key=lambda record: record.total_time,
+            reverse=True)
+        return records[:count]
+
+    def write_json(self, path):
+        """Dump every record to ``path``, slowest first."""
+        with open(path, 'w') as handle:
+            json.dump(
+                [record.as_dict() for record in self.slowest()],
+                handle,
+                indent=2)
+
+
+def format_records(records):
+    """Return the lines of a table showing ``records``."""
+    lines = ['{:>10} {:>10} {:>8} {:>10} {:>10}  {}'.format(
+        'total', 'handler', 'items', 'per item', 'memory', 'test')]
+    for record in records:
+        lines.append('{:>9.3f}s {:>9.3f}s {:>8} {:>8.3f}ms {:>8.1f}KB  '
+                     '{} ({})'.format(
+                         record.total_time,
+                         record.handler_time,
+                         record.items,
+                         record.per_item * 1000,
+                         record.memory / 1024.0,
+                         record.nodeid,
+                         record.mark))
+    return lines
+
+
+@contextmanager
+def timed(record, attribute):
+    """Add the time spent in the block to ``record.attribute``.
+
+    Nothing is measured when ``record`` is ``None``.
+    """
+    if record is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(
+            record,
+            attribute,
+            getattr(record, attribute) + time.perf_counter() - start)
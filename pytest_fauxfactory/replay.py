@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""Values of the faux mark items that failed, replayed on demand."""
+import os
+import pickle
+
+from pytest_fauxfactory.cache import CACHE_DIR
+
+FAILURES_FILE = 'failures.pickle'
+
+
+def dump_value(value):
+    """Return ``value`` pickled, ``None`` if it cannot be pickled."""
+    try:
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return None
+
+
+class FailureStore(object):
+    """Failed items of faux marks stored in the pytest ``cache``.
+
+    Items are recorded per test, by the node id of the test function, the
+    index of the item and the ID of the parametrization it ran in, with
+    their value pickled on its own so values referencing code that changed
+    since do not prevent loading the others. An item is forgotten once it
+    passes in every parametrization it failed in.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self._failures = None
+        self.changed = False
+
+    @property
+    def path(self):
+        """Return the path of the file storing the failures."""
+        return os.path.join(str(self.cache.mkdir(CACHE_DIR)), FAILURES_FILE)
+
+    @property
+    def failures(self):
+        """Return the pickled values of the failed items of every test."""
+        if self._failures is None:
+            try:
+                with open(self.path, 'rb') as handle:
+                    self._failures = pickle.load(handle)
+            except Exception:
+                self._failures = {}
+        return self._failures
+
+    def get(self, nodeid):
+        """Return the values of the failed items of test ``nodeid`` by item
+        index."""
+        values = {}
+        for index, failed in sorted(self.failures.get(nodeid, {}).items()):
+            if not isinstance(failed, dict):
+                # Stored before parametrizations were recorded.
+                continue
+            # Every parametrization of an item gets the same value.
+            for data in failed.values():
+                try:
+                    values[index] = pickle.loads(data)
+                except Exception:
+                    continue
+                break
+        return values
+
+    def record(self, nodeid, index, callspec_id, data):
+        """Record item ``index`` of test ``nodeid`` as failed in the
+        parametrization ``callspec_id`` with the pickled value ``data``, or
+        as passed in it when ``data`` is ``None``."""
+        items = self.failures.setdefault(nodeid, {})
+        failed = items.get(index)
+        if not isinstance(failed, dict):
+            failed = items[index] = {}
+            self.changed = True
+        if data is not None:
+            failed[callspec_id] = data
+            self.changed = True
+        elif failed.pop(callspec_id, None) is not None:
+            self.changed = True
+        if not failed:
+            del items[index]
+        if not items:
+            del self.failures[nodeid]
+
+    def save(self):
+        """Write the failures, if any changed."""
+        if not self.changed:
+            return
+        path = self.path
+        with open(path + '.tmp', 'wb') as handle:
+            pickle.dump(self.failures, handle, pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+        self.changed = False
+
+
+class FailureRecorder(object):
+    """Plugin recording the outcome of faux mark items in a `FailureStore`.
+
+    Reports of faux mark items carry a ``faux_item`` attribute holding the
+    node id of the test function, the item index, the ID of the item
+    parametrization and the pickled value of the item when it failed.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def pytest_runtest_logreport(self, report):
+        """Record the outcome of faux mark items."""
+        item = getattr(report, 'faux_item', None)
+        if item is not None:
+            self.store.record(*item)
+
+    def pytest_sessionfinish(self, session):
+        """Store the outcomes once the session is over."""
+        self.store.save()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""Seeding of the random data generated by faux marks.
+
+Every item is generated from a seed derived from the session seed, the test
+node id and the item index, so any process collecting the same test produces
+the same values without coordinating with the others.
+"""
+import random
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Random generator of the current thread or task, set by `seeded`.
+_CURRENT = ContextVar('faux_random', default=None)
+
+
+def new_seed():
+    """Return a random session seed."""
+    return random.SystemRandom().randint(0, 2 ** 32 - 1)
+
+
+def derive_seed(*parts):
+    """Combine ``parts`` into a seed.
+
+    String seeds are hashed by `random.seed`, which is stable across
+    processes, unlike `hash`.
+    """
+    return ':'.join(str(part) for part in parts)
+
+
+def current_random():
+    """Return the random generator of the current thread or task.
+
+    It is the generator set by `seeded`, or the global one of the `random`
+    module outside of it.
+    """
+    rng = _CURRENT.get()
+    if rng is None:
+        return random._inst
+    return rng
+
+
+def seed_context(seed):
+    """Give the current context its own generator seeded from ``seed``.
+
+    Used by asyncio tasks, which run in a copy of the context of their
+    creator, so each task draws from its own generator.
+    """
+    _CURRENT.set(random.Random(derive_seed(seed, 'context')))
+
+
+class ContextRandom(object):
+    """Stand-in for the `random` module drawing from `current_random`.
+
+    Functions of the `random` module are looked up on the generator of the
+    current context, anything else on the module itself.
+    """
+
+    def __getattr__(self, name):
+        rng = current_random()
+        if hasattr(rng, name):
+            return getattr(rng, name)
+        return getattr(random, name)
+
+
+CONTEXT_RANDOM = ContextRandom()
+
+
+def install_context_random():
+    """Make fauxfactory draw from the generator of the current context.
+
+    fauxfactory calls the functions of the `random` module, which share a
+    single global state between threads. Its modules get `CONTEXT_RANDOM`
+    in place of the module instead.
+    """
+    for name, module in list(sys.modules.items()):
+        if name != 'fauxfactory' and not name.startswith('fauxfactory.'):
+            continue
+        if getattr(module, 'random', None) is random:
+            module.random = CONTEXT_RANDOM
+
+
+@contextmanager
+def seeded(seed):
+    """Seed the random generators used to generate values.
+
+    The current thread or task gets its own generator seeded from ``seed``,
+    used by fauxfactory once `install_context_random` was called, so
+    threads generating values concurrently do not share a random state.
+
+    In the main thread, the global random state is seeded too for callables
+    using `random` directly. The previous state is restored on exit so tests
+    relying on `random` themselves are not affected. A ``None`` seed leaves
+    the state alone.
+    """
+    if seed is None:
+        yield
+        return
+    token = _CURRENT.set(random.Random(derive_seed(seed, 'context')))
+    main = threading.current_thread() is threading.main_thread()
+    if main:
+        state = random.getstate()
+        random.seed(seed)
+    try:
+        yield
+    finally:
+        _CURRENT.reset(token)
+        if main:
+            random.setstate(state)
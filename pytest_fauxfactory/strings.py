@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""Bulk generation of the strings used by the `faux_string` mark.
+
+Instead of calling `fauxfactory.gen_string` once per item, all the strings of
+a given type in a block of items are drawn at once from a precomputed
+alphabet and sliced. Types without an alphabet here are still generated by
+fauxfactory, one item at a time.
+"""
+import re
+import string
+
+import fauxfactory
+from fauxfactory.constants import HTML_TAGS
+from fauxfactory.helpers import unicode_letters_generator
+
+from pytest_fauxfactory.constants import STRING_TYPES
+from pytest_fauxfactory.rng import install_context_random, seeded
+
+# Make fauxfactory draw from the generator of the current thread or task as
+# soon as the generation code loads it.
+install_context_random()
+
+DEFAULT_LENGTH = 10
+
+# Keyword arguments the bulk engine knows how to honor, anything else is
+# passed on to fauxfactory.
+BULK_KWARGS = ('length', 'validator', 'default', 'tries')
+
+# Unicode ranges used by fauxfactory, upper bounds excluded.
+CJK_RANGES = (
+    (0x4E00, 0x9FFF),
+    (0x3400, 0x4DBF),
+    (0x20000, 0x2A6DF),
+    (0x2A700, 0x2B73F),
+    (0x2B740, 0x2B81F),
+)
+LATIN1_RANGES = (
+    (0x00C0, 0x00D6),
+    (0x00D8, 0x00F6),
+    (0x00F8, 0x00FF),
+)
+
+_ALPHABETS = {}
+_TABLES = {}
+
+
+def _from_ranges(ranges):
+    """Return the characters in the given codepoint ranges."""
+    return ''.join(
+        chr(codepoint)
+        for start, stop in ranges
+        for codepoint in range(start, stop)
+    )
+
+
+def get_alphabet(str_type):
+    """Return the characters strings of ``str_type`` are made of.
+
+    Alphabets are computed on first use and kept for the session. `html`
+    strings are `alpha` strings wrapped in a tag.
+    """
+    if str_type not in _ALPHABETS:
+        if str_type in ('alpha', 'html'):
+            alphabet = string.ascii_letters
+        elif str_type == 'alphanumeric':
+            alphabet = string.ascii_letters + string.digits
+        elif str_type == 'cjk':
+            alphabet = _from_ranges(CJK_RANGES)
+        elif str_type == 'latin1':
+            alphabet = _from_ranges(LATIN1_RANGES)
+        elif str_type == 'numeric':
+            alphabet = string.digits
+        elif str_type == 'utf8':
+            alphabet = ''.join(unicode_letters_generator())
+        elif str_type == 'punctuation':
+            alphabet = string.punctuation
+        else:
+            raise ValueError(
+                '{} is not a supported string type.'.format(str_type))
+        _ALPHABETS[str_type] = alphabet
+    return _ALPHABETS[str_type]
+
+
+def _get_table(alphabet):
+    """Return a byte translation table drawing from a Latin-1 ``alphabet``.
+
+    Bytes are mapped onto the alphabet with a modulo, and the bytes above the
+    largest multiple of the alphabet size are deleted to keep the draw
+    uniform. ``None`` is returned for alphabets that do not fit in a byte.
+    """
+    if alphabet not in _TABLES:
+        table = None
+        if len(alphabet) <= 256 and all(ord(char) < 256 for char in alphabet):
+            usable = 256 - 256 % len(alphabet)
+            table = (
+                bytes(
+                    ord(alphabet[byte % len(alphabet)]) if byte < usable else 0
+                    for byte in range(256)
+                ),
+                bytes(range(usable, 256)),
+            )
+        _TABLES[alphabet] = table
+    return _TABLES[alphabet]
+
+
+def draw(rng, alphabet, k):
+    """Return ``k`` characters drawn uniformly from ``alphabet``."""
+    table = _get_table(alphabet)
+    if table is None:
+        return ''.join(rng.choices(alphabet, k=k))
+    chunks = []
+    missing = k
+    while missing > 0:
+        size = missing + missing // 2 + 16
+        chunk = rng.getrandbits(8 * size).to_bytes(size, 'little').translate(
+            *table)[:missing]
+        chunks.append(chunk)
+        missing -= len(chunk)
+    return b''.join(chunks).decode('latin-1')
+
+
+def _check_length(length):
+    """Reject lengths fauxfactory would reject."""
+    if not isinstance(length, int):
+        raise ValueError('{} is not numeric.'.format(length))
+    if length <= 0:
+        raise ValueError('{} is an invalid length.'.format(length))
+
+
+def _get_validator(validator):
+    """Return ``validator`` as a function, as fauxfactory does."""
+    if validator is None or callable(validator):
+        return validator
+    return lambda value: re.match(validator, value)
+
+
+def _gen_string(rng, str_type, length, *args, **kwargs):
+    """Generate a single string with fauxfactory, seeded from ``rng``."""
+    with seeded(rng.getrandbits(64)):
+        return fauxfactory.gen_string(
+            str_type, *args, length=length, **kwargs)
+
+
+def gen_strings(rng, str_types, lengths, *args, **kwargs):
+    """Generate one string per item from ``rng``.
+
+    ``str_types`` and ``lengths`` hold the string type and length of every
+    item, a ``None`` length meaning the fauxfactory default. Items sharing a
+    string type are drawn with a single call to ``rng`` and the result is
+    sliced in order.
+    """
+    if args or set(kwargs) - set(BULK_KWARGS):
+        # Options only fauxfactory knows about, generate item by item.
+        return [
+            _gen_string(rng, str_type, length, *args, **kwargs)
+            for str_type, length in zip(str_types, lengths)
+        ]
+
+    validator = _get_validator(kwargs.get('validator'))
+    default = kwargs.get('default')
+    tries = kwargs.get('tries', 10)
+    if validator and default is None:
+        raise ValueError(
+            'If "validator" param is defined, "default" parameter must not '
+            'be None')
+
+    lengths = [DEFAULT_LENGTH if length is None else length
+               for length in lengths]
+    positions = {}
+    for position, (str_type, length) in enumerate(zip(str_types, lengths)):
+        _check_length(length)
+        positions.setdefault(str_type.lower(), []).append(position)
+
+    values = [None] * len(str_types)
+    for str_type, type_positions in sorted(positions.items()):
+        if str_type not in STRING_TYPES:
+            # Types the bulk engine has no alphabet for, such as cyrillic.
+            for position in type_positions:
+                values[position] = _gen_string(
+                    rng, str_types[position], lengths[position], **kwargs)
+            continue
+        alphabet = get_alphabet(str_type)
+
+        def finish(chars):
+            if str_type == 'html':
+                return '<{0}>{1}</{0}>'.format(rng.choice(HTML_TAGS), chars)
+            return chars
+
+        total = sum(lengths[position] for position in type_positions)
+        chars = draw(rng, alphabet, total)
+        offset = 0
+        for position in type_positions:
+            length = lengths[position]
+            value = finish(chars[offset:offset + length])
+            offset += length
+            attempt = 1
+            while validator and not validator(value):
+                if attempt >= tries:
+                    value = default
+                    break
+                value = finish(draw(rng, alphabet, length))
+                attempt += 1
+            values[position] = value
+    return values
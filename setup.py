@@ -29,7 +29,8 @@ setup(
     keywords='pytest',
     url='https://github.com/omaciel/pytest-fauxfactory',
     packages=['pytest_fauxfactory'],
-    install_requires=['pytest>=3.2', 'fauxfactory'],
+    python_requires='>=3.7',
+    install_requires=['pytest>=7.0', 'fauxfactory'],
     extras_require={
         'dev': [
             'coverage',
@@ -39,7 +40,10 @@ setup(
             'wheel',
         ]
     },
-    entry_points={'pytest11': ['fauxfactory = pytest_fauxfactory.plugin']},
+    entry_points={
+        'console_scripts': ['faux-corpus = pytest_fauxfactory.corpus:main'],
+        'pytest11': ['fauxfactory = pytest_fauxfactory.plugin'],
+    },
     classifiers=[
         'Topic :: Utilities',
         'Development Status :: 5 - Production/Stable',
@@ -47,10 +51,12 @@ setup(
         'Natural Language :: English',
         'License :: OSI Approved :: GNU General Public License v3 (GPLv3)',
         'Programming Language :: Python',
-        'Programming Language :: Python :: 2.7',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
         'Topic :: Software Development :: Testing',
     ],
     test_suite='tests',
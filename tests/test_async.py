@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""Test coroutine and async generator functions with `faux_callable`."""
+import asyncio
+import random
+import time
+
+from pytest_fauxfactory.asynchronous import AsyncDataset
+from pytest_fauxfactory.marks import faux_callable
+
+
+async def slow_value(value, delay=0.05):
+    """Return ``value`` after sleeping."""
+    await asyncio.sleep(delay)
+    return value
+
+
+async def numbers():
+    """Yield increasing numbers forever."""
+    number = 0
+    while True:
+        await asyncio.sleep(0)
+        yield number
+        number += 1
+
+
+def test_coroutine_values_are_generated_concurrently():
+    """Check that coroutines wait concurrently instead of one at a time."""
+    start = time.perf_counter()
+    values = list(faux_callable(20, slow_value, 'foo'))
+    assert values == ['foo'] * 20
+    assert time.perf_counter() - start < 20 * 0.05
+
+
+def test_async_generator_values():
+    """Check that the first values of an async generator are used."""
+    assert list(faux_callable(5, numbers)) == [0, 1, 2, 3, 4]
+
+
+def test_coroutine_mark(testdir):
+    """Check that a coroutine function parametrizes a test."""
+    testdir.makepyfile("""
+        import asyncio
+        import pytest
+        async def make_record(name):
+            await asyncio.sleep(0)
+            return {'name': name}
+        @pytest.mark.faux_callable(10, make_record, 'foo', concurrency=3)
+        def test_something(value):
+            assert value == {'name': 'foo'}
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=10)
+    assert result.ret == 0
+
+
+def test_coroutine_mark_lazy(testdir):
+    """Check that a lazy coroutine value is generated at setup."""
+    testdir.makepyfile("""
+        import asyncio
+        import pytest
+        async def make_record():
+            await asyncio.sleep(0)
+            return 'foo'
+        @pytest.mark.faux_callable(3, make_record, lazy=True)
+        def test_something(value):
+            assert value == 'foo'
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=3)
+    assert result.ret == 0
+
+
+def test_async_generator_mark(testdir):
+    """Check that an async generator function parametrizes a test."""
+    testdir.makepyfile("""
+        import pytest
+        async def letters():
+            for letter in 'abcdef':
+                yield letter
+        @pytest.mark.faux_callable(4, letters)
+        def test_something(value):
+            assert value in 'abcd'
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=4)
+    assert result.ret == 0
+
+
+def test_invalid_concurrency(testdir):
+    """Check that an invalid concurrency limit is detected."""
+    testdir.makepyfile("""
+        import pytest
+        async def make_record():
+            return 'foo'
+        @pytest.mark.faux_callable(2, make_record, concurrency=0)
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    assert 'concurrency to be an integer greater than 0' in (
+        result.stdout.str())
+    assert result.ret == 2
+
+
+def test_concurrency_needs_coroutine_function(testdir):
+    """Check that a concurrency limit is refused for other callables."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_callable(2, lambda: 'foo', concurrency=2)
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    assert 'only accepts concurrency with a coroutine function' in (
+        result.stdout.str())
+
+
+def test_generate_restores_random_state():
+    """Check that generating single items leaves the global random state
+    alone."""
+    dataset = AsyncDataset(3, lambda index: slow_value(index, 0), seed='seed')
+    random.seed(1)
+    expected = random.random()
+    random.seed(1)
+    assert dataset.generate(0) == 0
+    assert dataset.regenerate(1, 1) == 1
+    assert random.random() == expected
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""Test running batches of faux mark values in a single test item."""
+
+
+def test_batch_number_of_tests_generated(testdir):
+    """Check that one test item is generated per batch."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(25, 'alpha', batch=10)
+        def test_something(value):
+            assert value.isalpha()
+    """)
+    result = testdir.runpytest('-v')
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines([
+        '*test_something?faux_string_0-9? PASSED*',
+        '*test_something?faux_string_10-19? PASSED*',
+        '*test_something?faux_string_20-24? PASSED*',
+    ])
+    assert result.ret == 0
+
+
+def test_batch_runs_every_value(testdir):
+    """Check that the test function receives every value of the batch."""
+    testdir.makepyfile("""
+        import pytest
+        SEEN = []
+        def numbers():
+            for number in range(7):
+                yield number
+        @pytest.mark.faux_generator(numbers(), batch=7)
+        def test_something(value):
+            SEEN.append(value)
+        def test_seen():
+            assert SEEN == list(range(7))
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=2)
+    assert result.ret == 0
+
+
+def test_batch_reports_failing_values(testdir):
+    """Check that failing values are reported with their index."""
+    testdir.makepyfile("""
+        import pytest
+        def numbers():
+            for number in range(10):
+                yield number
+        @pytest.mark.faux_generator(numbers(), batch=5)
+        def test_something(value):
+            assert value % 3
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=0, failed=2)
+    result.stdout.fnmatch_lines([
+        '*2 of 5 values failed:',
+        'item 0 (value=0): AssertionError*',
+        'item 3 (value=3): AssertionError*',
+        '*2 of 5 values failed:',
+        'item 6 (value=6): AssertionError*',
+        'item 9 (value=9): AssertionError*',
+    ])
+
+
+def test_batch_reports_pytest_fail(testdir):
+    """Check that values failing with pytest.fail do not stop the batch."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_generator((n for n in range(5)), batch=5)
+        def test_something(value):
+            if value in (1, 3):
+                pytest.fail('bad value')
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines([
+        '*2 of 5 values failed:',
+        'item 1 (value=1): *Failed: bad value',
+        'item 3 (value=3): *Failed: bad value',
+    ])
+
+
+def test_batch_skipped_values(testdir):
+    """Check that skipped and xfailed values are left out, and that batches
+    are only skipped or xfailed when no value ran."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_generator((n for n in range(6)), batch=3)
+        def test_some_skipped(value):
+            if value % 3 == 1:
+                pytest.skip('odd')
+            if value % 3 == 2:
+                pytest.xfail('even')
+        @pytest.mark.faux_generator((n for n in range(3)), batch=3)
+        def test_all_skipped(value):
+            pytest.skip('unsupported')
+        @pytest.mark.faux_generator((n for n in range(3)), batch=3)
+        def test_all_xfailed(value):
+            if value:
+                pytest.xfail('known bug')
+            pytest.skip('unsupported')
+        @pytest.mark.faux_generator((n for n in range(3)), batch=3)
+        def test_skipped_and_failed(value):
+            if value:
+                pytest.skip('unsupported')
+            assert False
+    """)
+    result = testdir.runpytest('-rsx')
+    result.assert_outcomes(passed=2, skipped=1, xfailed=1, failed=1)
+    result.stdout.fnmatch_lines([
+        '*1 of 3 values failed:',
+        'item 0 (value=0): AssertionError*',
+    ])
+    result.stdout.fnmatch_lines(['*3 values skipped and 0 xfailed:*'])
+    result.stdout.fnmatch_lines(['*1 values skipped and 2 xfailed:*'])
+
+
+def test_batch_multiple_argument_names(testdir):
+    """Check that batch values are unpacked into multiple argument names."""
+    testdir.makepyfile("""
+        import pytest
+        def pair():
+            return 'foo', 'bar'
+        @pytest.mark.faux_callable(
+            6, pair, argnames='foo, bar', batch=4, lazy=True)
+        def test_something(foo, bar, tmpdir):
+            assert (foo, bar) == ('foo', 'bar')
+            assert tmpdir
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=2)
+    assert result.ret == 0
+
+
+def test_batch_invalid_value(testdir):
+    """Check that an invalid batch size is detected."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(10, batch='10')
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    assert 'batch to be an integer greater than 0' in result.stdout.str()
+    assert result.ret == 2
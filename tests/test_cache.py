@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""Test the persistence of generated values in the pytest cache."""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from pytest_fauxfactory.cache import DatasetCache
+from pytest_fauxfactory.datafile import build_index, index_path
+from pytest_fauxfactory.helpers import cache_key
+
+COUNTED_TEST = """
+    import pytest
+    def counted():
+        with open('calls.txt', 'a') as handle:
+            handle.write('.')
+        return {'name': 'foo'}
+    @pytest.mark.faux_callable(3, counted)
+    def test_something(value):
+        assert value == {'name': 'foo'}
+"""
+
+
+def count_calls(testdir, *args):
+    """Run the counted test and return how many values it generated."""
+    calls = testdir.tmpdir.join('calls.txt')
+    if calls.check():
+        calls.remove()
+    result = testdir.runpytest(*args)
+    result.assert_outcomes(passed=3)
+    return len(calls.read()) if calls.check() else 0
+
+
+def test_cache_reuses_values(testdir):
+    """Check that cached values are not generated again."""
+    testdir.makeini("""
+        [pytest]
+        faux_cache = true
+    """)
+    testdir.makepyfile(COUNTED_TEST)
+    assert count_calls(testdir) == 3
+    assert count_calls(testdir) == 0
+
+
+def test_cache_refresh(testdir):
+    """Check that --faux-refresh generates the values again."""
+    testdir.makeini("""
+        [pytest]
+        faux_cache = true
+    """)
+    testdir.makepyfile(COUNTED_TEST)
+    assert count_calls(testdir) == 3
+    assert count_calls(testdir, '--faux-refresh') == 3
+    assert count_calls(testdir) == 0
+
+
+def test_cache_keyed_on_seed(testdir):
+    """Check that values cached for another seed are not reused."""
+    testdir.makepyfile(
+        COUNTED_TEST.replace('counted)', 'counted, cache=True)'))
+    assert count_calls(testdir, '--faux-seed=1') == 3
+    assert count_calls(testdir, '--faux-seed=1') == 0
+    assert count_calls(testdir, '--faux-seed=2') == 3
+
+
+def test_cache_mark_keeps_seed(testdir):
+    """Check that values of marks caching them are reused between runs
+    without a seed or the faux_cache option."""
+    testdir.makepyfile(
+        COUNTED_TEST.replace('counted)', 'counted, cache=True)'))
+    assert count_calls(testdir) == 3
+    assert count_calls(testdir) == 0
+    assert count_calls(testdir, '--faux-refresh') == 3
+    assert count_calls(testdir) == 0
+
+
+def test_cache_disabled_by_default(testdir):
+    """Check that values are generated on every run by default."""
+    testdir.makepyfile(COUNTED_TEST)
+    assert count_calls(testdir, '--faux-seed=1') == 3
+    assert count_calls(testdir, '--faux-seed=1') == 3
+
+
+class FakeCache(object):
+    """Stand-in for the pytest cache handing out a directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def mkdir(self, name):
+        return self.directory.ensure(name, dir=True)
+
+
+def test_cache_evicts_least_recently_used(tmpdir):
+    """Check that the oldest values go once the size budget is exceeded."""
+    cache = DatasetCache(FakeCache(tmpdir), max_size=2000)
+    cache.set('first', ['a' * 800])
+    cache.set('second', ['b' * 800])
+    assert cache.get('first') == ['a' * 800]
+    cache.set('third', ['c' * 800])
+    assert cache.get('second') is None
+    assert cache.get('first') == ['a' * 800]
+    assert cache.get('third') == ['c' * 800]
+
+
+def test_cache_skips_unpicklable_values(tmpdir):
+    """Check that values that cannot be pickled are simply not stored."""
+    cache = DatasetCache(FakeCache(tmpdir), max_size=2000)
+    cache.set('key', [lambda: None])
+    assert cache.get('key') is None
+
+
+def test_index_evicted(tmpdir):
+    """Check that indexes count towards the size of the cache."""
+    cache = DatasetCache(FakeCache(tmpdir), max_size=1000)
+    path = str(tmpdir.join('users.jsonl'))
+    tmpdir.join('users.jsonl').write('{"id": 1}\n' * 100)
+    index = index_path(cache.directory, path)
+    build_index(path, index)
+    cache.set('values', ['a' * 500])
+    assert not os.path.exists(index)
+    assert cache.get('values') == ['a' * 500]
+
+
+def test_cache_concurrent_writers(tmpdir):
+    """Check that writers storing the same key at once all succeed."""
+    cache = DatasetCache(FakeCache(tmpdir), max_size=10 ** 6)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(
+            lambda number: cache.set('key', [number] * 1000), range(32)))
+    assert len(set(cache.get('key'))) == 1
+    assert not [
+        name for name in os.listdir(cache.directory) if name.endswith('.tmp')]
+
+
+def make_factory(letter):
+    """Return a function returning ``letter``."""
+    def factory():
+        return letter
+    return factory
+
+
+def test_cache_key_callables():
+    """Check that cache keys tell apart callables with the same name."""
+    first = (lambda: 1)
+    second = (lambda: 2)
+    assert cache_key(first) != cache_key(second)
+    assert cache_key(make_factory('a')) == cache_key(make_factory('a'))
+    assert cache_key(make_factory('a')) != cache_key(make_factory('b'))
+    assert cache_key(partial(int, '10', base=2)) == cache_key(
+        partial(int, '10', base=2))
+    assert cache_key(partial(int, '10', base=2)) != cache_key(
+        partial(int, '10', base=8))
+
+
+def test_cache_key_edited_function():
+    """Check that functions whose body changed get another cache key."""
+    keys = []
+    for body in ('return 1', 'return 2', 'return str(1)', 'return 1'):
+        namespace = {}
+        exec('def make_value():\n    {}\n'.format(body), namespace)
+        keys.append(cache_key(namespace['make_value']))
+    assert len(set(keys[:3])) == 3
+    assert keys[0] == keys[3]
+
+
+def test_cache_key_default_repr():
+    """Check that objects identified by their address are not cached."""
+    assert cache_key(object()) is None
+    assert cache_key([1, {'a': 'b'}]) is not None
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""Test combining the items of stacked faux marks."""
+from itertools import combinations
+
+import pytest
+
+from pytest_fauxfactory.combine import combine_indices, pairwise
+
+
+@pytest.mark.parametrize(
+    'sizes', [(2, 2), (3, 3, 3), (3, 3, 3, 3), (5, 4, 3, 2, 6), (1, 5, 1, 3)])
+def test_pairwise_covers_every_pair(sizes):
+    """Check that every pair of items of two marks is in some row."""
+    rows = pairwise(sizes)
+    for first, second in combinations(range(len(sizes)), 2):
+        pairs = {(row[first], row[second]) for row in rows}
+        assert len(pairs) == sizes[first] * sizes[second]
+    for row in rows:
+        assert all(0 <= index < size for index, size in zip(row, sizes))
+
+
+def test_pairwise_smaller_than_product():
+    """Check that pairwise rows are far fewer than the product."""
+    assert len(pairwise((10, 10, 10, 10))) < 10 ** 4 // 20
+    assert pairwise((4, 4, 4)) == pairwise((4, 4, 4))
+
+
+def test_combine_indices():
+    """Check the rows of the product and zip strategies."""
+    assert combine_indices('product', (2, 3)) == [
+        (0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2)]
+    assert combine_indices('zip', (2, 3)) == [(0, 0), (1, 1)]
+    assert combine_indices('pairwise', (2, 0, 3)) == []
+
+
+def test_stacked_marks_product(testdir):
+    """Check that stacked marks run every combination by default."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(3, 'alpha', argnames='name')
+        @pytest.mark.faux_callable(2, lambda: 1, argnames='number')
+        def test_something(name, number):
+            assert name.isalpha()
+            assert number == 1
+    """)
+    result = testdir.runpytest('-v')
+    result.assert_outcomes(passed=6)
+    result.stdout.fnmatch_lines([
+        '*test_something[[]faux_callable_0-faux_string_0[]]*',
+        '*test_something[[]faux_callable_1-faux_string_2[]]*',
+    ])
+
+
+def test_stacked_marks_zip(testdir):
+    """Check that zipped marks run their items side by side."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(3, 'alpha', argnames='name', combine='zip')
+        @pytest.mark.faux_callable(5, lambda: 1, argnames='number')
+        def test_something(name, number):
+            assert number == 1
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=3)
+
+
+def test_stacked_marks_pairwise(testdir):
+    """Check that pairwise marks run the rows covering every pair."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(4, 'alpha', argnames='name')
+        @pytest.mark.faux_string(4, 'numeric', argnames='code')
+        @pytest.mark.faux_callable(
+            4, lambda: (1, 2), argnames='first, second', combine='pairwise')
+        def test_something(name, code, first, second):
+            assert name.isalpha()
+            assert code.isdigit()
+            assert (first, second) == (1, 2)
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=len(pairwise((4, 4, 4))))
+
+
+def test_stacked_marks_same_argnames(testdir):
+    """Check that stacked marks parametrizing the same argname fail."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(2)
+        @pytest.mark.faux_callable(2, lambda: 1)
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(['*Stacked faux marks all parametrize value*'])
+
+
+def test_stacked_marks_different_strategies(testdir):
+    """Check that marks asking for different strategies fail."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(2, argnames='name', combine='zip')
+        @pytest.mark.faux_callable(2, lambda: 1, combine='product')
+        def test_something(name, value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(['*different combine strategies*'])
+
+
+def test_unknown_combine_strategy(testdir):
+    """Check that an unknown strategy is detected."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(2, combine='all')
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(['*expected combine to be one of*'])
+
+
+def test_stacked_marks_batch(testdir):
+    """Check that batches cannot be combined."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(4, argnames='name', batch=2)
+        @pytest.mark.faux_callable(2, lambda: 1)
+        def test_something(name, value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(['*cannot run values in batches*'])
+
+
+def test_function_mark_overrides_module_mark(testdir):
+    """Check that a closer mark replaces a farther one on the same argname.
+    """
+    testdir.makepyfile("""
+        import pytest
+        pytestmark = pytest.mark.faux_string(5)
+        @pytest.mark.faux_callable(2, lambda: 1)
+        def test_something(value):
+            assert value == 1
+        def test_other(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=7)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""Test sampling `faux_string` values from a pre-generated corpus."""
+import pytest
+
+from pytest_fauxfactory.corpus import (
+    Corpus,
+    build_corpus,
+    corpus_path,
+    main,
+)
+from pytest_fauxfactory.marks import faux_string
+
+CORPUS_TEST = """
+    import pytest
+    @pytest.mark.faux_string(20, 'utf8', length=8, source='corpus')
+    def test_something(value):
+        assert len(value) == 8
+        with open('values.txt', 'a', encoding='utf-8') as handle:
+            handle.write(value + '\\n')
+"""
+
+
+def test_build_corpus(tmpdir):
+    """Check that every string of a corpus is read back."""
+    path = str(tmpdir.join('utf8-3.corpus'))
+    build_corpus(path, 'utf8', 3, count=1000, seed=1)
+    corpus = Corpus(path)
+    assert len(corpus) == 1000
+    assert all(len(value) == 3 for value in corpus)
+    with pytest.raises(IndexError):
+        corpus[1000]
+
+
+def test_build_corpus_is_reproducible(tmpdir):
+    """Check that a seeded corpus always holds the same strings."""
+    build_corpus(str(tmpdir.join('a')), 'cjk', 5, count=10, seed=1)
+    build_corpus(str(tmpdir.join('b')), 'cjk', 5, count=10, seed=1)
+    assert tmpdir.join('a').read_binary() == tmpdir.join('b').read_binary()
+
+
+def test_not_a_corpus(tmpdir):
+    """Check that other files are rejected."""
+    tmpdir.join('foo.corpus').write_binary(b'\0' * 32)
+    with pytest.raises(ValueError):
+        Corpus(str(tmpdir.join('foo.corpus')))
+
+
+def test_corpus_command(tmpdir, capsys):
+    """Check that the command builds a corpus per type and length."""
+    directory = str(tmpdir)
+    assert main([
+        directory, '--types', 'alpha', 'numeric', '--lengths', '4', '6',
+        '--count', '50']) == 0
+    for str_type in ('alpha', 'numeric'):
+        for length in (4, 6):
+            corpus = Corpus(corpus_path(directory, str_type, length))
+            assert len(corpus) == 50
+            assert all(len(value) == length for value in corpus)
+    assert 'numeric-6.corpus: 50 strings' in capsys.readouterr().out
+
+
+def test_faux_string_from_corpus(tmpdir):
+    """Check that strings are sampled from the corpora of each type."""
+    main([str(tmpdir), '--types', 'alpha', 'numeric', '--count', '100'])
+    values = list(faux_string(
+        10, ['alpha', 'numeric'], source='corpus', corpus_dir=str(tmpdir)))
+    assert all(value.isalpha() for value in values[::2])
+    assert all(value.isdigit() for value in values[1::2])
+
+
+def test_corpus_mark(testdir):
+    """Check that a mark samples from the corpus directory of the ini file.
+    """
+    testdir.makeini("""
+        [pytest]
+        faux_corpus_dir = strings
+    """)
+    main([str(testdir.tmpdir.join('strings')), '--types', 'utf8',
+          '--lengths', '8', '--count', '100'])
+    testdir.makepyfile(CORPUS_TEST)
+    result = testdir.runpytest('--faux-seed=4')
+    result.assert_outcomes(passed=20)
+    values = testdir.tmpdir.join('values.txt').read_text('utf-8')
+    testdir.tmpdir.join('values.txt').remove()
+    testdir.runpytest('--faux-seed=4')
+    assert testdir.tmpdir.join('values.txt').read_text('utf-8') == values
+
+
+def test_corpus_mark_missing_corpus(testdir):
+    """Check that a missing corpus file is reported."""
+    testdir.makepyfile(CORPUS_TEST)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines([
+        '*Missing corpus file *utf8-8.corpus, build it with the faux-corpus '
+        'command'])
+    assert result.ret == 2
+
+
+def test_corpus_mark_invalid_options(testdir):
+    """Check that generation options are rejected with a corpus."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(2, 'alpha', source='corpus', tries=3)
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    assert "only accepts a string type and length with source='corpus'" in (
+        result.stdout.str())
+
+
+def test_invalid_source(testdir):
+    """Check that unknown sources are rejected."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(2, 'alpha', source='disk')
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    assert "expected source to be 'corpus', got disk" in result.stdout.str()
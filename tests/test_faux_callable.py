@@ -31,7 +31,7 @@ def test_callable_mark_without_arguments(testdir):
             assert True
     """)
     result = testdir.runpytest()
-    result.assert_outcomes(error=1)
+    result.assert_outcomes(errors=1)
     assert 'Missing arguments' in result.stdout.str()
     assert result.ret == 2
 
@@ -45,7 +45,7 @@ def test_callable_mark_without_callable_function(testdir):
             assert True
     """)
     result = testdir.runpytest()
-    result.assert_outcomes(error=1)
+    result.assert_outcomes(errors=1)
     assert 'Missing arguments' in result.stdout.str()
     assert result.ret == 2
 
@@ -60,7 +60,7 @@ def test_callable_mark_incorrect_items_argument_type(testdir):
             assert value
     """)
     result = testdir.runpytest()
-    result.assert_outcomes(error=1)
+    result.assert_outcomes(errors=1)
     assert 'Mark expected an integer' in result.stdout.str()
     assert result.ret == 2
 
@@ -75,7 +75,7 @@ def test_callable_mark_incorrect_items_argument(testdir):
             assert value
     """)
     result = testdir.runpytest()
-    result.assert_outcomes(error=1)
+    result.assert_outcomes(errors=1)
     assert 'Mark expected an integer greater than 0' in result.stdout.str()
     assert result.ret == 2
 
@@ -89,7 +89,7 @@ def test_callable_mark_incorrect_callable_argument_type(testdir):
             assert value
     """)
     result = testdir.runpytest()
-    result.assert_outcomes(error=1)
+    result.assert_outcomes(errors=1)
     assert 'Mark expected a callable function' in result.stdout.str()
     assert result.ret == 2
 
@@ -118,7 +118,7 @@ def test_callable_mark_incorrect_value(testdir):
             assert foo
     """)
     result = testdir.runpytest()
-    result.assert_outcomes(error=1)
+    result.assert_outcomes(errors=1)
     assert 'uses no argument \'value\'' in result.stdout.str()
     assert result.ret == 2
 
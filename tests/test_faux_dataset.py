@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""Test parametrizing tests with rows of JSON lines and CSV files."""
+import json
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from pytest_fauxfactory.datafile import (
+    build_index,
+    index_path,
+    sample_index,
+    sample_stream,
+)
+from pytest_fauxfactory.marks import faux_dataset
+
+
+def write_users(path, rows=100):
+    """Write a JSON lines file of ``rows`` users."""
+    with open(path, 'w') as handle:
+        for number in range(rows):
+            handle.write(json.dumps(
+                {'id': number, 'name': 'user{}'.format(number)}) + '\n')
+
+
+def test_dataset_mark_jsonl(testdir):
+    """Check that rows of a JSON lines file parametrize a test."""
+    write_users(str(testdir.tmpdir.join('users.jsonl')))
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_dataset('users.jsonl', 10)
+        def test_something(value):
+            assert value['name'] == 'user{}'.format(value['id'])
+    """)
+    result = testdir.runpytest('-v')
+    result.assert_outcomes(passed=10)
+    result.stdout.fnmatch_lines(['*test_something?faux_dataset_9? PASSED*'])
+
+
+def test_dataset_mark_csv_fields(testdir):
+    """Check that CSV rows are read with their header and projected."""
+    testdir.tmpdir.join('users.csv').write(
+        'id,name,email\n' +
+        ''.join(
+            '{0},"user, {0}",user{0}@example.com\n'.format(number)
+            for number in range(50)))
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_dataset('users.csv', 5, fields='name, email')
+        def test_something(value):
+            assert sorted(value) == ['email', 'name']
+            assert value['name'].startswith('user, ')
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=5)
+
+
+def test_dataset_mark_is_reproducible(testdir):
+    """Check that the same rows are picked for the same seed, with or
+    without the index."""
+    write_users(str(testdir.tmpdir.join('users.jsonl')), 1000)
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_dataset('users.jsonl', 5)
+        def test_something(value):
+            with open('values.txt', 'a') as handle:
+                handle.write('{}\\n'.format(value['id']))
+    """)
+    runs = []
+    for args in [(), (), ('-p', 'no:cacheprovider')] * 2:
+        testdir.runpytest('--faux-seed=2', *args)
+        runs.append(testdir.tmpdir.join('values.txt').read())
+        testdir.tmpdir.join('values.txt').remove()
+    assert runs[0] == runs[1] == runs[3] == runs[4]
+    assert runs[2] == runs[5]
+    assert len(set(runs[0].split())) == 5
+
+
+def test_dataset_mark_fewer_rows(testdir):
+    """Check that every row is used when there are fewer than items."""
+    write_users(str(testdir.tmpdir.join('users.jsonl')), 3)
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_dataset('users.jsonl', 10)
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=3)
+
+
+def test_dataset_mark_missing_file(testdir):
+    """Check that a missing file is reported."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_dataset('users.jsonl', 10)
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(['*Dataset file *users.jsonl not found*'])
+
+
+def test_dataset_mark_unknown_format(testdir):
+    """Check that files of unknown format need an explicit format."""
+    testdir.tmpdir.join('users.txt').write('{"id": 1}\n')
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_dataset('users.txt', 1)
+        def test_unknown(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    assert "use format='csv' or format='jsonl'" in result.stdout.str()
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_dataset('users.txt', 1, format='jsonl')
+        def test_known(value):
+            assert value == {'id': 1}
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=1)
+
+
+def test_dataset_mark_missing_field(testdir):
+    """Check that fields missing from the rows are reported by name."""
+    write_users(str(testdir.tmpdir.join('users.jsonl')))
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_dataset('users.jsonl', 3, fields='id, email')
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(['*users.jsonl has no field email*'])
+    assert 'KeyError' not in result.stdout.str()
+
+
+def test_dataset_mark_unknown_options(testdir):
+    """Check that unknown options are reported."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_dataset('users.jsonl', 1, colums='id')
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    assert 'Unknown options colums' in result.stdout.str()
+
+
+def test_index(tmpdir):
+    """Check that the index holds the offset of every row."""
+    path = str(tmpdir.join('users.jsonl'))
+    write_users(path, 20)
+    index = index_path(str(tmpdir), path)
+    build_index(path, index)
+    assert os.path.getsize(index) == 20 * 8
+    offsets = sample_index(index, 20, random.Random(1))
+    with open(path, 'rb') as handle:
+        lines = handle.read().splitlines(True)
+    assert offsets == [
+        sum(len(line) for line in lines[:number]) for number in range(20)]
+
+
+def test_index_changes_with_file(tmpdir):
+    """Check that a modified file gets a new index."""
+    path = str(tmpdir.join('users.jsonl'))
+    write_users(path, 5)
+    index = index_path(str(tmpdir), path)
+    write_users(path, 6)
+    assert index_path(str(tmpdir), path) != index
+
+
+def test_sample_stream(tmpdir):
+    """Check that reservoir sampling picks distinct rows in file order."""
+    path = str(tmpdir.join('users.jsonl'))
+    write_users(path, 100)
+    offsets = sample_stream(path, 10, random.Random(1))
+    assert len(set(offsets)) == 10
+    assert offsets == sorted(offsets)
+    assert sample_stream(path, 10, random.Random(1)) == offsets
+
+
+def test_faux_dataset(tmpdir):
+    """Check that rows can be sampled outside of a mark."""
+    path = str(tmpdir.join('users.jsonl'))
+    write_users(path, 10)
+    values = list(faux_dataset(path, 4, fields=['id']))
+    assert len(values) == 4
+    assert all(list(value) == ['id'] for value in values)
+
+
+def test_index_concurrent_writers(tmpdir):
+    """Check that writers building the same index at once all succeed."""
+    path = str(tmpdir.join('users.jsonl'))
+    write_users(path, 200)
+    index = index_path(str(tmpdir), path)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(
+            lambda _: build_index(path, index), range(32)))
+    assert os.path.getsize(index) == 200 * 8
+    assert [name for name in os.listdir(str(tmpdir))
+            if name.endswith('.tmp')] == []
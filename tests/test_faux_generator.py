@@ -14,7 +14,7 @@ def test_generator_mark_without_arguments(testdir):
             assert True
     """)
     result = testdir.runpytest()
-    result.assert_outcomes(error=1)
+    result.assert_outcomes(errors=1)
     assert 'Missing arguments' in result.stdout.str()
     assert result.ret == 2
 
@@ -30,7 +30,7 @@ def test_generator_mark_with_incorrect_argument_type(testdir):
             assert value
     """)
     result = testdir.runpytest()
-    result.assert_outcomes(error=1)
+    result.assert_outcomes(errors=1)
     assert 'Argument with index 1 is not a generator' in result.stdout.str()
     assert result.ret == 2
 
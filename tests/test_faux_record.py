@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""Test the `faux_record` mark."""
+import random
+
+from pytest_fauxfactory.marks import faux_record, faux_record_factory
+
+SCHEMA = {
+    'name': ('alpha', 12),
+    'age': ('int', 18, 99),
+    'score': ('float', 0, 10),
+    'active': 'bool',
+    'role': ('choice', ['admin', 'user']),
+    'code': 'numeric',
+}
+
+
+def test_faux_record_values():
+    """Check that every column follows its schema."""
+    records = list(faux_record(1000, SCHEMA))
+    assert len(records) == 1000
+    for name, age, score, active, role, code in records:
+        assert len(name) == 12 and name.isalpha()
+        assert 18 <= age <= 99
+        assert 0 <= score <= 10
+        assert active in (False, True)
+        assert role in ('admin', 'user')
+        assert len(code) == 10 and code.isdigit()
+
+
+def test_faux_record_single_column():
+    """Check that records of a single column are plain values."""
+    records = list(faux_record(5, {'age': ('int', 1, 3)}))
+    assert all(record in (1, 2, 3) for record in records)
+
+
+def test_faux_record_factory_is_seeded():
+    """Check that records only depend on the random generator."""
+    factory = faux_record_factory(SCHEMA)
+    first = factory(random.Random(1), 0, 100)
+    assert factory(random.Random(1), 0, 100) == first
+    assert factory(random.Random(2), 0, 100) != first
+
+
+def test_record_mark(testdir):
+    """Check that columns are passed as arguments named after them."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_record(
+            5, {'name': ('alpha', 12), 'age': ('int', 18, 99)})
+        def test_something(name, age):
+            assert len(name) == 12
+            assert 18 <= age <= 99
+    """)
+    result = testdir.runpytest('-v')
+    result.assert_outcomes(passed=5)
+    result.stdout.fnmatch_lines(['*test_something[[]faux_record_4[]] PASSED*'])
+
+
+def test_record_mark_argnames(testdir):
+    """Check that argnames rename the columns."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_record(
+            3, schema={'name': 'alpha', 'age': ('int', 1, 2)},
+            argnames='login, level')
+        def test_something(login, level):
+            assert login.isalpha()
+            assert level in (1, 2)
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=3)
+
+
+def test_record_mark_lazy_single_column(testdir):
+    """Check that a single column record is a plain value, even lazy."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_record(3, schema={'level': ('int', 1, 2)},
+                                 lazy=True)
+        def test_something(level):
+            assert level in (1, 2)
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=3)
+
+
+def test_record_mark_without_schema(testdir):
+    """Check that a missing schema is detected."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_record(3)
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(['*Missing arguments*'])
+
+
+def test_record_mark_unknown_kind(testdir):
+    """Check that an unknown column kind is detected."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_record(3, {'when': 'date'})
+        def test_something(when):
+            assert when
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(['*Column when has an unknown kind date*'])
+
+
+def test_record_mark_invalid_parameters(testdir):
+    """Check that column parameters are checked."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_record(3, {'age': ('int', 1)})
+        def test_something(age):
+            assert age
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(['*Column age got invalid parameters*'])
@@ -48,7 +48,7 @@ def test_mark_incorrect_value(testdir):
             assert foo
     """)
     result = testdir.runpytest()
-    result.assert_outcomes(error=1)
+    result.assert_outcomes(errors=1)
     assert 'uses no argument \'value\'' in result.stdout.str()
     assert result.ret == 2
 
@@ -75,7 +75,7 @@ def test_mark_incorrect_str_type_argument(testdir):
             assert value
     """)
     result = testdir.runpytest()
-    result.assert_outcomes(error=1)
+    result.assert_outcomes(errors=1)
     assert 'String type alphabet is not supported' in result.stdout.str()
     assert result.ret == 2
 
@@ -89,7 +89,7 @@ def test_mark_incorrect_argument(testdir):
             assert value
     """)
     result = testdir.runpytest()
-    result.assert_outcomes(error=1)
+    result.assert_outcomes(errors=1)
     assert 'String type 1 is not supported' in result.stdout.str()
     assert result.ret == 2
 
@@ -103,7 +103,7 @@ def test_mark_invalid_integer(testdir):
             assert value
     """)
     result = testdir.runpytest()
-    result.assert_outcomes(error=1)
+    result.assert_outcomes(errors=1)
     assert 'Mark expected an integer greater than 0' in result.stdout.str()
     assert result.ret == 2
 
@@ -174,3 +174,9 @@ def test_gen_alpha_string_with_variable_types(value):
 def test_gen_alpha_string_with_custom_arg_name(name):
     """Generate default alpha strings with custom argument."""
     assert len(name) == 10
+
+
+@pytest.mark.faux_string(3, 'cyrillic')
+def test_gen_cyrillic_string(value):
+    """Generate strings of a type only fauxfactory knows about."""
+    assert len(value) == 10
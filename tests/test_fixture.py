@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Test generating values on demand with the `faux` fixture."""
+from pytest_fauxfactory.fixture import Faux
+
+
+def test_faux_fixture(testdir):
+    """Check the values generated by the fixture."""
+    testdir.makepyfile("""
+        import fauxfactory
+        def make_user(name, admin=False):
+            return {'name': name, 'admin': admin}
+        def test_something(faux):
+            assert faux.string('alpha', 12).isalpha()
+            assert len(faux.string('numeric', length=4)) == 4
+            assert faux.string()
+            assert faux.call(make_user, 'foo', admin=True) == {
+                'name': 'foo', 'admin': True}
+            assert 0 <= faux.call(fauxfactory.gen_integer, 0, 9) <= 9
+            values = faux.batch(5, 'cjk', length=3)
+            assert len(values) == 5
+            assert all(len(value) == 3 for value in values)
+            assert faux.batch(3, make_user, 'bar') == [
+                {'name': 'bar', 'admin': False}] * 3
+            assert 0 <= faux.random.random() < 1
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=1)
+    assert result.ret == 0
+
+
+def test_faux_fixture_values_are_reproducible(testdir):
+    """Check that a test gets the same values with the same seed."""
+    testdir.makepyfile("""
+        import fauxfactory
+        def test_something(faux):
+            values = [
+                faux.string('utf8'),
+                str(faux.call(fauxfactory.gen_integer)),
+                str(faux.random.random()),
+            ] + faux.batch(3)
+            with open('values.txt', 'a') as handle:
+                handle.write(repr(values) + '\\n')
+    """)
+    testdir.runpytest('--faux-seed=8')
+    testdir.runpytest('--faux-seed=8')
+    testdir.runpytest('--faux-seed=9')
+    first, second, third = testdir.tmpdir.join(
+        'values.txt').read().splitlines()
+    assert first == second
+    assert first != third
+
+
+def test_faux_fixture_async_callable(testdir):
+    """Check that coroutine functions are awaited."""
+    testdir.makepyfile("""
+        import asyncio
+        async def make_value():
+            await asyncio.sleep(0)
+            return 'foo'
+        def test_something(faux):
+            assert faux.call(make_value) == 'foo'
+            assert faux.batch(3, make_value) == ['foo'] * 3
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=1)
+
+
+def test_draws_do_not_repeat():
+    """Check that successive draws get their own seed."""
+    faux = Faux('seed')
+    assert faux.string('alpha') != faux.string('alpha')
+    assert faux.draws == 2
+    assert Faux('seed').batch(2, 'alpha') == Faux('seed').batch(2, 'alpha')
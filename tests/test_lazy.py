@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Test the lazy generation of faux mark values."""
+
+
+def test_lazy_mark_collect_only(testdir):
+    """Check that lazy values are not generated during collection."""
+    testdir.makepyfile("""
+        import pytest
+        def explode():
+            raise RuntimeError('should not be called')
+        @pytest.mark.faux_callable(3, explode, lazy=True)
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest('--collect-only')
+    result.stdout.fnmatch_lines(['*3 tests collected*'])
+    assert result.ret == 0
+
+
+def test_lazy_ini_generates_selected_items_only(testdir):
+    """Check that only items reaching setup generate their values."""
+    testdir.makeini("""
+        [pytest]
+        faux_lazy = true
+    """)
+    testdir.makepyfile("""
+        import pytest
+        CALLS = []
+        def counted():
+            CALLS.append(1)
+            return len(CALLS)
+        @pytest.mark.faux_callable(10, counted)
+        def test_something(value):
+            assert value == 1
+    """)
+    result = testdir.runpytest('-k', 'faux_callable_7')
+    result.assert_outcomes(passed=1)
+    assert result.ret == 0
+
+
+def test_lazy_multiple_argument_names(testdir):
+    """Check that lazy values are unpacked into multiple argument names."""
+    testdir.makepyfile("""
+        import pytest
+        def pair():
+            return 'foo', 'bar'
+        @pytest.mark.faux_callable(2, pair, argnames='foo, bar', lazy=True)
+        def test_something(foo, bar):
+            assert foo == 'foo'
+            assert bar == 'bar'
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=2)
+    assert result.ret == 0
+
+
+def test_lazy_faux_string(testdir):
+    """Check that lazy strings honor the mark arguments."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(4, 'alpha', length=[5, 15], lazy=True)
+        def test_something(value):
+            assert value.isalpha()
+            assert len(value) in (5, 15)
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=4)
+    assert result.ret == 0
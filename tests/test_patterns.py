@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Test generating strings matching a pattern."""
+import random
+import re
+
+import pytest
+
+from pytest_fauxfactory.marks import faux_string
+from pytest_fauxfactory.patterns import compile_pattern, gen_matching
+
+PATTERNS = [
+    r'^[A-Z]{3}-\d{4}$',
+    r'(web|db|cache)-\d{2}\.example\.com',
+    r'[a-f0-9]{8}(-[a-f0-9]{4}){3}-[a-f0-9]{12}',
+    r'\w+@\w+\.(?:com|org)',
+    r'a*b+c?',
+    r'[^a-z]{5}',
+    r'(?P<pair>ab|cd){2,4}',
+    r'x{2,}',
+    r'a{,3}b',
+    r'y{,}',
+    r'a{}',
+    r'[]a-]',
+    r'\S\W\D\s',
+    r'a{b',
+    r'(a|)z',
+    r'.\.\$',
+    r'a\\$',
+    r'b\\\$',
+    u'é[à-ÿ]{3}',
+]
+
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_gen_matching(pattern):
+    """Check that every generated string matches the pattern."""
+    for value in gen_matching(random.Random(1), pattern, 500):
+        assert re.fullmatch(pattern, value)
+
+
+@pytest.mark.parametrize('pattern', [
+    '(a', 'a)', 'a**', r'\1', '(?=a)', '[z-a]', r'[^\s\S]', 'a^b', '[a',
+])
+def test_unsupported_pattern(pattern):
+    """Check that patterns outside of the supported subset are refused."""
+    with pytest.raises(ValueError):
+        compile_pattern(pattern)
+
+
+def test_gen_matching_is_seeded():
+    """Check that strings only depend on the random generator."""
+    pattern = PATTERNS[1]
+    first = gen_matching(random.Random(1), pattern, 100)
+    assert gen_matching(random.Random(1), pattern, 100) == first
+    assert gen_matching(random.Random(2), pattern, 100) != first
+
+
+def test_compiled_patterns_are_cached():
+    """Check that a pattern is only parsed once."""
+    assert compile_pattern(PATTERNS[0]) is compile_pattern(PATTERNS[0])
+
+
+def test_faux_string_pattern():
+    """Check that faux_string generates strings matching a pattern."""
+    values = list(faux_string(20, pattern=PATTERNS[0]))
+    assert len(values) == 20
+    assert all(re.fullmatch(PATTERNS[0], value) for value in values)
+
+
+def test_pattern_mark(testdir):
+    """Check that the pattern option parametrizes matching strings."""
+    testdir.makepyfile("""
+        import re
+        import pytest
+        @pytest.mark.faux_string(10, pattern=r'SKU-[A-Z]{2}\\d{3}')
+        def test_something(value):
+            assert re.fullmatch(r'SKU-[A-Z]{2}\\d{3}', value)
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=10)
+
+
+def test_pattern_mark_unsupported(testdir):
+    """Check that an unsupported pattern is detected."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(2, pattern=r'(\\w)\\1')
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(['*Unsupported pattern: Unsupported escape*'])
+
+
+def test_pattern_mark_with_string_type(testdir):
+    """Check that a pattern cannot be combined with a string type."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(2, 'alpha', pattern='[a-z]+')
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(['*does not accept a string type*'])
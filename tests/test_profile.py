@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Test profiling the generation of faux mark values."""
+import json
+
+from pytest_fauxfactory.profile import GenerationRecord, Profiler
+
+PROFILE_TEST = """
+    import pytest
+    @pytest.mark.faux_string(20, 'alpha')
+    def test_strings(value):
+        assert value
+    @pytest.mark.faux_callable(5, lambda: 'foo', lazy=True)
+    def test_lazy(value):
+        assert value == 'foo'
+"""
+
+
+def test_profile_summary(testdir):
+    """Check that the slowest generations are shown in the summary."""
+    testdir.makepyfile(PROFILE_TEST)
+    result = testdir.runpytest('--faux-profile')
+    result.assert_outcomes(passed=25)
+    result.stdout.fnmatch_lines([
+        '*fauxfactory slowest 10 generations*',
+        '*total*handler*items*per item*memory*test',
+    ])
+    result.stdout.fnmatch_lines_random([
+        '* 20 *test_profile_summary.py::test_strings (faux_string)',
+        '* 5 *test_profile_summary.py::test_lazy (faux_callable)',
+    ])
+
+
+def test_no_profile_summary(testdir):
+    """Check that nothing is reported without the option."""
+    testdir.makepyfile(PROFILE_TEST)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=25)
+    assert 'fauxfactory slowest' not in result.stdout.str()
+
+
+def test_profile_json(testdir):
+    """Check that records are dumped to a JSON file."""
+    testdir.makepyfile(PROFILE_TEST)
+    result = testdir.runpytest('--faux-profile-json=profile.json')
+    result.assert_outcomes(passed=25)
+    assert 'fauxfactory slowest' not in result.stdout.str()
+    records = json.loads(testdir.tmpdir.join('profile.json').read())
+    items = {
+        record['nodeid'].split('::')[1]: record['items']
+        for record in records
+    }
+    assert items == {'test_strings': 20, 'test_lazy': 5}
+    for record in records:
+        assert record['memory'] > 0
+        assert record['total_time'] >= record['handler_time']
+
+
+def test_slowest_records():
+    """Check that records are sorted by the total time spent."""
+    profiler = Profiler()
+    profiler.record('test_a', 'faux_string').generation_time = 1.0
+    profiler.record('test_b', 'faux_string').generation_time = 3.0
+    profiler.record('test_c', 'faux_string').handler_time = 2.0
+    assert [record.nodeid for record in profiler.slowest(2)] == [
+        'test_b', 'test_c']
+
+
+def test_per_item_time():
+    """Check the average time spent per item."""
+    record = GenerationRecord('test_a', 'faux_string')
+    assert record.per_item == 0.0
+    record.add(['foo', 'bar'])
+    record.handler_time = 0.5
+    record.generation_time = 1.5
+    assert record.items == 2
+    assert record.per_item == 1.0
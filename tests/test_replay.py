@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""Test replaying the faux mark items that failed."""
+
+FAILING_TEST = """
+    import pytest
+    @pytest.mark.faux_callable(20, lambda: None)
+    def test_something(value, request):
+        with open('values.txt', 'a') as handle:
+            handle.write(request.node.callspec.id + '\\n')
+        assert request.node.callspec.id not in {failing}
+"""
+
+FAILING_IDS = ('faux_callable_3', 'faux_callable_11')
+
+
+def run_ids(testdir, *args):
+    """Run the tests and return the result and the IDs of the items run."""
+    values = testdir.tmpdir.join('values.txt')
+    if values.check():
+        values.remove()
+    result = testdir.runpytest(*args)
+    return result, values.read().splitlines() if values.check() else []
+
+
+def test_replay_failed_items(testdir):
+    """Check that only the failed items are run again."""
+    testdir.makepyfile(FAILING_TEST.format(failing=FAILING_IDS))
+    result, _ = run_ids(testdir)
+    result.assert_outcomes(passed=18, failed=2)
+
+    result, ids = run_ids(testdir, '--faux-replay-failures')
+    result.assert_outcomes(failed=2)
+    assert tuple(ids) == FAILING_IDS
+
+
+def test_replay_failed_values(testdir):
+    """Check that failed items are run with the values they failed with,
+    whatever the seed."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(20, 'alpha')
+        def test_something(value):
+            with open('values.txt', 'a') as handle:
+                handle.write(value + '\\n')
+            assert value[0] not in 'abcdefghijklm'
+    """)
+    result, values = run_ids(testdir, '--faux-seed=1')
+    failed = [value for value in values if value[0] in 'abcdefghijklm']
+    assert failed
+    result.assert_outcomes(passed=20 - len(failed), failed=len(failed))
+
+    result, replayed = run_ids(
+        testdir, '--faux-replay-failures', '--faux-seed=2')
+    result.assert_outcomes(failed=len(failed))
+    assert replayed == failed
+
+
+def test_replay_does_not_generate_values(testdir):
+    """Check that replayed values are not generated again."""
+    testdir.makepyfile("""
+        import pytest
+        def make_value():
+            with open('calls.txt', 'a') as handle:
+                handle.write('call\\n')
+            return 1
+        @pytest.mark.faux_callable(5, make_value)
+        def test_something(value):
+            assert value == 2
+    """)
+    testdir.runpytest().assert_outcomes(failed=5)
+    testdir.tmpdir.join('calls.txt').remove()
+    testdir.runpytest('--faux-replay-failures').assert_outcomes(failed=5)
+    assert not testdir.tmpdir.join('calls.txt').check()
+
+
+def test_passing_items_are_forgotten(testdir):
+    """Check that items passing when replayed are not replayed again."""
+    testdir.makepyfile(FAILING_TEST.format(failing=FAILING_IDS))
+    run_ids(testdir)
+    testdir.makepyfile(FAILING_TEST.format(failing=FAILING_IDS[:1]))
+
+    result, ids = run_ids(testdir, '--faux-replay-failures')
+    result.assert_outcomes(passed=1, failed=1)
+
+    result, ids = run_ids(testdir, '--faux-replay-failures')
+    result.assert_outcomes(failed=1)
+    assert ids == list(FAILING_IDS[:1])
+
+
+def test_replay_skips_tests_without_failures(testdir):
+    """Check that faux tests without failed items are not run."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(5)
+        def test_passing(value):
+            assert value
+        @pytest.mark.faux_callable(5, lambda: 1)
+        def test_failing(value):
+            assert value == 2
+        def test_plain():
+            assert True
+    """)
+    testdir.runpytest().assert_outcomes(passed=6, failed=5)
+    result = testdir.runpytest('--faux-replay-failures')
+    result.assert_outcomes(passed=1, failed=5, skipped=1)
+
+
+def test_replay_multiple_argnames(testdir):
+    """Check that values split between several argnames are replayed."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_callable(
+            4, lambda: ('foo', 1), argnames='name, number')
+        def test_something(name, number):
+            assert (name, number) == ('bar', 1)
+    """)
+    testdir.runpytest().assert_outcomes(failed=4)
+    result = testdir.runpytest('--faux-replay-failures', '-v')
+    result.assert_outcomes(failed=4)
+    result.stdout.fnmatch_lines(['*test_something[[]faux_callable_0[]]*'])
+
+
+def test_replay_needs_cache(testdir):
+    """Check that replaying failures without a cache is refused."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(1)
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest(
+        '-p', 'no:cacheprovider', '--faux-replay-failures')
+    assert result.ret != 0
+    result.stderr.fnmatch_lines(['*--faux-replay-failures needs*'])
+
+
+def test_replay_sibling_parametrizations(testdir):
+    """Check that an item failing in one parametrization is replayed even
+    when it passes in the others."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(3, argnames='v')
+        @pytest.mark.parametrize('n', [1, 2])
+        def test_something(v, n):
+            assert n == 2
+    """)
+    testdir.runpytest().assert_outcomes(passed=3, failed=3)
+    result = testdir.runpytest('--faux-replay-failures')
+    result.assert_outcomes(passed=3, failed=3)
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(3, argnames='v')
+        @pytest.mark.parametrize('n', [1, 2])
+        def test_something(v, n):
+            assert True
+    """)
+    testdir.runpytest('--faux-replay-failures').assert_outcomes(passed=6)
+    result = testdir.runpytest('--faux-replay-failures')
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""Test scaling the number of items of every faux mark."""
+import pytest
+
+from pytest_fauxfactory.handlers import scale_items
+
+SCALE_TEST = """
+    import pytest
+    def numbers():
+        for number in range(10):
+            yield number
+    @pytest.mark.faux_string(100)
+    def test_string(value):
+        assert value
+    @pytest.mark.faux_callable(20, lambda: 'foo', min_items=5)
+    def test_callable(value):
+        assert value == 'foo'
+    @pytest.mark.faux_string(10, max_items=12)
+    def test_clamped(value):
+        assert value
+    @pytest.mark.faux_generator(numbers())
+    def test_generator(value):
+        assert value < 10
+"""
+
+
+def count_items(result):
+    """Return the number of items collected per test function."""
+    counts = {}
+    for line in result.stdout.lines:
+        if '::test_' in line and '[' in line:
+            name = line.split('::')[1].split('[')[0]
+            counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def test_scale_option(testdir):
+    """Check that the command line option scales every mark."""
+    testdir.makepyfile(SCALE_TEST)
+    result = testdir.runpytest('--collect-only', '-q', '--faux-scale=0.1')
+    assert count_items(result) == {
+        'test_string': 10,
+        'test_callable': 5,
+        'test_clamped': 1,
+        'test_generator': 1,
+    }
+
+
+def test_scale_ini(testdir):
+    """Check that the ini option scales every mark."""
+    testdir.makeini("""
+        [pytest]
+        faux_scale = 2
+    """)
+    testdir.makepyfile(SCALE_TEST)
+    result = testdir.runpytest('--collect-only', '-q')
+    assert count_items(result) == {
+        'test_string': 200,
+        'test_callable': 40,
+        'test_clamped': 12,
+        'test_generator': 10,
+    }
+
+
+def test_scale_option_overrides_ini(testdir):
+    """Check that the command line option wins over the ini option."""
+    testdir.makeini("""
+        [pytest]
+        faux_scale = 2
+    """)
+    testdir.makepyfile(SCALE_TEST)
+    result = testdir.runpytest('--collect-only', '-q', '--faux-scale=1')
+    assert count_items(result)['test_string'] == 100
+
+
+def test_no_scale(testdir):
+    """Check that clamps apply without scaling."""
+    testdir.makepyfile(SCALE_TEST)
+    result = testdir.runpytest('--collect-only', '-q')
+    assert count_items(result) == {
+        'test_string': 100,
+        'test_callable': 20,
+        'test_clamped': 10,
+        'test_generator': 10,
+    }
+
+
+def test_invalid_scale(testdir):
+    """Check that an invalid scale is detected."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(10)
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest('--faux-scale=-1')
+    result.assert_outcomes(errors=1)
+    assert 'scale to be a number greater than 0, got -1' in (
+        result.stdout.str())
+
+
+def test_scale_items():
+    """Check that scaled items are rounded and clamped."""
+    assert scale_items(10, {}) == 10
+    assert scale_items(10, {'scale': 0.25}) == 2
+    assert scale_items(10, {'scale': 0.01}) == 1
+    assert scale_items(10, {'scale': 0.01, 'min_items': 3}) == 3
+    assert scale_items(10, {'scale': 5, 'max_items': 20}) == 20
+    assert scale_items(10) == 10
+
+
+def test_scale_keywords_reach_callable(testdir):
+    """Check that keywords named like the settings of the plugin reach the
+    callable of the mark."""
+    testdir.makepyfile("""
+        import pytest
+        def make_value(scale, base_dir, corpus_dir):
+            return (scale, base_dir, corpus_dir)
+        @pytest.mark.faux_callable(
+            2, make_value, scale=3, base_dir='a', corpus_dir='b')
+        def test_something(value):
+            assert value == (3, 'a', 'b')
+    """)
+    result = testdir.runpytest('--faux-scale=2')
+    result.assert_outcomes(passed=4)
+
+
+@pytest.mark.parametrize('settings', [
+    {'min_items': 0},
+    {'max_items': '5'},
+    {'min_items': 5, 'max_items': 4},
+    {'scale': 'big'},
+])
+def test_scale_items_invalid(settings):
+    """Check that invalid clamps are rejected."""
+    with pytest.raises(pytest.UsageError):
+        scale_items(10, settings)
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""Test the scope and finalizer of faux mark values."""
+
+EVENTS = """
+    import itertools
+    import pytest
+
+    counter = itertools.count()
+
+    def log(*event):
+        with open('events.txt', 'a') as handle:
+            handle.write(' '.join(map(str, event)) + '\\n')
+
+    def make_resource():
+        resource = {{'number': next(counter)}}
+        log('make', resource['number'])
+        return resource
+
+    def close_resource(resource):
+        log('close', resource['number'])
+
+    {tests}
+"""
+
+
+def run_events(testdir, tests, **outcomes):
+    """Run ``tests`` and return the events they logged."""
+    testdir.makepyfile(EVENTS.format(tests=tests))
+    result = testdir.runpytest('-p', 'no:randomly')
+    result.assert_outcomes(**outcomes)
+    return testdir.tmpdir.join('events.txt').read().splitlines()
+
+
+def test_finalizer(testdir):
+    """Check that each value is finalized once its test is done."""
+    events = run_events(testdir, """
+    @pytest.mark.faux_callable(2, make_resource, finalizer=close_resource)
+    def test_something(value):
+        log('use', value['number'])
+    """, passed=2)
+    assert events == [
+        'make 0', 'use 0', 'close 0', 'make 1', 'use 1', 'close 1']
+
+
+def test_module_scope_stacked(testdir):
+    """Check that a module scoped value is built once for all its tests."""
+    events = run_events(testdir, """
+    @pytest.mark.faux_string(3, 'alpha', argnames='name')
+    @pytest.mark.faux_callable(
+        2, make_resource, argnames='resource', scope='module',
+        finalizer=close_resource)
+    def test_something(resource, name):
+        log('use', resource['number'])
+    """, passed=6)
+    assert events == [
+        'make 0', 'use 0', 'use 0', 'use 0', 'close 0',
+        'make 1', 'use 1', 'use 1', 'use 1', 'close 1',
+    ]
+
+
+def test_module_scope_shared(testdir):
+    """Check that shared scoped values are used by every test in turn."""
+    events = run_events(testdir, """
+    @pytest.mark.faux_callable(2, make_resource, shared=True, scope='module')
+    def test_first(value):
+        log('use', value['number'])
+
+    @pytest.mark.faux_callable(2, make_resource, shared=True, scope='module')
+    def test_second(value):
+        log('use', value['number'])
+    """, passed=4)
+    assert events == ['make 0', 'make 1', 'use 0', 'use 0', 'use 1', 'use 1']
+
+
+def test_shared_finalizer(testdir):
+    """Check that shared values cannot be finalized."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_callable(2, dict, shared=True, finalizer=print)
+        def test_something(value):
+            assert value == {}
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(['*cannot share values with a finalizer*'])
+
+
+def test_invalid_scope(testdir):
+    """Check that an unknown scope is detected."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(2, scope='test')
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(['*expected scope to be one of*'])
+
+
+def test_invalid_finalizer(testdir):
+    """Check that a finalizer has to be callable."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(2, finalizer='close')
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(['*expected finalizer to be callable*'])
+
+
+def test_scope_with_batch(testdir):
+    """Check that batches cannot be scoped."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(4, batch=2, scope='module')
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(['*cannot run values in batches*'])
+
+
+def test_scope_with_pairwise(testdir):
+    """Check that scoped stacked marks can only be combined as a product."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(2, argnames='name', combine='zip')
+        @pytest.mark.faux_callable(2, dict, scope='module')
+        def test_something(name, value):
+            assert name
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(["*only be combined with combine='product'*"])
+
+
+def test_scoped_value_error(testdir):
+    """Check that a scoped value failing to generate errors its tests."""
+    testdir.makepyfile("""
+        import pytest
+        def broken():
+            raise RuntimeError('no resource')
+        @pytest.mark.faux_callable(2, broken, scope='module')
+        @pytest.mark.faux_string(2, 'alpha', argnames='name')
+        def test_something(value, name):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=4)
+    result.stdout.fnmatch_lines(['*RuntimeError: no resource*'])
+    assert 'AssertionError' not in result.stdout.str()
+
+
+def test_scoped_value_error_retried(testdir):
+    """Check that a scoped value failing to generate is generated again for
+    the next test."""
+    testdir.makepyfile("""
+        import itertools
+        import pytest
+        calls = itertools.count()
+        def flaky():
+            if next(calls) == 0:
+                raise RuntimeError('not yet')
+            return 'resource'
+        @pytest.mark.faux_callable(1, flaky, scope='module')
+        @pytest.mark.faux_string(3, 'alpha', argnames='name')
+        def test_something(value, name):
+            assert value == 'resource'
+    """)
+    result = testdir.runpytest('-p', 'no:randomly')
+    result.assert_outcomes(passed=2, errors=1)
+    result.stdout.fnmatch_lines(['*RuntimeError: not yet*'])
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""Test the seeding of faux mark values."""
+import asyncio
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import fauxfactory
+
+from pytest_fauxfactory.asynchronous import AsyncDataset
+from pytest_fauxfactory.dataset import BlockDataset, Dataset
+from pytest_fauxfactory.marks import faux_callable_factory, faux_string_factory
+from pytest_fauxfactory.rng import derive_seed, seeded
+
+VALUES_TEST = """
+    import pytest
+    @pytest.mark.faux_string(5)
+    def test_something(value):
+        with open('values.txt', 'a') as handle:
+            handle.write(repr(value) + '\\n')
+"""
+
+
+def collected_values(testdir, *args):
+    """Run the values test and return the values it received."""
+    values = testdir.tmpdir.join('values.txt')
+    if values.check():
+        values.remove()
+    result = testdir.runpytest(*args)
+    result.assert_outcomes(passed=5)
+    return values.read().splitlines()
+
+
+def test_same_seed_same_values(testdir):
+    """Check that runs with the same seed get the same values."""
+    testdir.makepyfile(VALUES_TEST)
+    first = collected_values(testdir, '--faux-seed=42')
+    second = collected_values(testdir, '--faux-seed=42')
+    assert first == second
+
+
+def test_different_seed_different_values(testdir):
+    """Check that runs with different seeds get different values."""
+    testdir.makepyfile(VALUES_TEST)
+    first = collected_values(testdir, '--faux-seed=1')
+    second = collected_values(testdir, '--faux-seed=2')
+    assert first != second
+
+
+def test_lazy_values_match_eager_values(testdir):
+    """Check that lazy and eager generation agree for a given seed."""
+    testdir.makepyfile(VALUES_TEST)
+    eager = collected_values(testdir, '--faux-seed=7')
+    lazy = collected_values(testdir, '--faux-seed=7', '-o', 'faux_lazy=true')
+    assert eager == lazy
+
+
+def test_seed_in_report_header(testdir):
+    """Check that the seed is reported so a run can be reproduced."""
+    testdir.makepyfile(VALUES_TEST)
+    result = testdir.runpytest('--faux-seed=1234')
+    result.stdout.fnmatch_lines(['fauxfactory seed: 1234'])
+
+
+def test_dataset_items_do_not_depend_on_order():
+    """Check that an item is the same whether generated alone or not."""
+    dataset = BlockDataset(
+        1000, faux_string_factory('alpha'), seed='seed')
+    values = list(dataset)
+    assert dataset[700] == values[700]
+    assert dataset[3] == values[3]
+
+
+def test_seeded_restores_random_state():
+    """Check that seeding does not leak into the global random state."""
+    state = random.getstate()
+    with seeded(derive_seed(1, 'node')):
+        random.random()
+    assert random.getstate() == state
+
+
+def test_thread_pool_values_match_serial_values():
+    """Check that threads generating values do not share a random state."""
+    dataset = Dataset(
+        200, lambda index: fauxfactory.gen_alpha(length=8), seed='seed')
+    assert dataset.materialize(workers=4) == list(dataset)
+
+
+def test_seeded_threads_get_their_own_values():
+    """Check that values drawn in a seeded thread only depend on its seed."""
+    def draw(seed):
+        with seeded(seed):
+            return [fauxfactory.gen_integer() for _ in range(500)]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        values = list(executor.map(draw, range(8)))
+    assert values == [draw(seed) for seed in range(8)]
+
+
+def test_seeded_thread_leaves_global_random_state_alone():
+    """Check that seeding in another thread does not touch `random`."""
+    def draw():
+        with seeded(1):
+            fauxfactory.gen_integer()
+
+    state = random.getstate()
+    thread = threading.Thread(target=draw)
+    thread.start()
+    thread.join()
+    assert random.getstate() == state
+
+
+def test_async_values_do_not_depend_on_concurrency():
+    """Check that concurrent coroutines draw from their own generators."""
+    async def make_value():
+        first = fauxfactory.gen_alpha()
+        await asyncio.sleep(random.random() / 100)
+        return first, fauxfactory.gen_alpha()
+
+    factory = faux_callable_factory(make_value)
+    serial = AsyncDataset(20, factory, seed='seed', concurrency=1)
+    concurrent = AsyncDataset(20, factory, seed='seed')
+    assert concurrent.materialize() == serial.materialize()
+
+
+def test_fauxfactory_uses_current_random():
+    """Check that fauxfactory draws from the generator of the context, the
+    global random state when unseeded."""
+    random.seed(3)
+    first = fauxfactory.gen_integer()
+    random.seed(3)
+    assert fauxfactory.gen_integer() == first
+
+    with seeded(3):
+        state = random.getstate()
+        fauxfactory.gen_integer()
+        assert random.getstate() == state
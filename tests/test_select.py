@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Test generating only the items selected on the command line."""
+from pytest_fauxfactory.helpers import parse_index, parse_selected_ids
+
+VALUES_TEST = """
+    import pytest
+    @pytest.mark.faux_string(1000, 'alpha')
+    def test_something(value):
+        with open('values.txt', 'a') as handle:
+            handle.write(value + '\\n')
+"""
+
+
+def run_values(testdir, *args):
+    """Run the values test and return the values it received."""
+    values = testdir.tmpdir.join('values.txt')
+    if values.check():
+        values.remove()
+    testdir.runpytest(*args)
+    return values.read().splitlines()
+
+
+def test_selected_item_matches_full_run(testdir):
+    """Check that a selected item gets the value it had in the full run."""
+    testfile = testdir.makepyfile(VALUES_TEST)
+    values = run_values(testdir, '--faux-seed=3')
+    selected = run_values(
+        testdir, '--faux-seed=3',
+        '{}::test_something[faux_string_700]'.format(testfile.basename))
+    assert selected == [values[700]]
+
+
+def test_selected_item_only_generates_its_value(testdir):
+    """Check that selecting items does not generate the other ones."""
+    testfile = testdir.makepyfile("""
+        import pytest
+        def counted():
+            with open('calls.txt', 'a') as handle:
+                handle.write('.')
+            return 'foo'
+        @pytest.mark.faux_callable(100, counted)
+        def test_something(value):
+            assert value == 'foo'
+    """)
+    result = testdir.runpytest(
+        '{}::test_something[faux_callable_42]'.format(testfile.basename),
+        '{}::test_something[faux_callable_7]'.format(testfile.basename))
+    result.assert_outcomes(passed=2)
+    assert testdir.tmpdir.join('calls.txt').read() == '..'
+
+
+def test_selected_batch(testdir):
+    """Check that a batch can be selected by its ID."""
+    testfile = testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(100, batch=10)
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest(
+        '-v', '{}::test_something[faux_string_30-39]'.format(
+            testfile.basename))
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(['*test_something?faux_string_30-39? PASSED*'])
+
+
+def test_parse_selected_ids(tmpdir):
+    """Check that selected IDs are grouped per test."""
+    selected = parse_selected_ids([
+        'test_a.py::test_foo[faux_string_1]',
+        'test_a.py::test_foo[faux_string_2]',
+        'test_a.py::TestBar::test_bar',
+        'test_a.py::TestBar::test_bar[faux_string_3]',
+        'test_b.py',
+    ], tmpdir)
+    path = str(tmpdir.join('test_a.py'))
+    assert selected == {
+        (path, 'test_foo'): {'faux_string_1', 'faux_string_2'},
+        (path, 'TestBar::test_bar'): None,
+    }
+
+
+def test_parse_index():
+    """Check that item indexes are read from our IDs only."""
+    assert parse_index('faux_string_12', 'faux_string') == 12
+    assert parse_index('faux_string_10-19', 'faux_string') == 10
+    assert parse_index('faux_string_12-foo', 'faux_string') is None
+    assert parse_index('faux_callable_12', 'faux_string') is None
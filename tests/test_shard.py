@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Test sharding faux mark items between several runs."""
+import argparse
+
+import pytest
+
+from pytest_fauxfactory.helpers import parse_shard
+
+SHARD_TEST = """
+    import pytest
+    @pytest.mark.faux_string(10)
+    def test_something(value):
+        assert value
+"""
+
+
+def collected_ids(testdir, *args):
+    """Return the parametrize IDs collected with ``args``."""
+    result = testdir.runpytest('--collect-only', '-q', *args)
+    return [
+        line.split('[')[1].rstrip(']')
+        for line in result.stdout.lines
+        if '::test_something[' in line
+    ]
+
+
+def test_shards_split_items(testdir):
+    """Check that shards own disjoint items and cover all of them."""
+    testdir.makepyfile(SHARD_TEST)
+    shards = [
+        collected_ids(testdir, '--faux-shard={}/3'.format(number))
+        for number in (1, 2, 3)
+    ]
+    assert shards[0] == ['faux_string_0', 'faux_string_3', 'faux_string_6',
+                         'faux_string_9']
+    assert shards[1] == ['faux_string_1', 'faux_string_4', 'faux_string_7']
+    assert shards[2] == ['faux_string_2', 'faux_string_5', 'faux_string_8']
+
+
+def test_shards_split_batches(testdir):
+    """Check that batches are dealt between shards."""
+    testdir.makepyfile(SHARD_TEST.replace('(10)', '(10, batch=4)'))
+    assert collected_ids(testdir, '--faux-shard=1/2') == [
+        'faux_string_0-3', 'faux_string_8-9']
+    assert collected_ids(testdir, '--faux-shard=2/2') == ['faux_string_4-7']
+
+
+def test_shard_values_match_full_run(testdir):
+    """Check that sharded items keep the values of the full run."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(6)
+        def test_something(value):
+            with open('values.txt', 'a') as handle:
+                handle.write(value + '\\n')
+    """)
+    testdir.runpytest('--faux-seed=5')
+    values = testdir.tmpdir.join('values.txt').read().splitlines()
+    testdir.tmpdir.join('values.txt').remove()
+    testdir.runpytest('--faux-seed=5', '--faux-shard=2/2')
+    sharded = testdir.tmpdir.join('values.txt').read().splitlines()
+    assert sharded == values[1::2]
+
+
+@pytest.mark.parametrize('value', ['0/2', '3/2', '1', 'a/b'])
+def test_parse_shard_invalid(value):
+    """Check that invalid shards are rejected."""
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_shard(value)
+
+
+def test_parse_shard():
+    """Check that shards are parsed."""
+    assert parse_shard('2/4') == (2, 4)
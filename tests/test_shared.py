@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""Test sharing the values of identical faux marks between tests."""
+from pytest_fauxfactory.pool import DatasetPool
+
+
+def test_shared_values_are_generated_once(testdir):
+    """Check that identical shared marks generate their values once."""
+    testdir.makepyfile("""
+        import pytest
+        CALLS = []
+        def counted():
+            CALLS.append(1)
+            return len(CALLS)
+        @pytest.mark.faux_callable(5, counted, shared=True)
+        def test_foo(value):
+            assert value <= 5
+        @pytest.mark.faux_callable(5, counted, shared=True)
+        def test_bar(value):
+            assert value <= 5
+        def test_calls():
+            assert len(CALLS) == 5
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=11)
+    assert result.ret == 0
+
+
+def test_shared_values_are_identical(testdir):
+    """Check that tests sharing a mark receive the same values."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(4, 'utf8', length=8, shared=True)
+        def test_foo(value):
+            with open('foo.txt', 'a') as handle:
+                handle.write(value + '\\n')
+        @pytest.mark.faux_string(4, 'utf8', length=8, shared=True)
+        def test_bar(value):
+            with open('bar.txt', 'a') as handle:
+                handle.write(value + '\\n')
+        @pytest.mark.faux_string(4, 'utf8', length=8)
+        def test_baz(value):
+            with open('baz.txt', 'a') as handle:
+                handle.write(value + '\\n')
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=12)
+    foo = testdir.tmpdir.join('foo.txt').read()
+    assert foo == testdir.tmpdir.join('bar.txt').read()
+    assert foo != testdir.tmpdir.join('baz.txt').read()
+
+
+def test_shared_values_do_not_depend_on_tests(testdir):
+    """Check that shared values only depend on the seed and the mark."""
+    test = """
+        import pytest
+        @pytest.mark.faux_string(3, 'alpha', shared=True)
+        def test_{}(value):
+            with open('values.txt', 'a') as handle:
+                handle.write(value + '\\n')
+    """
+    testdir.makepyfile(test_a=test.format('a'))
+    testdir.runpytest('--faux-seed=3')
+    values = testdir.tmpdir.join('values.txt').read()
+    testdir.tmpdir.join('values.txt').remove()
+    testdir.tmpdir.join('test_a.py').remove()
+    testdir.makepyfile(test_b=test.format('b'))
+    testdir.runpytest('--faux-seed=3')
+    assert testdir.tmpdir.join('values.txt').read() == values
+
+
+def test_named_pools(testdir):
+    """Check that named pools are kept apart from each other."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(2, 'alpha', shared='users')
+        def test_foo(value):
+            with open('foo.txt', 'a') as handle:
+                handle.write(value + '\\n')
+        @pytest.mark.faux_string(2, 'alpha', shared='users')
+        def test_bar(value):
+            with open('bar.txt', 'a') as handle:
+                handle.write(value + '\\n')
+        @pytest.mark.faux_string(2, 'alpha', shared='groups')
+        def test_baz(value):
+            with open('baz.txt', 'a') as handle:
+                handle.write(value + '\\n')
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=6)
+    foo = testdir.tmpdir.join('foo.txt').read()
+    assert foo == testdir.tmpdir.join('bar.txt').read()
+    assert foo != testdir.tmpdir.join('baz.txt').read()
+
+
+def test_named_pool_with_different_arguments(testdir):
+    """Check that a named pool cannot hold values of different marks."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(2, 'alpha', shared='users')
+        def test_foo(value):
+            assert value
+        @pytest.mark.faux_string(3, 'alpha', shared='users')
+        def test_bar(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    assert 'Shared pool users is used by marks with different arguments' in (
+        result.stdout.str())
+
+
+def test_pool_evicts_least_recently_used():
+    """Check that the oldest values are dropped beyond the size limit."""
+    values = ['x' * 100] * 10
+    pool = DatasetPool(max_size=3500)
+    pool.set('a', values)
+    pool.set('b', values)
+    assert pool.get('a') is values
+    pool.set('c', values)
+    assert 'a' in pool
+    assert 'b' not in pool
+    assert 'c' in pool
+    assert pool.size <= pool.max_size
+
+
+def test_pool_skips_values_too_large():
+    """Check that values larger than the pool are not kept."""
+    pool = DatasetPool(max_size=10)
+    pool.set('a', ['foo'])
+    assert 'a' not in pool
+    assert pool.size == 0
+
+
+def test_shared_lambdas(testdir):
+    """Check that lambdas with the same name do not share their values."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_callable(2, lambda: 'one', shared=True)
+        def test_one(value):
+            assert value == 'one'
+        @pytest.mark.faux_callable(2, lambda: 'two', shared=True)
+        def test_two(value):
+            assert value == 'two'
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=4)
+
+
+def test_shared_closures(testdir):
+    """Check that closures of the same factory do not share their values."""
+    testdir.makepyfile("""
+        import pytest
+        def make(letter):
+            def factory():
+                return letter
+            return factory
+        @pytest.mark.faux_callable(2, make('a'), shared=True)
+        def test_a(value):
+            assert value == 'a'
+        @pytest.mark.faux_callable(2, make('b'), shared=True)
+        def test_b(value):
+            assert value == 'b'
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=4)
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""Test that sessions without faux marks do not load the generation code."""
+
+
+def test_no_faux_marks(testdir):
+    """Check that fauxfactory is not imported without faux marks."""
+    testdir.makepyfile("""
+        import sys
+        def test_something():
+            assert 'fauxfactory' not in sys.modules
+            assert 'pytest_fauxfactory.handlers' not in sys.modules
+    """)
+    result = testdir.runpytest_subprocess()
+    result.assert_outcomes(passed=1)
+
+
+def test_faux_marks(testdir):
+    """Check that the handlers are imported once a faux mark is seen."""
+    testdir.makepyfile("""
+        import sys
+        import pytest
+        @pytest.mark.faux_string(2, 'alpha')
+        def test_something(value):
+            assert 'pytest_fauxfactory.handlers' in sys.modules
+            assert len(value) == 10
+    """)
+    result = testdir.runpytest_subprocess()
+    result.assert_outcomes(passed=2)
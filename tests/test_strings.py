@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Test the bulk string generation engine."""
+import random
+import unicodedata
+
+import pytest
+
+from pytest_fauxfactory.constants import STRING_TYPES
+from pytest_fauxfactory.marks import faux_string
+from pytest_fauxfactory.strings import get_alphabet, gen_strings
+
+
+@pytest.mark.parametrize('str_type', STRING_TYPES)
+def test_strings_use_type_alphabet(str_type):
+    """Check that generated strings only use the alphabet of their type."""
+    values = gen_strings(random.Random(1), [str_type] * 20, [15] * 20)
+    alphabet = set(get_alphabet(str_type))
+    for value in values:
+        if str_type == 'html':
+            value = value[value.index('>') + 1:value.rindex('<')]
+        assert len(value) == 15
+        assert set(value) <= alphabet
+
+
+def test_strings_cycle_types_and_lengths():
+    """Check that string types and lengths are cycled through per item."""
+    values = list(faux_string(6, ['alpha', 'numeric'], length=[5, 8, 3]))
+    assert [len(value) for value in values] == [5, 8, 3, 5, 8, 3]
+    assert all(value.isalpha() for value in values[0::2])
+    assert all(value.isdigit() for value in values[1::2])
+
+
+def test_strings_default_length():
+    """Check that strings default to the fauxfactory length."""
+    values = gen_strings(random.Random(), ['alpha', 'cjk'], [None, None])
+    assert [len(value) for value in values] == [10, 10]
+
+
+def test_strings_validator_default():
+    """Check that the default is returned when validation keeps failing."""
+    values = gen_strings(
+        random.Random(), ['punctuation'] * 3, [12] * 3,
+        validator=str.isnumeric, default='1')
+    assert values == ['1', '1', '1']
+
+
+def test_strings_regex_validator():
+    """Check that a regex validator retries until a value matches."""
+    values = gen_strings(
+        random.Random(), ['numeric'] * 5, [1] * 5,
+        validator='[0-4]', default='x', tries=1000)
+    assert all(value in '01234' for value in values)
+
+
+def test_strings_fauxfactory_options():
+    """Check that options unknown to the engine are left to fauxfactory."""
+    values = gen_strings(
+        random.Random(), ['alpha'] * 3, [12] * 3, start='foo')
+    assert all(len(value) == 12 and value.isalpha() for value in values)
+
+
+def test_strings_other_fauxfactory_types():
+    """Check that types without a bulk alphabet are left to fauxfactory."""
+    values = gen_strings(
+        random.Random(1), ['cyrillic', 'alpha'] * 3, [12] * 6)
+    assert all(len(value) == 12 for value in values)
+    assert all(
+        'CYRILLIC' in unicodedata.name(char)
+        for value in values[0::2] for char in value)
+    assert all(value.isalpha() for value in values[1::2])
+    assert gen_strings(random.Random(1), ['cyrillic'], [12]) == gen_strings(
+        random.Random(1), ['cyrillic'], [12])
+
+
+def test_strings_unknown_type():
+    """Check that types fauxfactory does not know are rejected."""
+    with pytest.raises(ValueError):
+        gen_strings(random.Random(), ['klingon'], [5])
+
+
+def test_strings_invalid_length():
+    """Check that invalid lengths are rejected like fauxfactory does."""
+    with pytest.raises(ValueError):
+        gen_strings(random.Random(), ['alpha'], [0])
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""Test bounding the generation of values with a time budget."""
+import itertools
+import time
+
+from pytest_fauxfactory.dataset import take
+
+
+def test_infinite_generator_max_items(testdir):
+    """Check that an infinite generator is bounded by max_items."""
+    testdir.makepyfile("""
+        import itertools
+        import pytest
+        def numbers():
+            yield from itertools.count()
+        @pytest.mark.faux_generator(numbers(), max_items=5)
+        def test_something(value):
+            assert value < 5
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=5)
+    assert result.ret == 0
+
+
+def test_infinite_generator_time_budget(testdir):
+    """Check that an infinite generator stops when its time runs out."""
+    testdir.makepyfile("""
+        import itertools
+        import time
+        import pytest
+        def slow_numbers():
+            for number in itertools.count():
+                time.sleep(0.01)
+                yield number
+        @pytest.mark.faux_generator(slow_numbers(), time_budget=0.2)
+        def test_something(value):
+            assert value >= 0
+    """)
+    result = testdir.runpytest('-W', 'default')
+    result.stdout.fnmatch_lines([
+        '*faux_generator generated * items before its time budget of 0.2s '
+        'ran out*'])
+    assert result.ret == 0
+
+
+def test_fast_generator_time_budget(testdir):
+    """Check that a fast infinite generator with a time budget alone stops
+    at the default limit."""
+    testdir.makepyfile("""
+        import itertools
+        import pytest
+        @pytest.mark.faux_generator(
+            (number for number in itertools.count()), time_budget=60)
+        def test_something(value):
+            assert value >= 0
+    """)
+    result = testdir.runpytest('-W', 'default', '--collect-only', '-q')
+    result.stdout.fnmatch_lines([
+        '*faux_generator stopped at 10000 items*Set max_items*',
+        '10000 tests collected*'])
+
+
+def test_callable_time_budget(testdir):
+    """Check that a slow callable stops when its time runs out."""
+    testdir.makepyfile("""
+        import time
+        import pytest
+        def slow_value():
+            time.sleep(0.05)
+            return 'foo'
+        @pytest.mark.faux_callable(1000, slow_value, time_budget=0.2)
+        def test_something(value):
+            assert value == 'foo'
+    """)
+    result = testdir.runpytest('-W', 'default')
+    result.stdout.fnmatch_lines([
+        '*faux_callable generated * of 1000 items before its time budget of '
+        '0.2s ran out*'])
+    assert result.ret == 0
+    assert result.parseoutcomes()['passed'] < 10
+
+
+def test_coroutine_time_budget(testdir):
+    """Check that slow coroutines are cancelled when the time runs out."""
+    testdir.makepyfile("""
+        import asyncio
+        import pytest
+        async def make_value(delay):
+            await asyncio.sleep(delay)
+            return delay
+        @pytest.mark.faux_callable(
+            10, make_value, 0.5, time_budget=0.1, concurrency=2)
+        def test_never(value):
+            assert value
+        @pytest.mark.faux_callable(3, make_value, 0, time_budget=5)
+        def test_fast(value):
+            assert value == 0
+    """)
+    result = testdir.runpytest('-W', 'default')
+    result.assert_outcomes(passed=3, skipped=1)
+    result.stdout.fnmatch_lines([
+        '*faux_callable generated 0 of 10 items before its time budget*'])
+
+
+def test_callable_within_budget_keeps_values(testdir):
+    """Check that a budget large enough keeps every value and warns not."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_callable(5, lambda: 'foo', time_budget=10)
+        def test_something(value):
+            assert value == 'foo'
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=5)
+    assert 'time budget' not in result.stdout.str()
+
+
+def test_ini_limits(testdir):
+    """Check that the ini options bound generator style marks."""
+    testdir.makeini("""
+        [pytest]
+        faux_max_items = 4
+        faux_time_budget = 10
+    """)
+    testdir.makepyfile("""
+        import itertools
+        import pytest
+        def numbers():
+            yield from itertools.count()
+        @pytest.mark.faux_generator(numbers())
+        def test_generator(value):
+            assert value < 4
+        @pytest.mark.faux_callable(10, lambda: 'foo')
+        def test_callable(value):
+            assert value == 'foo'
+        @pytest.mark.faux_callable(10, lambda: 'foo', max_items=6)
+        def test_own_limit(value):
+            assert value == 'foo'
+        @pytest.mark.faux_string(10)
+        def test_string(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=4 + 4 + 6 + 10)
+
+
+def test_invalid_time_budget(testdir):
+    """Check that an invalid time budget is detected."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_callable(2, lambda: 'foo', time_budget='1s')
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    assert 'time_budget to be a number greater than 0, got 1s' in (
+        result.stdout.str())
+
+
+def test_take():
+    """Check that values are taken until a limit is reached."""
+    assert take(range(3)) == ([0, 1, 2], False)
+    assert take(itertools.count(), max_items=2) == ([0, 1], False)
+
+    def slow():
+        for number in itertools.count():
+            time.sleep(0.01)
+            yield number
+    values, expired = take(slow(), time_budget=0.05)
+    assert expired
+    assert 1 <= len(values) <= 5
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Test generating distinct values with `unique=True`."""
+import pytest
+
+from pytest_fauxfactory.dataset import BlockDataset, Dataset
+from pytest_fauxfactory.helpers import value_digest
+from pytest_fauxfactory.marks import faux_string_factory
+
+
+def test_unique_strings(testdir):
+    """Check that short numeric strings are all distinct."""
+    testdir.makepyfile("""
+        import pytest
+        SEEN = set()
+        @pytest.mark.faux_string(60, 'numeric', length=2, unique=True)
+        def test_something(value):
+            assert value not in SEEN
+            SEEN.add(value)
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=60)
+    assert result.ret == 0
+
+
+def test_unique_callable(testdir):
+    """Check that a callable drawing from a small range is deduplicated."""
+    testdir.makepyfile("""
+        import random
+        import pytest
+        SEEN = set()
+        @pytest.mark.faux_callable(10, random.randint, 1, 20, unique=True)
+        def test_something(value):
+            assert value not in SEEN
+            SEEN.add(value)
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=10)
+    assert result.ret == 0
+
+
+def test_unique_generator_drops_duplicates(testdir):
+    """Check that duplicates yielded by generators are dropped."""
+    testdir.makepyfile("""
+        import pytest
+        def letters():
+            for letter in 'abacbd':
+                yield letter
+        @pytest.mark.faux_generator(letters(), unique=True)
+        def test_something(value):
+            assert value in 'abcd'
+    """)
+    result = testdir.runpytest('-v')
+    result.assert_outcomes(passed=4)
+    result.stdout.fnmatch_lines(['*test_something?faux_generator_3? PASSED*'])
+
+
+def test_unique_values_too_few(testdir):
+    """Check that asking for more values than exist is reported."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(11, 'numeric', length=1, unique=True)
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    assert 'Could not generate 11 unique values' in result.stdout.str()
+    assert result.ret == 2
+
+
+def test_unique_values_are_reproducible(testdir):
+    """Check that deduplicated values only depend on the seed."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_string(50, 'numeric', length=2, unique=True)
+        def test_something(value):
+            with open('values.txt', 'a') as handle:
+                handle.write(value + '\\n')
+    """)
+    testdir.runpytest('--faux-seed=9')
+    values = testdir.tmpdir.join('values.txt').read()
+    testdir.tmpdir.join('values.txt').remove()
+    testdir.runpytest('--faux-seed=9')
+    assert testdir.tmpdir.join('values.txt').read() == values
+
+
+def test_dataset_unique():
+    """Check that duplicate items are generated again."""
+    factory = faux_string_factory('numeric', length=1)
+    with pytest.raises(ValueError):
+        BlockDataset(11, factory, seed='seed').unique()
+    values = list(BlockDataset(10, factory, seed='seed').unique())
+    assert sorted(values) == list('0123456789')
+
+
+def test_dataset_unique_materialized():
+    """Check that duplicates of materialized datasets are dropped."""
+    dataset = Dataset.from_iterable([1, 2, 1, 3, 2]).unique()
+    assert list(dataset) == [1, 2, 3]
+
+
+def test_value_digest():
+    """Check that values are told apart by their representation."""
+    assert value_digest('foo') == value_digest('foo')
+    assert value_digest('foo') != value_digest('bar')
+    assert value_digest(1) != value_digest('1')
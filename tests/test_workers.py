@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Test the parallel generation of faux mark values."""
+import concurrent.futures
+import threading
+
+import fauxfactory
+
+from pytest_fauxfactory.dataset import BlockDataset, Dataset
+from pytest_fauxfactory.marks import (
+    faux_callable_factory,
+    faux_string_factory,
+)
+
+
+def test_process_pool_values_match_serial_values():
+    """Check that values generated by processes keep their seeded values."""
+    dataset = Dataset(
+        50, faux_callable_factory(fauxfactory.gen_alpha, length=8),
+        seed='seed')
+    assert dataset.materialize(workers=3) == list(dataset)
+
+
+def test_faux_string_uses_process_pool(monkeypatch):
+    """Check that faux_string values are generated by processes."""
+    pools = []
+
+    class RecordingPool(concurrent.futures.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            pools.append(self)
+            super(RecordingPool, self).__init__(*args, **kwargs)
+
+    monkeypatch.setattr(
+        concurrent.futures, 'ProcessPoolExecutor', RecordingPool)
+    dataset = BlockDataset(
+        1000, faux_string_factory('alpha', length=8), seed='seed')
+    assert dataset.materialize(workers=2) == list(dataset)
+    assert len(pools) == 1
+
+
+def test_block_dataset_threads():
+    """Check that threads generating items of different blocks get the
+    values of their own block."""
+    dataset = BlockDataset(
+        4 * BlockDataset.block_size,
+        lambda rng, start, stop: list(range(start, stop)))
+    errors = []
+
+    def generate(offset):
+        for index in range(offset, dataset.items, 4):
+            if dataset.generate(index) != index:
+                errors.append(index)
+
+    threads = [
+        threading.Thread(target=generate, args=(offset,))
+        for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_thread_pool_fallback_keeps_order():
+    """Check that unpicklable factories are run in threads, in order."""
+    dataset = Dataset(50, lambda index: index * 2)
+    assert dataset.materialize(workers=4) == list(range(0, 100, 2))
+
+
+def test_workers_mark_option(testdir):
+    """Check that the workers option generates every value."""
+    testdir.makepyfile("""
+        import pytest
+        def make_record(name):
+            return {'name': name}
+        @pytest.mark.faux_callable(20, make_record, 'foo', workers=2)
+        def test_something(value):
+            assert value == {'name': 'foo'}
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=20)
+    assert result.ret == 0
+
+
+def test_workers_command_line_option(testdir):
+    """Check that --faux-workers sets the default number of workers."""
+    testdir.makepyfile("""
+        import pytest
+        @pytest.mark.faux_callable(10, lambda: 'foo')
+        def test_something(value):
+            assert value == 'foo'
+    """)
+    result = testdir.runpytest('--faux-workers=3')
+    result.assert_outcomes(passed=10)
+    assert result.ret == 0
+
+
+def test_workers_invalid_value(testdir):
+    """Check that an invalid number of workers is detected."""
+    testdir.makepyfile("""
+        import fauxfactory
+        import pytest
+        @pytest.mark.faux_callable(2, fauxfactory.gen_alpha, workers=0)
+        def test_something(value):
+            assert value
+    """)
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    assert 'workers to be an integer greater than 0' in result.stdout.str()
+    assert result.ret == 2